@@ -0,0 +1,64 @@
+"""
+Cost of the ID_GENERATOR callables, uuid4_hex and the time-ordered
+uuid7_hex, from one thread and from several threads sharing uuid7_hex's
+lock, and whether the ids each thread got are strictly increasing:
+
+    python benchmarks/id_generation.py --ids 200000 --threads 4
+
+Only the generators run, see primary_key_storage.py for what the id order
+does to the primary key indexes.
+"""
+
+import argparse
+import os
+import sys
+from threading import Barrier, Thread
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clickup_utils.ids import uuid4_hex, uuid7_hex  # noqa: E402
+
+
+def generate(generator, count, threads):
+    """Seconds to generate count ids per thread, and the ids of each thread."""
+    barrier = Barrier(threads + 1)
+    results = [None] * threads
+
+    def run(index):
+        barrier.wait()
+        results[index] = [generator() for _ in range(count)]
+
+    workers = [Thread(target=run, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = perf_counter()
+    for worker in workers:
+        worker.join()
+    return perf_counter() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ids", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    for threads in sorted({1, args.threads}):
+        count = args.ids // threads
+        print(f"{threads} thread(s), {count} ids each")
+        for generator in (uuid4_hex, uuid7_hex):
+            elapsed, results = generate(generator, count, threads)
+            ordered = all(
+                all(a < b for a, b in zip(ids, ids[1:])) for ids in results
+            )
+            unique = len({id for ids in results for id in ids}) == count * threads
+            print(
+                f"  {generator.__name__:<10} {elapsed / (count * threads) * 1e6:6.2f} "
+                f"us/id  ordered per thread: {ordered}  unique: {unique}"
+            )
+
+
+if __name__ == "__main__":
+    main()
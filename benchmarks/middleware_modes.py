@@ -0,0 +1,223 @@
+"""
+Throughput of one endpoint served by the WSGI handler, by the ASGI handler
+with the project middlewares forced sync only (how RequestBudgetMiddleware
+and ReplicaRoutingMiddleware ran before they were async capable) and by the
+ASGI handler with them async capable.
+
+    DJANGO_SETTINGS_MODULE=clickup_erp.settings ASYNC_VIEWS=True \\
+        python benchmarks/middleware_modes.py --requests 2000 --concurrency 8
+
+The requests run in process, against a throwaway test database seeded with
+a user and a few projects, so the numbers compare the handler and
+middleware paths without a server or network in between.
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+from io import BytesIO
+from statistics import mean, quantiles
+from threading import Thread
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clickup_erp.settings")
+os.environ.setdefault("THROTTLE_USER_RATE", "1000000/min")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.asgi import ASGIHandler  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test.utils import setup_databases, setup_test_environment  # noqa: E402
+from django.test.utils import teardown_databases  # noqa: E402
+
+from clickup_auth.authentication import add_claims  # noqa: E402
+from clickup_auth.models import ClickUpUser  # noqa: E402
+from clickup_auth.tokens import ClickUpRefreshToken  # noqa: E402
+from clickup_erp.middleware import ReplicaRoutingMiddleware  # noqa: E402
+from clickup_erp.middleware import RequestBudgetMiddleware  # noqa: E402
+from clickup_projects.models import Employee, Lists, Project, Sprints  # noqa: E402
+
+PROJECT_MIDDLEWARES = (RequestBudgetMiddleware, ReplicaRoutingMiddleware)
+
+
+def seed(projects):
+    user = ClickUpUser.objects.create_user(
+        "bench", "password", "bench@example.com", is_active=True
+    )
+    employee = Employee.objects.create(user=user)
+    for index in range(projects):
+        project = Project.objects.create(
+            name=f"Project {index}", erpId=index, shortCode=f"B{index:02d}"
+        )
+        Sprints.objects.create(name="Sprint", project=project)
+        Lists.objects.create(name="List", project=project)
+    return str(add_claims(ClickUpRefreshToken.for_user(user), employee).access_token)
+
+
+def report(mode, latencies, statuses, elapsed):
+    failed = [status for status in statuses if status != 200]
+    if failed:
+        raise SystemExit(f"{mode}: {len(failed)} requests failed, e.g. {failed[0]}")
+
+    p50, p99 = (quantiles(latencies, n=100)[index] for index in (49, 98))
+    print(
+        f"{mode:<11} {len(latencies) / elapsed:8.0f} req/s"
+        f"  mean {mean(latencies) * 1000:6.2f} ms"
+        f"  p50 {p50 * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms"
+    )
+
+
+def run_wsgi(path, token, requests, concurrency):
+    handler = WSGIHandler()
+    latencies = []
+    statuses = []
+
+    def worker(count):
+        for _ in range(count):
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "SERVER_NAME": "testserver",
+                "SERVER_PORT": "80",
+                "HTTP_HOST": "testserver",
+                "HTTP_AUTHORIZATION": f"Bearer {token}",
+                "wsgi.input": BytesIO(),
+                "wsgi.url_scheme": "http",
+            }
+            started = perf_counter()
+            response = handler(
+                environ, lambda status, headers: statuses.append(int(status[:3]))
+            )
+            b"".join(response)
+            response.close()
+            latencies.append(perf_counter() - started)
+        connections.close_all()
+
+    threads = [
+        Thread(target=worker, args=(requests // concurrency,))
+        for _ in range(concurrency)
+    ]
+    started = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, perf_counter() - started
+
+
+def run_asgi(path, token, requests, concurrency):
+    handler = ASGIHandler()
+    latencies = []
+    statuses = []
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def request():
+        sent = asyncio.Event()
+        received = []
+
+        async def receive():
+            if not received:
+                received.append(True)
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # The client stays connected until the response is sent
+            await sent.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body"
+            ):
+                sent.set()
+
+        started = perf_counter()
+        await handler(dict(scope), receive, send)
+        latencies.append(perf_counter() - started)
+
+    async def worker(count):
+        for _ in range(count):
+            await request()
+
+    async def main():
+        await asyncio.gather(
+            *(worker(requests // concurrency) for _ in range(concurrency))
+        )
+
+    started = perf_counter()
+    asyncio.run(main())
+    return latencies, statuses, perf_counter() - started
+
+
+def run_asgi_sync(path, token, requests, concurrency):
+    # The handler adapts a sync only middleware with a thread hop each way
+    for middleware in PROJECT_MIDDLEWARES:
+        middleware.async_capable = False
+    try:
+        return run_asgi(path, token, requests, concurrency)
+    finally:
+        for middleware in PROJECT_MIDDLEWARES:
+            middleware.async_capable = True
+
+
+MODES = {
+    "wsgi": run_wsgi,
+    "asgi-sync": run_asgi_sync,
+    "asgi-async": run_asgi,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--path", default="/api/project/list")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        token = seed(args.projects)
+        print(
+            f"{args.path}, {args.requests} requests, concurrency "
+            f"{args.concurrency}, ASYNC_VIEWS={settings.ASYNC_VIEWS}"
+        )
+        for mode in args.modes:
+            # Warm up imports, caches and connections outside the measurement
+            MODES[mode](args.path, token, args.concurrency, args.concurrency)
+            report(mode, *MODES[mode](args.path, token, args.requests, args.concurrency))
+    finally:
+        connections.close_all()
+        # Connections of the finished ASGI request threads close once collected
+        gc.collect()
+        teardown_databases(old_config, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
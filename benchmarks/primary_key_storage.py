@@ -0,0 +1,161 @@
+"""
+Insert rate and table/index sizes of tickets, allocations and their
+assignedUsers rows, for the PRIMARY_KEY_STORAGE and ID_GENERATOR the
+process runs with. Run it once per combination and compare:
+
+    PRIMARY_KEY_STORAGE=char ID_GENERATOR=clickup_utils.ids.uuid4_hex \\
+        python benchmarks/primary_key_storage.py --tickets 50000
+    PRIMARY_KEY_STORAGE=uuid ID_GENERATOR=clickup_utils.ids.uuid7_hex \\
+        python benchmarks/primary_key_storage.py --tickets 50000
+
+The rows go to a throwaway PostgreSQL test database through bulk_create in
+batches, so the numbers compare the key columns and their indexes without
+the save() and signal work of the API.
+"""
+
+import argparse
+import gc
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clickup_erp.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection, connections, transaction  # noqa: E402
+from django.test.utils import setup_databases, setup_test_environment  # noqa: E402
+from django.test.utils import teardown_databases  # noqa: E402
+
+from clickup_auth.models import ClickUpUser  # noqa: E402
+from clickup_projects.models import Employee, Lists, Project, TeamMember  # noqa: E402
+from clickup_tickets.models import Ticket, TicketAllocation  # noqa: E402
+
+AssignedUsers = TicketAllocation.assignedUsers.through
+MODELS = (Ticket, TicketAllocation, AssignedUsers)
+
+
+def seed():
+    user = ClickUpUser.objects.create_user("bench", "password", "bench@example.com")
+    team_member = TeamMember.objects.create(user=Employee.objects.create(user=user))
+    project = Project.objects.create(name="Project", erpId=1, shortCode="BEN")
+    return Lists.objects.create(name="List", project=project), team_member
+
+
+def insert(tickets, batch_size, list, team_member):
+    elapsed = 0
+    for start in range(0, tickets, batch_size):
+        batch = range(start, min(start + batch_size, tickets))
+        started = perf_counter()
+        with transaction.atomic():
+            created = Ticket.objects.bulk_create(
+                Ticket(
+                    type="task",
+                    title=f"Ticket {index}",
+                    customId=f"BEN{index:07d}",
+                    description="",
+                    list=list,
+                )
+                for index in batch
+            )
+            allocations = TicketAllocation.objects.bulk_create(
+                TicketAllocation(
+                    title="Allocation",
+                    customId=f"{ticket.customId}#1",
+                    description="",
+                    ticket=ticket,
+                )
+                for ticket in created
+            )
+            AssignedUsers.objects.bulk_create(
+                AssignedUsers(ticketallocation=allocation, teammember=team_member)
+                for allocation in allocations
+            )
+        elapsed += perf_counter() - started
+    return elapsed
+
+
+def key_columns(model):
+    """The primary key column and the foreign key columns of a model."""
+    return {
+        field.column
+        for field in model._meta.local_concrete_fields
+        if field.primary_key or field.remote_field
+    }
+
+
+def sizes(model):
+    """
+    Bytes of the table, of its primary key index, of the other indexes on
+    key columns (foreign keys and the varchar "_like" ones) and of the
+    remaining indexes.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_relation_size(%s::regclass)", [table])
+        heap = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            SELECT pg_index.indisprimary, pg_relation_size(pg_index.indexrelid),
+                ARRAY(
+                    SELECT attname FROM pg_attribute
+                    WHERE attrelid = pg_index.indrelid
+                        AND attnum = ANY(pg_index.indkey)
+                )
+            FROM pg_index WHERE pg_index.indrelid = %s::regclass
+            """,
+            [table],
+        )
+        indexes = cursor.fetchall()
+
+    keys = key_columns(model)
+    primary = sum(size for is_primary, size, _ in indexes if is_primary)
+    key = sum(
+        size
+        for is_primary, size, columns in indexes
+        if not is_primary and keys.intersection(columns)
+    )
+    other = sum(size for _, size, _ in indexes) - primary - key
+    return heap, primary, key, other
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tickets", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        if connection.vendor != "postgresql":
+            raise SystemExit("PostgreSQL only, SQLite stores both as text")
+
+        elapsed = insert(args.tickets, args.batch_size, *seed())
+        print(
+            f"PRIMARY_KEY_STORAGE={settings.PRIMARY_KEY_STORAGE} "
+            f"ID_GENERATOR={settings.ID_GENERATOR}"
+        )
+        print(
+            f"{args.tickets} tickets, allocations and assignedUsers rows in "
+            f"batches of {args.batch_size}: {args.tickets / elapsed:.0f} "
+            f"tickets/s ({3 * args.tickets / elapsed:.0f} rows/s)"
+        )
+        print(f"  {'MiB':<48} {'table':>8} {'pkey':>8} {'key idx':>8} {'other':>8}")
+        for model in MODELS:
+            print(
+                f"  {model._meta.db_table:<48}"
+                + "".join(f" {size / 2**20:8.2f}" for size in sizes(model))
+            )
+    finally:
+        connections.close_all()
+        gc.collect()
+        teardown_databases(old_config, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Refresh token blacklist check against the database (simplejwt's
+RefreshToken) and against the cached revoked set (ClickUpRefreshToken),
+the cost of reloading that set, and prune_tokens, over a seeded token
+blacklist:
+
+    python benchmarks/revoked_tokens.py --tokens 1000000
+
+The tokens go to a throwaway test database of the configured engine. By
+default 90% of them are expired and 1% blacklisted, the blacklisted ones
+spread over the whole id range.
+"""
+
+import argparse
+import gc
+import os
+import sys
+from io import StringIO
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clickup_erp.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, connections, transaction  # noqa: E402
+from django.test.utils import setup_databases, setup_test_environment  # noqa: E402
+from django.test.utils import teardown_databases  # noqa: E402
+from django.utils.timezone import now, timedelta  # noqa: E402
+from rest_framework_simplejwt.token_blacklist.models import (  # noqa: E402
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from clickup_auth.models import ClickUpUser  # noqa: E402
+from clickup_auth.tokens import ClickUpRefreshToken, revoked_tokens  # noqa: E402
+
+
+def seed(tokens, expired, blacklisted, batch_size=10000):
+    user = ClickUpUser.objects.create_user(
+        "bench", "password", "bench@example.com", is_active=True
+    )
+    created_at = now() - timedelta(days=3)
+    every = round(1 / blacklisted) if blacklisted else 0
+    for start in range(0, tokens, batch_size):
+        with transaction.atomic():
+            outstanding = OutstandingToken.objects.bulk_create(
+                OutstandingToken(
+                    user=user,
+                    jti=f"bench{index:09d}",
+                    token="token",
+                    created_at=created_at,
+                    expires_at=created_at + timedelta(days=1)
+                    if index < tokens * expired
+                    else now() + timedelta(days=1),
+                )
+                for index in range(start, min(start + batch_size, tokens))
+            )
+            if every:
+                BlacklistedToken.objects.bulk_create(
+                    BlacklistedToken(token=token) for token in outstanding[::every]
+                )
+
+    # Plans from up to date statistics, as autovacuum would have them
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for model in (OutstandingToken, BlacklistedToken):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+    return user
+
+
+def per_call(function, number):
+    started = perf_counter()
+    for _ in range(number):
+        function()
+    return (perf_counter() - started) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tokens", type=int, default=1000000)
+    parser.add_argument("--expired", type=float, default=0.9)
+    parser.add_argument("--blacklisted", type=float, default=0.01)
+    parser.add_argument("--checks", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        started = perf_counter()
+        user = seed(args.tokens, args.expired, args.blacklisted)
+        print(
+            f"{connection.vendor}: {args.tokens} outstanding tokens, "
+            f"{BlacklistedToken.objects.count()} blacklisted, seeded in "
+            f"{perf_counter() - started:.0f} s"
+        )
+
+        # A live token, checked the way the refresh endpoint does
+        token = str(ClickUpRefreshToken.for_user(user))
+        database = RefreshToken(token)
+        cached = ClickUpRefreshToken(token)
+
+        seconds = per_call(database.check_blacklist, args.checks)
+        print(f"  blacklist check, database     {seconds * 1e6:9.1f} us")
+        seconds = per_call(cached.check_blacklist, args.checks * 10)
+        print(f"  blacklist check, revoked set  {seconds * 1e6:9.1f} us")
+
+        def reload():
+            revoked_tokens.generation = None
+            revoked_tokens.refresh()
+
+        seconds = per_call(reload, 10)
+        print(
+            f"  revoked set reload            {seconds * 1e3:9.1f} ms "
+            f"({len(revoked_tokens.jtis)} live revoked tokens)"
+        )
+
+        started = perf_counter()
+        call_command("prune_tokens", stdout=StringIO())
+        print(
+            f"  prune_tokens                  {perf_counter() - started:9.1f} s  "
+            f"({OutstandingToken.objects.count()} tokens left)"
+        )
+        seconds = per_call(reload, 10)
+        print(f"  revoked set reload, pruned    {seconds * 1e3:9.1f} ms")
+    finally:
+        connections.close_all()
+        gc.collect()
+        teardown_databases(old_config, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
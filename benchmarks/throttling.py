@@ -0,0 +1,116 @@
+"""
+Cost of a check and cache memory per key of SlidingWindowThrottle against
+DRF's SimpleRateThrottle, which keeps the timestamp of every request of the
+window. Both count the requests of each client against the same rate, in the
+THROTTLE_CACHE (LocMemCache, or Redis when REDIS_URL is set):
+
+    python benchmarks/throttling.py --checks 20000 --rate 600/min
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/throttling.py
+
+No database is used. The rate is only reached once the checks outnumber
+it, the checks past it are refused and cost a single cache read.
+"""
+
+import argparse
+import os
+import pickle
+import sys
+from time import perf_counter, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clickup_erp.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from rest_framework.throttling import SimpleRateThrottle  # noqa: E402
+
+from clickup_utils.throttling import SlidingWindowThrottle  # noqa: E402
+
+
+def throttles(rate):
+    cache = caches[settings.THROTTLE_CACHE]
+
+    class History(SimpleRateThrottle):
+        def __init__(self):
+            self.rate = rate
+            self.cache = cache
+            super().__init__()
+
+        def get_cache_key(self, request, view):
+            return f"bench:history:{self.get_ident(request)}"
+
+    class SlidingWindow(SlidingWindowThrottle):
+        def __init__(self):
+            self.rate = rate
+            super().__init__()
+
+        def get_cache_key(self, request, view):
+            return f"bench:window:{self.get_ident(request)}"
+
+    return {"SimpleRateThrottle": History, "SlidingWindowThrottle": SlidingWindow}
+
+
+def client_request(index):
+    """An anonymous request from the index-th client's IP address."""
+    request = Request(
+        APIRequestFactory().get("/", REMOTE_ADDR=f"10.0.{index // 256}.{index % 256}")
+    )
+    request.user = AnonymousUser()
+    return request
+
+
+def run(throttle_class, checks, clients):
+    """Seconds taken and checks allowed, spread over the clients."""
+    requests = [client_request(index) for index in range(clients)]
+    allowed = 0
+    started = perf_counter()
+    for index in range(checks):
+        # A throttle instance per check, like DRF does per request
+        allowed += throttle_class().allow_request(requests[index % clients], None)
+    return perf_counter() - started, allowed
+
+
+def stored_bytes(throttle_class, client):
+    """Pickled size of the cache values kept for a client."""
+    throttle = throttle_class()
+    key = throttle.get_cache_key(client_request(client), None)
+    window = int(time() // throttle.duration)
+    keys = [key, f"{key}:{window}", f"{key}:{window - 1}"]
+    return sum(
+        len(pickle.dumps(value)) for value in throttle.cache.get_many(keys).values()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=1)
+    parser.add_argument("--rate", default="600/min")
+    args = parser.parse_args()
+
+    cache = caches[settings.THROTTLE_CACHE]
+    print(
+        f"{cache.__class__.__name__}, {args.checks} checks of {args.clients} "
+        f"client(s) at {args.rate}"
+    )
+    for name, throttle_class in throttles(args.rate).items():
+        cache.clear()
+        elapsed, allowed = run(throttle_class, args.checks, args.clients)
+        # The last client, LocMemCache culls the oldest keys past MAX_ENTRIES
+        size = stored_bytes(throttle_class, args.clients - 1)
+        print(
+            f"  {name:<22} {elapsed / args.checks * 1e6:7.1f} us/check  "
+            f"{allowed:6} allowed  {size:7} bytes per client"
+        )
+    cache.clear()
+
+
+if __name__ == "__main__":
+    main()
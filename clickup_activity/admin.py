@@ -0,0 +1,6 @@
+from django.contrib import admin
+
+from .models import ChangeLog, AuditEvent
+
+# Register your models here.
+admin.site.register([ChangeLog, AuditEvent])
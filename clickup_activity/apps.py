@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ActivityConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'clickup_activity'
+
+    def ready(self):
+        from . import signals
+
+        signals.connect_change_tracking()
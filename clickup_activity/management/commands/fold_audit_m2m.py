@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from clickup_activity.models import AuditEvent
+from clickup_tickets.models import Ticket, TicketAllocation
+
+
+AUDIT_FIELDS = {
+    "createdBy": "create",
+    "updatedBy": "update",
+    "deletedBy": "delete",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the createdBy/updatedBy/deletedBy M2M rows of tickets and "
+        "allocations into AuditEvent, deleting each batch once folded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        for model in (Ticket, TicketAllocation):
+            for field_name, action in AUDIT_FIELDS.items():
+                field = model._meta.get_field(field_name)
+                folded = self.fold(model, field, action, batch_size)
+                self.stdout.write(
+                    f"{model._meta.label}.{field_name}: {folded} rows folded"
+                )
+
+    def fold(self, model, field, action, batch_size):
+        through = field.remote_field.through
+        object_column = f"{field.m2m_field_name()}_id"
+        actor_column = f"{field.m2m_reverse_field_name()}_id"
+        # createdAt is auto_now and updatedAt auto_now_add on these models
+        timestamp_field = "updatedAt" if action == "create" else "createdAt"
+
+        folded = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    through.objects.order_by("pk").values_list(
+                        "pk", object_column, actor_column
+                    )[:batch_size]
+                )
+                if not rows:
+                    return folded
+
+                timestamps = dict(
+                    model.all_objects.filter(
+                        pk__in={object_id for _, object_id, _ in rows}
+                    ).values_list("pk", timestamp_field)
+                )
+                AuditEvent.objects.bulk_create(
+                    [
+                        AuditEvent(
+                            model=model._meta.label_lower,
+                            objectId=object_id,
+                            actor_id=actor_id,
+                            action=action,
+                            createdAt=timestamps[object_id],
+                        )
+                        for _, object_id, actor_id in rows
+                        if object_id in timestamps
+                    ]
+                )
+                through.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+                folded += len(rows)
@@ -0,0 +1,213 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.db.models import Model, Manager, Func
+from django.db.models import (
+    BigAutoField,
+    BigIntegerField,
+    CharField,
+    DateTimeField,
+    JSONField,
+    Index,
+)
+from django.db.models import ForeignKey, SET_NULL
+from django.utils.timezone import now
+
+from clickup_utils.fields import primary_key_field
+
+
+class ChangeLogManager(Manager):
+
+    def record(self, instance, action):
+        return self.create(
+            model=instance._meta.label_lower,
+            objectId=instance.pk,
+            action=action,
+            transactionId=self.transaction_id(),
+        )
+
+    def record_many(self, model, object_ids, action):
+        transaction_id = self.transaction_id()
+        return self.bulk_create(
+            [
+                self.model(
+                    model=model._meta.label_lower,
+                    objectId=getattr(object_id, "hex", object_id),
+                    action=action,
+                    transactionId=transaction_id,
+                )
+                for object_id in object_ids
+            ]
+        )
+
+    def transaction_id(self):
+        """
+        Id of the inserting transaction on PostgreSQL. Other databases
+        serialize their writes, so their entries commit in sequence order
+        and all get 0.
+        """
+        if connections[router.db_for_write(self.model)].vendor == "postgresql":
+            return Func(function="txid_current", output_field=BigIntegerField())
+        return 0
+
+    def watermark(self):
+        """
+        Oldest transaction id still running (PostgreSQL, None elsewhere):
+        every entry below it is committed or rolled back, so no new entry can
+        appear before the last one served below it.
+        """
+        connection = connections[self.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+            return cursor.fetchone()[0]
+
+
+# Create your models here.
+class ChangeLog(Model):
+    """
+    Append-only log of the writes to the change tracked models. The feed
+    follows it in (transactionId, sequence) order: sequence values are
+    handed out at insert and can commit out of order, the transaction ids
+    below the watermark can't gain entries anymore.
+    """
+
+    ACTIONS = {
+        "create": "Create",
+        "update": "Update",
+        "delete": "Delete",
+    }
+
+    sequence = BigAutoField(primary_key=True)
+    model = CharField(max_length=64)
+    objectId = CharField(max_length=32)
+    action = CharField(max_length=6, choices=ACTIONS)
+    createdAt = DateTimeField(auto_now_add=True)
+    transactionId = BigIntegerField(default=0, editable=False)
+
+    objects = ChangeLogManager()
+
+    class Meta:
+        indexes = [
+            Index(fields=["model", "objectId"]),
+            Index(fields=["transactionId", "sequence"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.sequence} {self.action} {self.model} {self.objectId}"
+
+
+class AuditEventManager(Manager):
+
+    def log(self, instance, actor, action, changes=None):
+        return self.create(**self.event(instance, actor, action, changes))
+
+    def log_many(self, model, object_ids, actor, action, changes=None):
+        return self.bulk_create(
+            [
+                self.model(
+                    model=model._meta.label_lower,
+                    objectId=getattr(object_id, "hex", object_id),
+                    actor=actor,
+                    action=action,
+                    changes=changes or {},
+                )
+                for object_id in object_ids
+            ]
+        )
+
+    def log_changes(self, model, changes, actor, action):
+        """
+        One event per object of ``changes`` (``{object_id: {field: [old, new]}}``)
+        in a single INSERT.
+        """
+        return self.bulk_create(
+            [
+                self.model(
+                    model=model._meta.label_lower,
+                    objectId=getattr(object_id, "hex", object_id),
+                    actor=actor,
+                    action=action,
+                    changes=object_changes,
+                )
+                for object_id, object_changes in changes.items()
+            ]
+        )
+
+    def field_changes(self, instance, validated_data):
+        """
+        ``{field: [old, new]}`` for the validated fields that differ from the
+        instance; related objects are reduced to their primary keys.
+        """
+        changes = {}
+        for field, value in validated_data.items():
+            old = getattr(instance, field, None)
+            if hasattr(old, "all"):
+                old = sorted(old.values_list("pk", flat=True))
+                value = sorted(getattr(item, "pk", item) for item in value)
+            else:
+                old = getattr(old, "pk", old)
+                value = getattr(value, "pk", value)
+
+            if old != value:
+                changes[field] = [old, value]
+        return changes
+
+    def event(self, instance, actor, action, changes=None):
+        return {
+            "model": instance._meta.label_lower,
+            "objectId": instance.pk,
+            "actor": actor,
+            "action": action,
+            "changes": changes or {},
+        }
+
+
+class AuditEvent(Model):
+    """
+    Who did what to a ticket or allocation, with the changed fields as
+    ``{field: [old, new]}``. Rows are append-only and looked up by model,
+    objectId and createdAt; there is no FK to the audited row.
+    """
+
+    ACTIONS = {
+        "create": "Create",
+        "update": "Update",
+        "delete": "Delete",
+    }
+
+    _id = primary_key_field()
+    model = CharField(max_length=64)
+    objectId = CharField(max_length=32)
+    actor = ForeignKey(
+        "clickup_projects.Employee",
+        on_delete=SET_NULL,
+        null=True,
+        db_constraint=False,
+        related_name="audit_events",
+    )
+    action = CharField(max_length=6, choices=ACTIONS)
+    changes = JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    createdAt = DateTimeField(default=now)
+
+    objects = AuditEventManager()
+
+    class Meta:
+        indexes = [Index(fields=["model", "objectId", "-createdAt"])]
+
+    def __str__(self) -> str:
+        return f"{self.action} {self.model} {self.objectId}"
+
+
+class ChangeTrackedModel(Model):
+    """
+    Models whose writes are appended to the ChangeLog. The save runs in a
+    transaction so the log row commits (or rolls back) together with it.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
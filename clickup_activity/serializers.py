@@ -0,0 +1,72 @@
+from rest_framework.serializers import ModelSerializer
+
+from clickup_projects.models import Lists, Folders, Sprints
+from clickup_tickets.models import Ticket, TicketAllocation
+from clickup_tickets.serializers import TicketEmployeeSerializer
+
+from .models import AuditEvent
+
+
+class AuditEventSerializer(ModelSerializer):
+    actor = TicketEmployeeSerializer()
+
+    class Meta:
+        model = AuditEvent
+        fields = ("_id", "action", "actor", "changes", "createdAt")
+
+
+class TicketChangeSerializer(ModelSerializer):
+    class Meta:
+        model = Ticket
+        fields = (
+            "_id",
+            "type",
+            "title",
+            "customId",
+            "description",
+            "startDate",
+            "dueDate",
+            "priority",
+            "list",
+            "sprint",
+            "createdAt",
+            "updatedAt",
+        )
+
+
+class TicketAllocationChangeSerializer(ModelSerializer):
+    class Meta:
+        model = TicketAllocation
+        fields = (
+            "_id",
+            "title",
+            "customId",
+            "priority",
+            "ticketStatus",
+            "estimationHours",
+            "description",
+            "startDate",
+            "dueDate",
+            "assignedUsers",
+            "ticket",
+            "createdAt",
+            "updatedAt",
+        )
+
+
+class ListsChangeSerializer(ModelSerializer):
+    class Meta:
+        model = Lists
+        fields = ("_id", "name", "project")
+
+
+class FoldersChangeSerializer(ModelSerializer):
+    class Meta:
+        model = Folders
+        fields = ("_id", "name", "project", "list")
+
+
+class SprintsChangeSerializer(ModelSerializer):
+    class Meta:
+        model = Sprints
+        fields = ("_id", "name", "active", "status", "project")
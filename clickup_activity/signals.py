@@ -0,0 +1,52 @@
+from django.apps import apps
+from django.db.models import ManyToManyField
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import Signal
+
+from .models import ChangeLog, ChangeTrackedModel
+
+
+# Sent with ``object_ids`` and ``action`` ("create", "update" or "delete") for
+# writes that bypass save() and delete(), e.g. QuerySet.update() or
+# bulk_create(), so the change log and the other listeners still see them.
+objects_changed = Signal()
+
+
+def record_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    ChangeLog.objects.record(instance, "create" if created else "update")
+
+
+def record_delete(sender, instance, **kwargs):
+    if getattr(instance, "deletedAt", None):
+        # Purge of a soft deleted row, its tombstone is already logged
+        return
+    ChangeLog.objects.record(instance, "delete")
+
+
+def record_objects_changed(sender, object_ids, action, **kwargs):
+    ChangeLog.objects.record_many(sender, object_ids, action)
+
+
+def record_m2m(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        ChangeLog.objects.record(instance, "update")
+    elif pk_set:
+        ChangeLog.objects.record_many(model, pk_set, "update")
+
+
+def connect_change_tracking():
+    for model in apps.get_models():
+        if not issubclass(model, ChangeTrackedModel):
+            continue
+
+        post_save.connect(record_save, sender=model)
+        post_delete.connect(record_delete, sender=model)
+        objects_changed.connect(record_objects_changed, sender=model)
+        for field in model._meta.local_many_to_many:
+            if isinstance(field, ManyToManyField):
+                m2m_changed.connect(record_m2m, sender=field.remote_field.through)
@@ -0,0 +1,90 @@
+from base64 import urlsafe_b64encode
+from threading import Event, Thread
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from clickup_auth.models import ClickUpUser
+from clickup_projects.models import Lists, Project
+
+from .models import ChangeLog
+
+
+class ChangeFeedMixin:
+    """
+    The feed only serves committed transactions, so these tests commit.
+    """
+
+    def setUp(self):
+        self.user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+        self.project = Project.objects.create(name="Project", erpId=1, shortCode="PRJ")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def feed(self, cursor=None):
+        params = {"cursor": cursor} if cursor else {}
+        response = self.client.get("/api/changes", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data["data"]
+
+    def changed_ids(self, page):
+        return [change["_id"] for change in page["changes"]]
+
+
+class ChangeFeedTests(ChangeFeedMixin, TransactionTestCase):
+    def test_follows_changes_after_the_cursor(self):
+        cursor = self.feed()["cursor"]
+        first = Lists.objects.create(name="First", project=self.project)
+        second = Lists.objects.create(name="Second", project=self.project)
+
+        page = self.feed(cursor)
+        self.assertEqual(self.changed_ids(page), [first._id, second._id])
+        self.assertEqual(self.feed(page["cursor"])["changes"], [])
+
+    def test_accepts_sequence_only_cursors(self):
+        first = Lists.objects.create(name="First", project=self.project)
+        second = Lists.objects.create(name="Second", project=self.project)
+        # Entries and cursors from before the transaction ids were logged
+        ChangeLog.objects.update(transactionId=0)
+        sequence = ChangeLog.objects.get(objectId=first._id).sequence
+        cursor = urlsafe_b64encode(str(sequence).encode()).decode()
+        third = Lists.objects.create(name="Third", project=self.project)
+
+        self.assertEqual(
+            self.changed_ids(self.feed(cursor)), [second._id, third._id]
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "needs concurrent transactions")
+class ChangeFeedCommitOrderTests(ChangeFeedMixin, TransactionTestCase):
+    def test_change_committing_after_a_later_one_is_not_skipped(self):
+        cursor = self.feed()["cursor"]
+        inserted, release = Event(), Event()
+        slow = {}
+
+        def slow_writer():
+            try:
+                with transaction.atomic():
+                    slow["list"] = Lists.objects.create(name="Slow", project=self.project)
+                    inserted.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = Thread(target=slow_writer)
+        thread.start()
+        self.assertTrue(inserted.wait(10))
+        # Takes the next sequence value but commits before the slow writer
+        fast = Lists.objects.create(name="Fast", project=self.project)
+
+        page = self.feed(cursor)
+        release.set()
+        thread.join()
+        self.assertEqual(page["changes"], [])
+
+        page = self.feed(page["cursor"])
+        self.assertEqual(self.changed_ids(page), [slow["list"]._id, fast._id])
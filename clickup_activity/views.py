@@ -0,0 +1,192 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db.models import Q
+
+from rest_framework.views import APIView
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.permissions import IsAuthenticated
+
+from drf_spectacular.utils import extend_schema_view
+
+from .models import ChangeLog, AuditEvent
+from .serializers import (
+    AuditEventSerializer,
+    TicketChangeSerializer,
+    TicketAllocationChangeSerializer,
+    ListsChangeSerializer,
+    FoldersChangeSerializer,
+    SprintsChangeSerializer,
+)
+
+
+CHANGE_FEED = {
+    "clickup_tickets.ticket": ("ticket", TicketChangeSerializer, ()),
+    "clickup_tickets.ticketallocation": (
+        "allocation",
+        TicketAllocationChangeSerializer,
+        ("assignedUsers",),
+    ),
+    "clickup_projects.lists": ("list", ListsChangeSerializer, ()),
+    "clickup_projects.folders": ("folder", FoldersChangeSerializer, ("list",)),
+    "clickup_projects.sprints": ("sprint", SprintsChangeSerializer, ()),
+}
+
+
+def encode_cursor(transaction_id, sequence):
+    return urlsafe_b64encode(f"{transaction_id}:{sequence}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    # Cursors issued before transaction ids were logged hold the sequence only
+    transaction_id, _, sequence = (
+        urlsafe_b64decode(cursor.encode()).decode().rpartition(":")
+    )
+    return int(transaction_id or 0), int(sequence)
+
+
+def committed_changes():
+    """
+    The log entries that can't be preceded by an entry committing later,
+    in feed order.
+    """
+    entries = ChangeLog.objects.order_by("transactionId", "sequence")
+    watermark = ChangeLog.objects.watermark()
+    if watermark is not None:
+        entries = entries.filter(transactionId__lt=watermark)
+    return entries
+
+
+# Create your views here.
+class AuditTrailMixin:
+    """
+    Adds ``GET <resource>/<pk>/audit?limit=<n>`` with the latest audit
+    events of the object, newest first.
+    """
+
+    audit_default_limit = 20
+    audit_max_limit = 100
+
+    @action(detail=True, methods=["get"])
+    def audit(self, request, pk=None):
+        try:
+            limit = min(
+                int(request.query_params.get("limit", self.audit_default_limit)),
+                self.audit_max_limit,
+            )
+        except ValueError:
+            return Response("Invalid limit", HTTP_400_BAD_REQUEST)
+
+        events = (
+            AuditEvent.objects.filter(
+                model=self.queryset.model._meta.label_lower, objectId=pk
+            )
+            .select_related("actor__user")
+            .order_by("-createdAt")[:limit]
+        )
+        serializer = AuditEventSerializer(
+            events, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data, HTTP_200_OK)
+
+
+@extend_schema_view()
+class ChangeFeedView(APIView):
+    """
+    Returns the ticket, allocation, list, folder and sprint changes after
+    ``cursor``. Calling without a cursor returns the current head so clients
+    can start following the feed after a full load.
+
+    Changes of transactions that are still running hold the feed back, see
+    ChangeLog.
+    """
+
+    permission_classes = [IsAuthenticated]
+    default_limit = 100
+    max_limit = 500
+
+    def get(self, request, *args, **kwargs):
+        cursor = request.query_params.get("cursor")
+        if not cursor:
+            head = committed_changes().last()
+            return Response(
+                {
+                    "data": {
+                        "changes": [],
+                        "cursor": encode_cursor(
+                            *((head.transactionId, head.sequence) if head else (0, 0))
+                        ),
+                        "hasMore": False,
+                    },
+                },
+                HTTP_200_OK,
+            )
+
+        try:
+            transaction_id, sequence = decode_cursor(cursor)
+            limit = min(
+                int(request.query_params.get("limit", self.default_limit)),
+                self.max_limit,
+            )
+        except ValueError:
+            return Response("Invalid cursor or limit", HTTP_400_BAD_REQUEST)
+
+        entries = list(
+            committed_changes().filter(
+                Q(transactionId__gt=transaction_id)
+                | Q(transactionId=transaction_id, sequence__gt=sequence),
+                model__in=CHANGE_FEED,
+            )[: limit + 1]
+        )
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        latest = {}
+        for entry in entries:
+            key = (entry.model, entry.objectId)
+            latest.pop(key, None)
+            latest[key] = entry.action
+
+        changes = self.get_changes(latest)
+        if entries:
+            transaction_id, sequence = entries[-1].transactionId, entries[-1].sequence
+
+        return Response(
+            {
+                "data": {
+                    "changes": changes,
+                    "cursor": encode_cursor(transaction_id, sequence),
+                    "hasMore": has_more,
+                },
+            },
+            HTTP_200_OK,
+        )
+
+    def get_changes(self, latest):
+        object_ids = {}
+        for (model, object_id), change_action in latest.items():
+            if change_action != "delete":
+                object_ids.setdefault(model, []).append(object_id)
+
+        rows = {}
+        for model, ids in object_ids.items():
+            _, serializer_class, prefetch = CHANGE_FEED[model]
+            queryset = serializer_class.Meta.model.objects.filter(
+                pk__in=ids
+            ).prefetch_related(*prefetch)
+            for data in serializer_class(queryset, many=True).data:
+                rows[(model, data["_id"])] = data
+
+        changes = []
+        for key in latest:
+            data = rows.get(key)
+            changes.append(
+                {
+                    "type": CHANGE_FEED[key[0]][0],
+                    "action": "upsert" if data else "delete",
+                    "_id": key[1],
+                    "data": data,
+                }
+            )
+        return changes
@@ -0,0 +1,114 @@
+from copy import copy
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+from clickup_projects.models import Employee
+
+from .models import ClickUpUser
+
+
+EMPLOYEE_ID_CLAIM = "employeeId"
+
+
+class TTLCache:
+    """
+    Per process cache of recently loaded rows, each entry expiring after
+    ``seconds``; the oldest entries are dropped past ``maxsize``.
+    """
+
+    def __init__(self, seconds, maxsize=1024):
+        self.seconds = seconds
+        self.maxsize = maxsize
+        self.entries = {}
+        self.lock = Lock()
+
+    def get(self, key, load):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > monotonic():
+            return entry[1]
+
+        value = load(key)
+        with self.lock:
+            if len(self.entries) >= self.maxsize:
+                for stale in list(self.entries)[: self.maxsize // 4]:
+                    del self.entries[stale]
+            self.entries[key] = (monotonic() + self.seconds, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+users = TTLCache(settings.AUTH_CACHE_SECONDS)
+employees = TTLCache(settings.AUTH_CACHE_SECONDS)
+
+
+def add_claims(token, employee):
+    """
+    Claims ClaimsJWTAuthentication needs to authenticate without a query,
+    copied from the refresh token into its access tokens.
+    """
+    token[EMPLOYEE_ID_CLAIM] = employee._id
+    token["is_staff"] = employee.user.is_staff
+    token["is_superuser"] = employee.user.is_superuser
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """
+    ``request.user`` backed by the access token claims. The ClickUpUser
+    and Employee rows are only loaded, through the per process TTL caches,
+    when something other than a claim is read from them.
+    """
+
+    @cached_property
+    def employee(self):
+        # A copy so a request changing it doesn't leak into the cache
+        return copy(
+            employees.get(
+                self.token[EMPLOYEE_ID_CLAIM],
+                lambda employee_id: Employee.objects.get(_id=employee_id),
+            )
+        )
+
+    @cached_property
+    def instance(self):
+        return copy(
+            users.get(self.id, lambda user_id: ClickUpUser.objects.get(pk=user_id))
+        )
+
+    def __getattr__(self, attr):
+        if attr in self.token:
+            return self.token[attr]
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.instance, attr)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per request user lookup for tokens
+    carrying the employeeId claim (see add_claims). Tokens issued before
+    the claim existed still load the user.
+    """
+
+    def get_user(self, validated_token):
+        if EMPLOYEE_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """
+    Documents ClaimsJWTAuthentication as the same bearer scheme, the
+    drf_spectacular extension doesn't match subclasses.
+    """
+
+    target_class = ClaimsJWTAuthentication
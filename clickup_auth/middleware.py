@@ -0,0 +1,33 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+
+from .authentication import ClaimsJWTAuthentication
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates websocket connections with the access token passed as
+    ``?token=<access token>``, browsers can't set headers on websockets.
+    """
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        raw_token = query.get("token", [None])[0]
+        scope["user"] = await self.get_user(raw_token)
+        return await super().__call__(scope, receive, send)
+
+    @database_sync_to_async
+    def get_user(self, raw_token):
+        if not raw_token:
+            return AnonymousUser()
+
+        authentication = ClaimsJWTAuthentication()
+        try:
+            validated_token = authentication.get_validated_token(raw_token)
+            return authentication.get_user(validated_token)
+        except (InvalidToken, AuthenticationFailed):
+            return AnonymousUser()
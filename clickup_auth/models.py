@@ -1,15 +1,13 @@
 from django.contrib.auth.models import AbstractUser
-from django.db.models import CharField, EmailField
+from django.db.models import EmailField
 
-from clickup_utils.utils import generate_uuid
+from clickup_utils.fields import primary_key_field
 from .managers import ClickUpUserManager
 
 
 # Create your models here.
 class ClickUpUser(AbstractUser):
-    id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    id = primary_key_field()
 
     email = EmailField(unique=True)
 
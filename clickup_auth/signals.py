@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .tokens import bump_generation
+
+
+@receiver(post_save, sender=BlacklistedToken)
+@receiver(post_delete, sender=BlacklistedToken)
+def blacklist_changed(sender, **kwargs):
+    # Every process reloads its revoked set on the next check
+    transaction.on_commit(bump_generation)
@@ -0,0 +1,26 @@
+import os
+import requests
+from django.conf import settings
+
+from clickup_projects.models import Employee
+from clickup_tasks.registry import task
+
+
+@task(max_attempts=5)
+def fetch_employee_photo(employee_id, url):
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+
+    employee = Employee.objects.get(_id=employee_id)
+    save_directory = f"employee/{employee._id}/"
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, save_directory), exist_ok=True)
+    photo_path = f"{employee._id}_photo.jpg"
+    with open(
+        os.path.join(settings.MEDIA_ROOT, save_directory, photo_path), "wb"
+    ) as photo:
+        photo.write(response.content)
+    employee.photo.name = save_directory + photo_path
+    # The file name is reused, clearing the thumbnails has them regenerated
+    employee.photoDerivatives = {}
+    employee.save(update_fields=["photo", "photoDerivatives"])
+    return employee.photo.name
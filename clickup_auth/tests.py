@@ -1,3 +1,108 @@
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils.timezone import now, timedelta
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from clickup_utils.throttling import LoginRateThrottle
+
+from .models import ClickUpUser
+from .tokens import ClickUpRefreshToken, revoked_tokens
+
+
+class PruneTokensTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = ClickUpUser.objects.create_user("user", "password", "user@example.com")
+        expired = [
+            OutstandingToken.objects.create(
+                user=user,
+                jti=f"expired{index}",
+                token="token",
+                expires_at=now() - timedelta(days=1),
+            )
+            for index in range(4)
+        ]
+        cls.live = OutstandingToken.objects.create(
+            user=user, jti="live", token="token", expires_at=now() + timedelta(days=1)
+        )
+        for token in (*expired[:3], cls.live):
+            BlacklistedToken.objects.create(token=token)
+
+    def test_prunes_without_loading_rows_and_bumps_once_per_batch(self):
+        # Per batch: savepoint, ids, two deletes, release, then an empty batch
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(13):
+            call_command("prune_tokens", batch_size=2, stdout=StringIO())
+
+        self.assertEqual(len(callbacks), 2)
+        self.assertQuerySetEqual(OutstandingToken.objects.all(), [self.live])
+        self.assertQuerySetEqual(
+            BlacklistedToken.objects.values_list("token", flat=True), [self.live.pk]
+        )
+
+
+class RevokedTokensTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+
+    def setUp(self):
+        # Reloaded on the first check, whatever earlier tests left in it
+        revoked_tokens.generation = None
+
+    def refresh(self, token):
+        return APIClient().post("/api/auth", {"refresh": str(token)}, format="json")
+
+    def test_blacklisted_refresh_tokens_are_rejected_until_pruned(self):
+        token = ClickUpRefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+        # Expired for prune_tokens, the JWT itself still verifies. Without a
+        # blacklist change the process keeps its revoked set.
+        OutstandingToken.objects.filter(jti=token["jti"]).update(
+            expires_at=now() - timedelta(seconds=1)
+        )
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("prune_tokens", stdout=StringIO())
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertEqual(self.refresh(token).status_code, 200)
+
+
+class LoginThrottleTests(TestCase):
+    def tearDown(self):
+        caches[settings.THROTTLE_CACHE].clear()
+
+    @mock.patch.object(LoginRateThrottle, "THROTTLE_RATES", {"login": "2/min"})
+    @mock.patch("clickup_auth.views.requests.get")
+    def test_sign_in_attempts_are_limited_per_ip_before_calling_google(self, get):
+        client = APIClient(REMOTE_ADDR="10.0.0.1")
+        for _ in range(2):
+            response = client.post("/api/auth/sign-in/google", {}, format="json")
+            self.assertEqual(response.status_code, 400)
+
+        response = client.post(
+            "/api/auth/sign-in/google", {"idToken": "token"}, format="json"
+        )
+        self.assertEqual(response.status_code, 429)
+        get.assert_not_called()
 
-# Create your tests here.
+        response = APIClient(REMOTE_ADDR="10.0.0.2").post(
+            "/api/auth/sign-in/google", {}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
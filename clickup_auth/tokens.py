@@ -0,0 +1,80 @@
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+GENERATION_KEY = "revoked-tokens:generation"
+
+
+class RevokedTokens:
+    """
+    Per process set of the JTIs of the blacklisted refresh tokens that have
+    not expired yet. Expired tokens are rejected before the blacklist is
+    checked, so the set only holds what was revoked within one
+    REFRESH_TOKEN_LIFETIME, however long the blacklist table grows.
+
+    It is reloaded when the generation counter in the shared cache moves,
+    which every blacklist change bumps, or after REVOKED_TOKENS_SECONDS.
+    """
+
+    def __init__(self):
+        self.jtis = frozenset()
+        self.generation = None
+        self.loaded_at = None
+        self.lock = Lock()
+
+    def __contains__(self, jti):
+        self.refresh()
+        return jti in self.jtis
+
+    def refresh(self):
+        generation = cache.get(GENERATION_KEY, 0)
+        if (
+            generation == self.generation
+            and monotonic() - self.loaded_at < settings.REVOKED_TOKENS_SECONDS
+        ):
+            return
+
+        with self.lock:
+            self.jtis = frozenset(
+                BlacklistedToken.objects.filter(
+                    token__expires_at__gt=now()
+                ).values_list("token__jti", flat=True)
+            )
+            self.generation = generation
+            self.loaded_at = monotonic()
+
+
+revoked_tokens = RevokedTokens()
+
+
+def bump_generation():
+    if not cache.add(GENERATION_KEY, 1, None):
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, None)
+
+
+class ClickUpRefreshToken(RefreshToken):
+    """
+    RefreshToken checking the revoked set instead of querying the blacklist
+    tables on every refresh.
+    """
+
+    def check_blacklist(self):
+        if self.payload[api_settings.JTI_CLAIM] in revoked_tokens:
+            raise TokenError(_("Token is blacklisted"))
+
+
+class ClickUpTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClickUpRefreshToken
@@ -1,17 +1,19 @@
-import os
 import requests
-from rest_framework.decorators import api_view
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.decorators import api_view, throttle_classes
 from rest_framework.response import Response
 from rest_framework.status import HTTP_400_BAD_REQUEST, HTTP_200_OK
-from django.conf import settings
 
+from clickup_auth.authentication import add_claims
 from clickup_auth.models import ClickUpUser
+from clickup_auth.tokens import ClickUpRefreshToken
+from clickup_auth.tasks import fetch_employee_photo
 from clickup_projects.models import Employee
+from clickup_utils.throttling import LoginRateThrottle
 
 
 # Create your views here.
 @api_view(["POST"])
+@throttle_classes([LoginRateThrottle])
 def google_auth_callback(request):
 
     if request.method == "POST":
@@ -35,22 +37,12 @@ def google_auth_callback(request):
 
             employee = Employee.objects.get_or_create(user=clickup_user)[0]
             if userinfo_data.get("picture"):
-                response = requests.get(userinfo_data.get("picture"))
-                response.raise_for_status()
-
-                save_directory = f"employee/{employee._id}/"
-                os.makedirs(
-                    os.path.join(settings.MEDIA_ROOT, save_directory), exist_ok=True
+                # Downloaded by a worker, the login doesn't wait on Google
+                fetch_employee_photo.delay(
+                    employee_id=employee._id, url=userinfo_data.get("picture")
                 )
-                photo_path = f"{employee._id}_photo.jpg"
-                with open(
-                    os.path.join(settings.MEDIA_ROOT, save_directory, photo_path), "wb"
-                ) as photo:
-                    photo.write(response.content)
-                    employee.photo.name = save_directory + photo_path
-                    employee.save()
 
-            token = RefreshToken.for_user(user=clickup_user)
+            token = add_claims(ClickUpRefreshToken.for_user(user=clickup_user), employee)
 
             return Response(
                 {
@@ -58,7 +50,7 @@ def google_auth_callback(request):
                         "_id": employee._id,
                         "employeeName": employee.user.get_full_name(),
                         "employeeId": employee.employeeId,
-                        "photo": employee.photo.url,
+                        "photo": employee.photo.url if employee.photo else None,
                         "email": employee.user.email,
                         "accessToken": str(token.access_token), 
                     },
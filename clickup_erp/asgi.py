@@ -13,4 +13,21 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clickup_erp.settings')
 
-application = get_asgi_application()
+django_asgi_application = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import OriginValidator
+from django.conf import settings
+
+from clickup_auth.middleware import JWTAuthMiddleware
+from clickup_tickets.routing import websocket_urlpatterns
+
+application = ProtocolTypeRouter(
+    {
+        "http": django_asgi_application,
+        "websocket": OriginValidator(
+            JWTAuthMiddleware(URLRouter(websocket_urlpatterns)),
+            settings.CORS_ALLOWED_ORIGINS,
+        ),
+    }
+)
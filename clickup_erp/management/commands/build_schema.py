@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from clickup_utils.schema import SchemaArtifacts, fingerprint
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the OpenAPI schema served by /api/schema/ into "
+        "SCHEMA_ROOT, gzip and brotli compressed. Meant to run on deploy, "
+        "it is skipped when the code didn't change since the last build."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true")
+
+    def handle(self, *args, **options):
+        built = SchemaArtifacts.load(settings.SCHEMA_ROOT)
+        if not options["force"] and built and built.fingerprint == fingerprint():
+            self.stdout.write(f"Schema {built.digest} is up to date")
+            return
+
+        schema = SchemaArtifacts.generate()
+        schema.save(settings.SCHEMA_ROOT)
+        self.stdout.write(f"Schema {schema.digest} written to {settings.SCHEMA_ROOT}")
@@ -0,0 +1,204 @@
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from clickup_utils.fields import HexUUIDField
+
+
+# The hex form HexUUIDField reads back, anything else would change on the way
+HEX_ID = "^[0-9a-f]{32}$"
+
+
+def uuid_columns():
+    """
+    (table, column) of every HexUUIDField primary key and of every column
+    pointing at one: foreign keys of our apps, of contrib and third party
+    apps (admin log, token blacklist) and of the M2M through tables.
+    """
+    columns = set()
+    for model in apps.get_models(include_auto_created=True):
+        if model._meta.proxy or not model._meta.managed:
+            continue
+        for field in model._meta.local_concrete_fields:
+            target = field.target_field if field.remote_field else field
+            if isinstance(target, HexUUIDField):
+                columns.add((model._meta.db_table, field.column))
+    return columns
+
+
+class Command(BaseCommand):
+    help = (
+        "Converts the varchar hex primary keys, and the foreign key and M2M "
+        "columns referencing them, to native uuid columns on PostgreSQL. Run "
+        "it with PRIMARY_KEY_STORAGE=uuid while the app is down, then apply "
+        "the AlterField migrations makemigrations generates with --fake."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the ids and print the statements without running them.",
+        )
+
+    def handle(self, *args, **options):
+        if settings.PRIMARY_KEY_STORAGE != "uuid":
+            raise CommandError(
+                "Set PRIMARY_KEY_STORAGE=uuid, the models then declare the "
+                "keys this converts to."
+            )
+        connection = connections[options["database"]]
+        if connection.vendor != "postgresql":
+            raise CommandError(
+                f"{connection.vendor} stores UUIDField as char(32) hex, "
+                "there is nothing to convert."
+            )
+
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                columns = self.varchar_columns(cursor, uuid_columns())
+                if not columns:
+                    self.stdout.write("All the key columns are already uuid")
+                    return
+
+                self.validate(cursor, columns)
+                statements = self.statements(cursor, columns)
+                if options["dry_run"]:
+                    self.stdout.write(";\n".join(statements) + ";")
+                    transaction.set_rollback(True, using=connection.alias)
+                    return
+
+                for statement in statements:
+                    cursor.execute(statement)
+
+        tables = {table for table, _ in columns}
+        self.stdout.write(
+            f"{len(columns)} columns of {len(tables)} tables converted to uuid"
+        )
+
+    def varchar_columns(self, cursor, columns):
+        cursor.execute(
+            """
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = current_schema()
+                AND data_type IN ('character varying', 'character', 'text')
+            """
+        )
+        return sorted(columns.intersection(cursor.fetchall()))
+
+    def validate(self, cursor, columns):
+        """
+        Refuses to convert when a value isn't 32 lowercase hex digits:
+        PostgreSQL would accept dashes, braces or uppercase, but the id
+        read back would no longer match its copies in objectId, BoardCard
+        and the issued tokens.
+        """
+        quote = cursor.db.ops.quote_name
+        invalid = []
+        for table, column in columns:
+            cursor.execute(
+                f"SELECT count(*) FROM {quote(table)} "
+                f"WHERE {quote(column)} !~ %s",
+                [HEX_ID],
+            )
+            count = cursor.fetchone()[0]
+            if count:
+                invalid.append(f"{table}.{column}: {count} rows")
+        if invalid:
+            raise CommandError(
+                "Ids that aren't 32 lowercase hex digits, fix them first:\n"
+                + "\n".join(invalid)
+            )
+
+    def statements(self, cursor, columns):
+        """
+        The foreign keys on these columns are dropped, the columns of each
+        table converted in one ALTER TABLE (one rewrite per table), then
+        the foreign keys added back, which checks every converted row
+        still finds its target. The varchar_pattern_ops "_like" indexes
+        Django creates for LIKE lookups have no uuid equivalent and are
+        dropped; the primary key, unique and plain indexes are rebuilt by
+        the ALTER TABLE.
+        """
+        quote = cursor.db.ops.quote_name
+        wanted = set(columns)
+
+        cursor.execute(
+            """
+            SELECT source.relname, constraint_.conname,
+                pg_get_constraintdef(constraint_.oid),
+                ARRAY(
+                    SELECT attname FROM pg_attribute
+                    WHERE attrelid = constraint_.conrelid
+                        AND attnum = ANY(constraint_.conkey)
+                ),
+                target.relname,
+                ARRAY(
+                    SELECT attname FROM pg_attribute
+                    WHERE attrelid = constraint_.confrelid
+                        AND attnum = ANY(constraint_.confkey)
+                )
+            FROM pg_constraint constraint_
+            JOIN pg_class source ON source.oid = constraint_.conrelid
+            JOIN pg_class target ON target.oid = constraint_.confrelid
+            WHERE constraint_.contype = 'f'
+                AND pg_table_is_visible(constraint_.conrelid)
+            """
+        )
+        foreign_keys = [
+            (table, name, definition)
+            for table, name, definition, source_columns, target, target_columns
+            in cursor.fetchall()
+            if wanted.intersection((table, column) for column in source_columns)
+            or wanted.intersection((target, column) for column in target_columns)
+        ]
+
+        cursor.execute(
+            """
+            SELECT table_.relname, index_.relname,
+                ARRAY(
+                    SELECT attname FROM pg_attribute
+                    WHERE attrelid = table_.oid AND attnum = ANY(pg_index.indkey)
+                )
+            FROM pg_index
+            JOIN pg_class index_ ON index_.oid = pg_index.indexrelid
+            JOIN pg_class table_ ON table_.oid = pg_index.indrelid
+            WHERE pg_table_is_visible(table_.oid)
+                AND pg_get_indexdef(pg_index.indexrelid) LIKE '%pattern_ops%'
+            """
+        )
+        pattern_indexes = [
+            name
+            for table, name, index_columns in cursor.fetchall()
+            if wanted.intersection((table, column) for column in index_columns)
+        ]
+
+        by_table = defaultdict(list)
+        for table, column in columns:
+            by_table[table].append(column)
+
+        return [
+            *(
+                f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}"
+                for table, name, _ in foreign_keys
+            ),
+            *(f"DROP INDEX {quote(name)}" for name in pattern_indexes),
+            *(
+                f"ALTER TABLE {quote(table)} "
+                + ", ".join(
+                    f"ALTER COLUMN {quote(column)} TYPE uuid "
+                    f"USING {quote(column)}::uuid"
+                    for column in table_columns
+                )
+                for table, table_columns in by_table.items()
+            ),
+            *(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} "
+                f"{definition}"
+                for table, name, definition in foreign_keys
+            ),
+        ]
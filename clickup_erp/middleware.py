@@ -0,0 +1,143 @@
+from hashlib import sha1
+from time import monotonic
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from clickup_utils.budget import RequestBudget, budgeted_request
+from clickup_utils.budget import install_statement_timeout
+
+from .routers import read_database, healthy_replica
+
+
+def pin_key(request):
+    credentials = (
+        request.META.get("HTTP_AUTHORIZATION")
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get("REMOTE_ADDR", "")
+    )
+    return "replica-pin:" + sha1(credentials.encode()).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Routes the reads of safe-method requests to a healthy replica. A client
+    that just wrote is pinned to the primary for REPLICA_PIN_SECONDS so it
+    reads its own writes. The pins live in the default cache, which all the
+    workers have to share: a pin only another process sees would send the
+    client's next read to a replica that may not have the write yet.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if isinstance(caches["default"], (LocMemCache, DummyCache)):
+            raise ImproperlyConfigured(
+                "REPLICA_DATABASES needs a default cache shared by all the "
+                "workers to pin clients that wrote to the primary, set REDIS_URL."
+            )
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        key = pin_key(request)
+        is_safe = request.method in SAFE_METHODS
+
+        alias = None
+        if is_safe and not cache.get(key):
+            alias = healthy_replica()
+
+        token = read_database.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_database.reset(token)
+
+        if not is_safe:
+            cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        key = pin_key(request)
+        is_safe = request.method in SAFE_METHODS
+
+        alias = None
+        if is_safe and not await cache.aget(key):
+            alias = await sync_to_async(healthy_replica)()
+
+        # Context variables are copied into the threads running the sync
+        # code of the request, so the router sees the replica there too
+        token = read_database.set(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_database.reset(token)
+
+        if not is_safe:
+            await cache.aset(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+
+class RequestBudgetMiddleware:
+    """
+    Gives every request a RequestBudget from REQUEST_BUDGET and the view's
+    ``request_budget`` overrides: the statement_timeout is applied to the
+    PostgreSQL queries of the request by StatementTimeout and the row and
+    time budgets are charged by BudgetedListSerializer.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Only reads settings, no need for a thread
+            self.process_view = self.aprocess_view
+        # Connections opened before clickup_utils.budget was imported
+        for connection in connections.all(initialized_only=True):
+            install_statement_timeout(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        request.budget_started_at = monotonic()
+        token = budgeted_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            budgeted_request.reset(token)
+
+    async def __acall__(self, request):
+        request.budget_started_at = monotonic()
+        token = budgeted_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            budgeted_request.reset(token)
+
+    def assign_budget(self, request, view_func):
+        request.budget = RequestBudget.for_view(
+            getattr(view_func, "cls", None), request.budget_started_at
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.assign_budget(request, view_func)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.assign_budget(request, view_func)
@@ -0,0 +1,75 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections, DatabaseError
+
+
+# Replica chosen by ReplicaRoutingMiddleware for the current request, or
+# None when the request has to read from the primary
+read_database = ContextVar("read_database", default=None)
+
+_replica_lag = {}
+
+
+def measure_replica_lag(alias):
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+            "THEN 0 ELSE COALESCE("
+            "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+        )
+        return float(cursor.fetchone()[0])
+
+
+def replica_lag(alias):
+    """
+    Replication lag of ``alias`` in seconds, measured at most once every
+    REPLICA_LAG_CHECK_SECONDS per process. None if the replica is down.
+    """
+    checked_at, lag = _replica_lag.get(alias, (None, None))
+    if checked_at and time.monotonic() - checked_at < settings.REPLICA_LAG_CHECK_SECONDS:
+        return lag
+
+    try:
+        lag = measure_replica_lag(alias)
+    except DatabaseError:
+        lag = None
+    _replica_lag[alias] = (time.monotonic(), lag)
+    return lag
+
+
+def healthy_replica():
+    replicas = []
+    for alias in settings.REPLICA_DATABASES:
+        lag = replica_lag(alias)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS:
+            replicas.append(alias)
+
+    if replicas:
+        return random.choice(replicas)
+    return None
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the replica picked for the current request; everything
+    else goes to ``default``.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_database.get() or "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
@@ -14,7 +14,9 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
-from decouple import config
+import django
+from decouple import config, Csv
+from django.core.exceptions import ImproperlyConfigured
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,12 +45,16 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "corsheaders",
+    "channels",
     "rest_framework",
     "rest_framework_simplejwt.token_blacklist",
     "drf_spectacular",
     "clickup_auth",
     "clickup_projects",
     "clickup_tickets",
+    "clickup_activity",
+    "clickup_tasks",
+    "clickup_erp",
 ]
 
 MIDDLEWARE = [
@@ -60,6 +66,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "clickup_erp.middleware.RequestBudgetMiddleware",
 ]
 
 AUTH_USER_MODEL = "clickup_auth.ClickUpUser"
@@ -84,17 +91,68 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "clickup_erp.wsgi.application"
+ASGI_APPLICATION = "clickup_erp.asgi.application"
+
+# Serve the read-heavy endpoints with the async views, only worth it under ASGI
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
+
+# Serve the ticket board from the denormalized BoardCard rows. The rows are only
+# maintained while this is on, run `manage.py rebuild_board_cards` when enabling.
+BOARD_READ_MODEL = config("BOARD_READ_MODEL", default=False, cast=bool)
+
+# Ticket statuses counted as done by the analytics endpoint
+ANALYTICS_COMPLETED_STATUSES = config(
+    "ANALYTICS_COMPLETED_STATUSES", default="Completed", cast=Csv()
+)
+ANALYTICS_CACHE_SECONDS = config("ANALYTICS_CACHE_SECONDS", default=300, cast=int)
+
+# Longest date range the capacity endpoint computes in one request
+CAPACITY_MAX_DAYS = config("CAPACITY_MAX_DAYS", default=366, cast=int)
+
+# Rows fetched per query (and per prefetch) by the streaming exports
+EXPORT_CHUNK_SIZE = config("EXPORT_CHUNK_SIZE", default=2000, cast=int)
+
+# Most ids a bulk ticket or allocation update accepts in one request
+BULK_UPDATE_MAX_IDS = config("BULK_UPDATE_MAX_IDS", default=1000, cast=int)
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "clickup_auth.authentication.ClaimsJWTAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_RENDERER_CLASSES": [
         "clickup_projects.renderers.ClickUpResponeRenderer",
     ],
+    "EXCEPTION_HANDLER": "clickup_utils.budget.exception_handler",
+    "DEFAULT_THROTTLE_CLASSES": [
+        "clickup_utils.throttling.UserRateThrottle",
+        "clickup_utils.throttling.WriteRateThrottle",
+        "clickup_utils.throttling.ScopedRateThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "user": config("THROTTLE_USER_RATE", default="600/min"),
+        "write": config("THROTTLE_WRITE_RATE", default="120/min"),
+        "login": config("THROTTLE_LOGIN_RATE", default="10/min"),
+        "bulk": config("THROTTLE_BULK_RATE", default="30/min"),
+        "export": config("THROTTLE_EXPORT_RATE", default="10/min"),
+    },
+}
+
+# Cache holding the throttle counters, see clickup_utils.throttling. It has
+# to be shared by all the workers (Redis when REDIS_URL is set).
+THROTTLE_CACHE = config("THROTTLE_CACHE", default="default")
+
+# Per request limits, see clickup_utils.budget.RequestBudget. Views override
+# them with a request_budget dict; 0 disables a limit.
+REQUEST_BUDGET = {
+    "statement_timeout": config("REQUEST_STATEMENT_TIMEOUT_MS", default=10000, cast=int),
+    "max_rows": config("REQUEST_MAX_ROWS", default=10000, cast=int),
+    "seconds": config("REQUEST_SERIALIZATION_SECONDS", default=15, cast=float),
 }
 
+# Largest ?limit the paginated endpoints accept, bigger ones are clamped
+MAX_PAGE_SIZE = config("MAX_PAGE_SIZE", default=100, cast=int)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "ERP",
     "DESCRIPTION": "ClickUP",
@@ -102,26 +160,143 @@ SPECTACULAR_SETTINGS = {
     "SERVE_INCLUDE_SCHEMA": False,
 }
 
+# Directory build_schema writes the prebuilt OpenAPI documents to, served
+# by /api/schema/ while they match the code, see clickup_utils.schema
+SCHEMA_ROOT = config("SCHEMA_ROOT", default=str(BASE_DIR / "schema"))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=2),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_REFRESH_SERIALIZER": "clickup_auth.tokens.ClickUpTokenRefreshSerializer",
 }
 
+# Longest a process keeps its set of revoked refresh tokens without a
+# blacklist change, see clickup_auth.tokens
+REVOKED_TOKENS_SECONDS = config("REVOKED_TOKENS_SECONDS", default=300, cast=int)
+
+# How long a process reuses the user and employee rows behind the access
+# token claims, see clickup_auth.authentication
+AUTH_CACHE_SECONDS = config("AUTH_CACHE_SECONDS", default=60, cast=int)
+
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+DB_ENGINE = config("DB_ENGINE", default="django.db.backends.postgresql")
+
+# Persistent connections are reused for DB_CONN_MAX_AGE seconds and checked
+# before reuse. DB_POOL_MAX_SIZE > 0 switches to psycopg's connection pool
+# instead (Django 5.1+, PostgreSQL only), which requires CONN_MAX_AGE = 0.
+DB_POOL_MAX_SIZE = config("DB_POOL_MAX_SIZE", default=0, cast=int)
+
+DB_OPTIONS = {}
+
+# Connection wide statement_timeout (PostgreSQL) in milliseconds for the
+# queries outside of requests (tasks, commands); 0 leaves it to the server.
+# Requests use REQUEST_BUDGET["statement_timeout"].
+DB_STATEMENT_TIMEOUT_MS = config("DB_STATEMENT_TIMEOUT_MS", default=0, cast=int)
+if DB_STATEMENT_TIMEOUT_MS and "postgresql" in DB_ENGINE:
+    DB_OPTIONS["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+if DB_POOL_MAX_SIZE:
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured(
+            f"DB_POOL_MAX_SIZE needs Django 5.1+, this is {django.get_version()}."
+        )
+    DB_OPTIONS["pool"] = {
+        "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+        "max_size": DB_POOL_MAX_SIZE,
+        "timeout": config("DB_POOL_TIMEOUT", default=10, cast=int),
+    }
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": DB_ENGINE,
         "NAME": config("DB_NAME"),
         "USER": config("DB_USER"),
         "PASSWORD": config("DB_PASSWORD"),
         "HOST": config("DB_HOST"),
         "PORT": config("DB_PORT"),
+        "CONN_MAX_AGE": 0 if DB_POOL_MAX_SIZE else config("DB_CONN_MAX_AGE", default=60, cast=int),
+        "CONN_HEALTH_CHECKS": config("DB_CONN_HEALTH_CHECKS", default=True, cast=bool),
+        "OPTIONS": DB_OPTIONS,
     }
 }
 
+# Optional read replicas, safe-method requests read from them unless the
+# client wrote recently (REPLICA_PIN_SECONDS) or the replica lags behind
+# more than REPLICA_MAX_LAG_SECONDS. Clients are pinned in the default cache,
+# which every worker has to see: without REDIS_URL it is a per process
+# LocMemCache and ReplicaRoutingMiddleware refuses to start.
+DB_REPLICA_HOSTS = config("DB_REPLICA_HOSTS", default="", cast=Csv())
+DB_REPLICA_NAMES = config("DB_REPLICA_NAMES", default="", cast=Csv())
+
+REPLICA_PIN_SECONDS = config("REPLICA_PIN_SECONDS", default=5, cast=int)
+REPLICA_MAX_LAG_SECONDS = config("REPLICA_MAX_LAG_SECONDS", default=10, cast=int)
+REPLICA_LAG_CHECK_SECONDS = config("REPLICA_LAG_CHECK_SECONDS", default=5, cast=int)
+
+REPLICA_DATABASES = []
+DATABASE_ROUTERS = []
+
+for index in range(max(len(DB_REPLICA_HOSTS), len(DB_REPLICA_NAMES))):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": DB_REPLICA_NAMES[index]
+        if index < len(DB_REPLICA_NAMES)
+        else DATABASES["default"]["NAME"],
+        "HOST": DB_REPLICA_HOSTS[index]
+        if index < len(DB_REPLICA_HOSTS)
+        else DATABASES["default"]["HOST"],
+        "PORT": config("DB_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+if REPLICA_DATABASES:
+    DATABASE_ROUTERS.append("clickup_erp.routers.ReplicaRouter")
+    MIDDLEWARE.append("clickup_erp.middleware.ReplicaRoutingMiddleware")
+
+
+# Channel layers
+# https://channels.readthedocs.io/en/stable/topics/channel_layers.html
+
+REDIS_URL = config("REDIS_URL", default="")
+
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [REDIS_URL],
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -159,6 +334,24 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Storage of the models' "_id" primary keys: "char" keeps the 32-char hex
+# varchar, "uuid" stores a native UUID while the API still sees the hex string.
+# Switching an existing PostgreSQL database to "uuid" goes through the
+# convert_primary_keys command, then migrate --fake.
+PRIMARY_KEY_STORAGE = config("PRIMARY_KEY_STORAGE", default="char")
+
+# Generator of new "_id" values, clickup_utils.ids.uuid7_hex gives time-ordered
+# ids that keep inserts at the end of the primary key indexes.
+ID_GENERATOR = config("ID_GENERATOR", default="clickup_utils.ids.uuid4_hex")
+
+# Background tasks
+# DatabaseBackend queues jobs for `manage.py run_worker`, ThreadPoolBackend runs
+# them in the web process and is meant for tests and local development.
+
+TASK_BACKEND = config("TASK_BACKEND", default="clickup_tasks.backends.DatabaseBackend")
+
+TASK_THREAD_POOL_SIZE = config("TASK_THREAD_POOL_SIZE", default=4, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
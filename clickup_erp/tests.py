@@ -0,0 +1,276 @@
+import os
+from tempfile import gettempdir
+from unittest import mock, skipUnless
+from uuid import UUID
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import (
+    AsyncClient,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from clickup_auth.authentication import add_claims
+from clickup_auth.models import ClickUpUser
+from clickup_auth.tokens import ClickUpRefreshToken
+from clickup_projects.models import Employee, Project
+from clickup_utils.budget import RequestBudget
+from clickup_utils.ids import uuid7_hex
+from clickup_utils.throttling import (
+    ScopedRateThrottle,
+    SlidingWindowThrottle,
+    UserRateThrottle,
+)
+
+from .middleware import ReplicaRoutingMiddleware, RequestBudgetMiddleware, pin_key
+from .routers import _replica_lag, read_database
+
+
+def statement_timeout():
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW statement_timeout")
+        return cursor.fetchone()[0]
+
+
+def with_budget(request):
+    request.budget = RequestBudget(statement_timeout=1234, max_rows=0, seconds=0)
+
+
+@skipUnless(connection.vendor == "postgresql", "statement_timeout is PostgreSQL only")
+class RequestBudgetMiddlewareTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+
+    def test_sync_requests_get_the_statement_timeout(self):
+        def view(request):
+            with_budget(request)
+            return HttpResponse(statement_timeout())
+
+        response = RequestBudgetMiddleware(view)(self.request)
+
+        self.assertEqual(response.content, b"1234ms")
+        self.assertEqual(statement_timeout(), "0")
+
+    def test_async_requests_get_the_statement_timeout(self):
+        async def view(request):
+            with_budget(request)
+            return HttpResponse(await sync_to_async(statement_timeout)())
+
+        response = async_to_sync(RequestBudgetMiddleware(view))(self.request)
+
+        self.assertEqual(response.content, b"1234ms")
+        self.assertEqual(statement_timeout(), "0")
+
+    def test_statement_timeout_is_only_set_when_it_changes(self):
+        def view(request):
+            with_budget(request)
+            return HttpResponse(statement_timeout())
+
+        middleware = RequestBudgetMiddleware(view)
+        middleware(self.request)
+        with CaptureQueriesContext(connection) as queries:
+            response = middleware(RequestFactory().get("/"))
+
+        self.assertEqual(response.content, b"1234ms")
+        self.assertEqual(
+            [query["sql"] for query in queries], ["SHOW statement_timeout"]
+        )
+
+    def test_statement_timeout_is_set_again_after_a_rollback(self):
+        def view(request):
+            with transaction.atomic():
+                with_budget(request)
+                statement_timeout()
+                transaction.set_rollback(True)
+            return HttpResponse(statement_timeout())
+
+        response = RequestBudgetMiddleware(view)(self.request)
+
+        self.assertEqual(response.content, b"1234ms")
+
+
+class AsyncRequestBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+        employee = Employee.objects.create(user=user)
+        cls.token = str(
+            add_claims(ClickUpRefreshToken.for_user(user), employee).access_token
+        )
+        for index in range(2):
+            Project.objects.create(
+                name=f"Project {index}", erpId=index, shortCode=f"PR{index}"
+            )
+
+    def test_async_handler_charges_the_view_budget(self):
+        with override_settings(
+            REQUEST_BUDGET={**settings.REQUEST_BUDGET, "max_rows": 1}
+        ):
+            response = async_to_sync(AsyncClient().get)(
+                "/api/project/list", headers={"authorization": f"Bearer {self.token}"}
+            )
+
+        self.assertEqual(response.status_code, 422)
+
+
+# A cache the workers share, the pins can't live in LocMemCache
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.path.join(gettempdir(), "clickup-erp-tests-cache"),
+        }
+    }
+)
+class ReplicaRoutingMiddlewareTests(TestCase):
+    def tearDown(self):
+        cache.clear()
+        _replica_lag.clear()
+
+    def test_refuses_to_start_without_a_shared_cache(self):
+        with self.settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+                }
+            }
+        ):
+            with self.assertRaises(ImproperlyConfigured):
+                ReplicaRoutingMiddleware(lambda request: HttpResponse())
+
+    @override_settings(REPLICA_DATABASES=["default"])
+    def test_async_reads_are_routed_to_the_replica(self):
+        async def view(request):
+            return HttpResponse(await sync_to_async(read_database.get)())
+
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION="Bearer token")
+        response = async_to_sync(ReplicaRoutingMiddleware(view))(request)
+
+        self.assertEqual(response.content, b"default")
+
+    @override_settings(REPLICA_DATABASES=["default"])
+    def test_async_writes_pin_the_client_to_the_primary(self):
+        async def view(request):
+            return HttpResponse()
+
+        request = RequestFactory().post("/", HTTP_AUTHORIZATION="Bearer token")
+        response = async_to_sync(ReplicaRoutingMiddleware(view))(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(cache.get(pin_key(request)))
+
+
+class ThrottleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            ClickUpUser.objects.create_user(
+                f"user{index}", "password", f"user{index}@example.com"
+            )
+            for index in range(2)
+        ]
+
+    def tearDown(self):
+        caches[settings.THROTTLE_CACHE].clear()
+
+    def request(self, user=None, ip="10.0.0.1"):
+        request = Request(APIRequestFactory().get("/", REMOTE_ADDR=ip))
+        request.user = user or AnonymousUser()
+        return request
+
+    def test_the_previous_window_counts_by_its_overlap(self):
+        class Throttle(UserRateThrottle):
+            rate = "4/min"
+
+        request = self.request(self.users[0])
+        start = 1000 * 60
+        with mock.patch("clickup_utils.throttling.time") as time:
+            # A full window, the fifth request waits for the next one
+            time.return_value = start + 15
+            for _ in range(4):
+                self.assertTrue(Throttle().allow_request(request, None))
+            throttle = Throttle()
+            self.assertFalse(throttle.allow_request(request, None))
+            self.assertAlmostEqual(throttle.wait(), 45)
+
+            # Right at the rollover the previous window still counts fully
+            time.return_value = start + 60
+            self.assertFalse(Throttle().allow_request(request, None))
+
+            # A second later 4 * 59/60 leaves room for one request, the next
+            # one waits until 4 * (1 - elapsed) + 1 drops below 4
+            time.return_value = start + 61
+            self.assertTrue(Throttle().allow_request(request, None))
+            throttle = Throttle()
+            self.assertFalse(throttle.allow_request(request, None))
+            self.assertAlmostEqual(throttle.wait(), 14)
+
+            time.return_value = start + 76
+            self.assertTrue(Throttle().allow_request(request, None))
+            self.assertFalse(Throttle().allow_request(request, None))
+
+            # In the window after, only the two requests of the last one count
+            time.return_value = start + 120
+            for _ in range(2):
+                self.assertTrue(Throttle().allow_request(request, None))
+            self.assertFalse(Throttle().allow_request(request, None))
+
+    def test_users_are_counted_per_user_and_anonymous_requests_per_ip(self):
+        class Throttle(UserRateThrottle):
+            rate = "1/min"
+
+        for first, second in [
+            # Same IP address, different users
+            (self.request(self.users[0]), self.request(self.users[1])),
+            (self.request(ip="10.0.0.2"), self.request(ip="10.0.0.3")),
+        ]:
+            self.assertTrue(Throttle().allow_request(first, None))
+            self.assertFalse(Throttle().allow_request(first, None))
+            self.assertTrue(Throttle().allow_request(second, None))
+
+    def test_scoped_views_share_a_limit_per_scope(self):
+        class BulkView:
+            throttle_scope = "bulk"
+
+        class ExportView:
+            throttle_scope = "export"
+
+        request = self.request(self.users[0])
+        rates = {"bulk": "1/min", "export": "1/min"}
+        with mock.patch.object(SlidingWindowThrottle, "THROTTLE_RATES", rates):
+            self.assertTrue(ScopedRateThrottle().allow_request(request, BulkView()))
+            self.assertFalse(ScopedRateThrottle().allow_request(request, BulkView()))
+            self.assertTrue(ScopedRateThrottle().allow_request(request, ExportView()))
+            # Views without a scope aren't limited by it
+            self.assertTrue(ScopedRateThrottle().allow_request(request, object()))
+
+
+class Uuid7Tests(SimpleTestCase):
+    def assertIncreasingUuid7(self, ids):
+        self.assertEqual(len(set(ids)), len(ids))
+        for id in ids:
+            self.assertRegex(id, "^[0-9a-f]{32}$")
+            self.assertEqual(UUID(id).version, 7)
+        self.assertTrue(all(a < b for a, b in zip(ids, ids[1:])))
+
+    def test_ids_strictly_increase_within_a_process(self):
+        self.assertIncreasingUuid7([uuid7_hex() for _ in range(10000)])
+
+    def test_ids_keep_increasing_past_the_counter_within_a_millisecond(self):
+        with mock.patch("clickup_utils.ids.time") as time:
+            time.time_ns.return_value = 1_700_000_000_000_000_000
+            # More than the 4096 values of the 12 bit counter
+            self.assertIncreasingUuid7([uuid7_hex() for _ in range(5000)])
@@ -16,17 +16,26 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
+
+from clickup_utils.schema import CachedSchemaView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("clickup_auth.urls")),
     path("api/", include("clickup_projects.urls")),
     path("api/", include("clickup_tickets.urls")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/", include("clickup_activity.urls")),
+    path("api/", include("clickup_tasks.urls")),
+    path("api/schema/", CachedSchemaView.as_view(), name="schema"),
+    re_path(
+        r"^api/schema/(?P<digest>[0-9a-f]{16})/$",
+        CachedSchemaView.as_view(),
+        name="schema-digest",
+    ),
     path(
         "api/schema/swagger-ui/",
         SpectacularSwaggerView.as_view(url_name="schema"),
@@ -7,20 +7,21 @@ from django.db.models import (
     BooleanField,
     DateTimeField,
     DurationField,
+    JSONField,
 )
 from django.core.validators import RegexValidator
 from django.db.models import ForeignKey, ManyToManyField, OneToOneField, CASCADE
 from django.utils.timezone import timedelta
 
-from clickup_utils.utils import generate_uuid, image_upload_path
+from clickup_utils.utils import image_upload_path
+from clickup_utils.fields import primary_key_field
 from clickup_auth.models import ClickUpUser
+from clickup_activity.models import ChangeTrackedModel
 
 
 # Create your models here.
 class Jokes(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     joke = TextField()
 
     def __str__(self) -> str:
@@ -28,22 +29,20 @@ class Jokes(Model):
 
 
 class Project(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     name = CharField()
     erpId = IntegerField()
     shortCode = CharField(max_length=3)
     logo = ImageField(upload_to=image_upload_path, default="", blank=True)
+    # WebP thumbnails of the logo, see clickup_utils.images
+    logoDerivatives = JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self) -> str:
         return self.name
 
 
-class Lists(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+class Lists(ChangeTrackedModel):
+    _id = primary_key_field()
     name = CharField()
     project = ForeignKey(Project, on_delete=CASCADE, related_name="lists")
 
@@ -51,10 +50,8 @@ class Lists(Model):
         return self.name
 
 
-class Folders(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+class Folders(ChangeTrackedModel):
+    _id = primary_key_field()
     name = CharField()
     project = ForeignKey(Project, on_delete=CASCADE, related_name="folders")
     list = ManyToManyField(Lists, blank=True, related_name="folders")
@@ -63,14 +60,12 @@ class Folders(Model):
         return self.name
 
 
-class Sprints(Model):
+class Sprints(ChangeTrackedModel):
     SPRINT_STATUS = {
         "isActive": "IsActive",
         "Completed": "Completed",
     }
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     name = CharField()
     active = BooleanField(default=True)
     status = CharField(choices=SPRINT_STATUS, default="isActive")
@@ -81,9 +76,7 @@ class Sprints(Model):
 
 
 class ProjectIcons(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     colorCode = CharField(
         max_length=7,
         validators=[
@@ -102,9 +95,7 @@ class ProjectIcons(Model):
 
 
 class Department(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     name = CharField()
 
     def __str__(self) -> str:
@@ -112,9 +103,7 @@ class Department(Model):
 
 
 class Role(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     name = CharField()
     department = ForeignKey(Department, on_delete=CASCADE)
 
@@ -123,9 +112,7 @@ class Role(Model):
 
 
 class Skill(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     name = CharField()
 
     def __str__(self) -> str:
@@ -133,9 +120,7 @@ class Skill(Model):
 
 
 class Education(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     name = CharField()
 
     def __str__(self) -> str:
@@ -157,12 +142,12 @@ class Employee(Model):
         "OFF": "OFF",
     }
 
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     user = OneToOneField(ClickUpUser, on_delete=CASCADE, related_name="employee")
     employeeId = CharField(default="")
     photo = ImageField(null=True, blank=True)
+    # WebP thumbnails of the photo, see clickup_utils.images
+    photoDerivatives = JSONField(default=dict, blank=True, editable=False)
     role = ForeignKey(Role, on_delete=CASCADE, null=True, blank=True)
     skillSet = ManyToManyField(Skill, blank=True)
     theme = CharField(choices=THEMES_MODE, default="light")
@@ -177,9 +162,7 @@ class Employee(Model):
 
 
 class TeamMember(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     user = OneToOneField(Employee, on_delete=CASCADE, related_name="team_member")
     allocationHours = DurationField(default=timedelta(hours=1))
     lastWorked = DateTimeField(null=True, blank=True)
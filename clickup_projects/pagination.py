@@ -1,9 +1,11 @@
+from django.conf import settings
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
 
 class ClickUpPagination(PageNumberPagination):
     page_size_query_param = "limit"
+    max_page_size = settings.MAX_PAGE_SIZE
 
     def get_paginated_response(self, data):
         return Response(
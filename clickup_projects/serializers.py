@@ -1,4 +1,9 @@
-from rest_framework.serializers import ModelSerializer, Serializer
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+from rest_framework.serializers import ModelSerializer, Serializer, ListSerializer
 from rest_framework.serializers import (
     SerializerMethodField,
     CharField,
@@ -10,6 +15,9 @@ from rest_framework.serializers import (
 
 from rest_framework.serializers import ValidationError
 
+from clickup_activity.signals import objects_changed
+from clickup_utils.budget import BudgetedListSerializer
+from clickup_utils.serializers import SparseFieldsetMixin, ThumbnailsField
 from clickup_utils.validators import check_name, check_date_range
 
 from .models import (
@@ -39,6 +47,8 @@ class ListsSerializer(ModelSerializer):
         )
         
     def get_ticketCount(self, list):
+        if hasattr(list, "ticket_count"):
+            return list.ticket_count
         return list.ticket_list.count()
 
 
@@ -72,6 +82,8 @@ class SprintsSerializer(ModelSerializer):
         )
         
     def get_ticketCounts(self, sprint):
+        if hasattr(sprint, "ticket_count"):
+            return sprint.ticket_count
         return sprint.ticket_sprint.count()
 
 class SprintAddSerializer(Serializer):
@@ -93,9 +105,68 @@ class FoldersSerializer(ModelSerializer):
         )
 
 
+class FoldersBulkCreateSerializer(ListSerializer):
+    """
+    Creates several folders with their lists in one transaction: one INSERT
+    for the folders, one for the lists and one for the folder-list rows.
+    """
+
+    def validate(self, attrs):
+        if not attrs:
+            raise ValidationError("At least one folder is required.")
+
+        names = set()
+        for folder in attrs:
+            key = (folder["project"].pk, folder["name"])
+            if key in names:
+                raise ValidationError(f"Folder {folder['name']} is repeated.")
+            names.add(key)
+
+        existing = Folders.objects.filter(
+            reduce(or_, (Q(project=project, name=name) for project, name in names))
+        ).values_list("name", flat=True)
+        if existing:
+            raise ValidationError(f"Folder {', '.join(existing)} already exist.")
+        return attrs
+
+    def create(self, validated_data):
+        folders = []
+        folder_lists = []
+        through = Folders.list.through
+        with transaction.atomic():
+            for data in validated_data:
+                folder = Folders(name=data["name"], project=data["project"])
+                folders.append(folder)
+                for list_name in data["list"]["name"]:
+                    folder_lists.append(
+                        (folder, Lists(name=list_name, project=data["project"]))
+                    )
+
+            Folders.objects.bulk_create(folders)
+            Lists.objects.bulk_create([folder_list for _, folder_list in folder_lists])
+            through.objects.bulk_create(
+                [
+                    through(folders_id=folder.pk, lists_id=folder_list.pk)
+                    for folder, folder_list in folder_lists
+                ]
+            )
+
+            objects_changed.send(
+                sender=Folders,
+                object_ids=[folder.pk for folder in folders],
+                action="create",
+            )
+            objects_changed.send(
+                sender=Lists,
+                object_ids=[folder_list.pk for _, folder_list in folder_lists],
+                action="create",
+            )
+        return folders
+
+
 class FoldersBulkUpdateSerializer(ModelSerializer):
     name = CharField(validators=[check_name])
-    lists = ListField(child=CharField(), source="list.name")
+    lists = ListField(child=CharField(validators=[check_name]), source="list.name")
 
     class Meta:
         model = Folders
@@ -105,15 +176,15 @@ class FoldersBulkUpdateSerializer(ModelSerializer):
             "project",
             "lists",
         )
+        list_serializer_class = FoldersBulkCreateSerializer
+
+    def validate_lists(self, value):
+        if len(set(value)) != len(value):
+            raise ValidationError("List names should be unique within a folder.")
+        return value
 
     def create(self, validated_data):
-        lists = validated_data.pop("list").get("name")
-        project = validated_data.get("project")
-        folder = Folders.objects.create(**validated_data)
-        for list_name in lists:
-            folder_list = Lists.objects.create(name=list_name, project=project)
-            folder.list.add(folder_list)
-        return folder
+        return FoldersBulkCreateSerializer(child=self).create([validated_data])[0]
 
 
 class FoldersUpdateSerializer(ModelSerializer):
@@ -146,11 +217,12 @@ class FoldersUpdateSerializer(ModelSerializer):
         return value
 
 
-class ProjectSerializer(ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, ModelSerializer):
     name = CharField(validators=[check_name])
     sprint = SprintsSerializer(many=True)
     folders = SerializerMethodField()
     lists = SerializerMethodField()
+    logoThumbnails = ThumbnailsField(source="logo")
 
     class Meta:
         model = Project
@@ -160,21 +232,28 @@ class ProjectSerializer(ModelSerializer):
             "erpId",
             "shortCode",
             "logo",
+            "logoThumbnails",
             "sprint",
             "folders",
             "lists",
         )
+        expandable = ("sprint", "folders", "lists")
+        list_serializer_class = BudgetedListSerializer
 
     def get_folders(self, project):
-        folders = project.folders.all()
+        if "folders" in self.context:
+            folders = self.context["folders"].get(project._id, [])
+        else:
+            folders = project.folders.all()
         return FoldersSerializer(folders, many=True).data
 
     def get_lists(self, project):
-        all_lists = project.lists.all()
-        lists_in_folders = project.lists.filter(folders__isnull=False).distinct()
-        lists_not_in_folder = all_lists.exclude(
-            _id__in=lists_in_folders.values_list("_id", flat=True),
-        )
+        if "lists" in self.context:
+            lists = self.context["lists"].get(project._id, [])
+            return ListsSerializer(lists, many=True).data
+
+        # Without the views' precomputed membership, one anti-join per project
+        lists_not_in_folder = project.lists.filter(folders__isnull=True)
         return ListsSerializer(lists_not_in_folder, many=True).data
 
 
@@ -214,12 +293,13 @@ class EmployeeSerializer(ModelSerializer):
         fields = "__all__"
 
 
-class TeamMemberSerializer(ModelSerializer):
+class TeamMemberSerializer(SparseFieldsetMixin, ModelSerializer):
     userId = CharField(source="user._id")
     role = CharField(source="user.role._id")
     user = CharField(source="user.user.get_full_name")
     employeeName = CharField(source="user.user.get_full_name")
     photo = ImageField(source="user.photo")
+    photoThumbnails = ThumbnailsField(source="user.photo")
     allocationHours = SerializerMethodField()
     department = CharField(source="user.role.department.name")
     roleName = CharField(source="user.role.name")
@@ -242,6 +322,7 @@ class TeamMemberSerializer(ModelSerializer):
             "user",
             "employeeName",
             "photo",
+            "photoThumbnails",
             "allocationHours",
             "department",
             "roleName",
@@ -256,6 +337,7 @@ class TeamMemberSerializer(ModelSerializer):
             "performanceIndex",
             "qualityIndex",
         )
+        list_serializer_class = BudgetedListSerializer
 
     def get_allocationHours(self, team_member):
         total_seconds = team_member.allocationHours.total_seconds()
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Project, Employee
+from .tasks import generate_image_derivatives
+
+
+def queue_derivatives(instance, field):
+    field_file = getattr(instance, field)
+    derivatives = getattr(instance, f"{field}Derivatives")
+    if (field_file.name or "") != derivatives.get("source", ""):
+        generate_image_derivatives.delay(
+            model=instance._meta.label, object_id=instance.pk, field=field
+        )
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_derivatives(instance, "logo")
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue_derivatives(instance, "photo")
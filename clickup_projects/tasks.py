@@ -0,0 +1,65 @@
+from django.apps import apps
+from django.db import transaction
+from django.utils.dateparse import parse_date
+from django.utils.timezone import timedelta
+
+from clickup_activity.signals import objects_changed
+from clickup_tasks.registry import task
+from clickup_utils.images import generate_derivatives
+
+from .models import Project, Sprints
+
+
+def skip_weekend(start_date, sprint_duration):
+    end_date = start_date
+    for i in range(sprint_duration - 1):
+        date = end_date + timedelta(days=1)
+        while date.weekday() in [5, 6]:
+            date += timedelta(days=1)
+        end_date = date
+    return end_date
+
+
+@task
+def generate_sprints(project_id, number_of_sprints, sprint_duration, start_date):
+    project = Project.objects.get(_id=project_id)
+    start_date = parse_date(start_date)
+
+    with transaction.atomic():
+        last_sprint = (
+            project.sprint.select_for_update().order_by("created_at").last()
+        )
+        if last_sprint:
+            last_sprint_no = int(last_sprint.name.split(" ")[1])
+        else:
+            last_sprint_no = 0
+
+        sprint_list = []
+        for i in range(number_of_sprints):
+            end_date = skip_weekend(start_date, sprint_duration)
+            last_sprint_no += 1
+            sprint_list.append(
+                Sprints.objects.create(
+                    name=f"Sprint {last_sprint_no} ({start_date.strftime('%d-%m-%Y')}/{end_date.strftime('%d-%m-%Y')})",
+                    project=project,
+                )
+            )
+            start_date = end_date + timedelta(days=1)
+
+    return [sprint._id for sprint in sprint_list]
+
+
+@task
+def generate_image_derivatives(model, object_id, field):
+    model = apps.get_model(model)
+    instance = model.objects.get(pk=object_id)
+    field_file = getattr(instance, field)
+    derivatives = generate_derivatives(field_file) if field_file else {}
+
+    # Skipped if the file was replaced meanwhile, its own job handles it
+    updated = model.objects.filter(pk=object_id, **{field: field_file.name}).update(
+        **{f"{field}Derivatives": derivatives}
+    )
+    if updated:
+        objects_changed.send(sender=model, object_ids=[object_id], action="update")
+    return derivatives
@@ -1,3 +1,95 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from clickup_activity.models import AuditEvent
+from clickup_auth.models import ClickUpUser
+from clickup_tickets.models import Ticket
+
+from .models import Employee, Folders, Lists, Project, Sprints
+
+
+class ProjectListQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+        # Several projects with sprints, folders and loose lists, so a query
+        # per row would show in the counts
+        for index in range(3):
+            project = Project.objects.create(
+                name=f"Project {index}", erpId=index, shortCode=f"PR{index}"
+            )
+            for item in range(2):
+                Sprints.objects.create(name=f"Sprint {item}", project=project)
+                folder = Folders.objects.create(name=f"Folder {item}", project=project)
+                folder.list.add(
+                    Lists.objects.create(name=f"Folder list {item}", project=project)
+                )
+                Lists.objects.create(name=f"List {item}", project=project)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_project_list_queries_follow_the_selection(self):
+        # Sets the budget's statement_timeout on PostgreSQL, the connection
+        # keeps it for the following requests
+        self.client.get("/api/project/list")
+
+        # The projects, then the sprints, the folders with their lists and the
+        # loose lists with the folder membership, as selected
+        for params, queries in [
+            ({}, 6),
+            ({"expand": ""}, 1),
+            ({"expand": "sprint"}, 2),
+            ({"expand": "folders"}, 3),
+            ({"expand": "lists"}, 3),
+            ({"fields": "_id,name"}, 1),
+            ({"fields": "_id,sprint._id"}, 2),
+            ({"fields": "_id,folders"}, 3),
+            ({"fields": "_id,lists"}, 3),
+        ]:
+            with self.subTest(**params):
+                with self.assertNumQueries(queries):
+                    response = self.client.get("/api/project/list", params)
+                self.assertEqual(response.status_code, 200)
+
+
+class DestroyActorTests(TestCase):
+    def setUp(self):
+        self.user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+        self.project = Project.objects.create(name="Project", erpId=1, shortCode="PRJ")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def deleted_ticket_actors(self):
+        """
+        Deletes a sprint and a list holding a ticket each, and returns the
+        actor of each ticket's delete event.
+        """
+        sprint = Sprints.objects.create(name="Sprint", project=self.project)
+        list = Lists.objects.create(name="List", project=self.project)
+        actors = []
+        for path, fields in [
+            (f"/api/sprint/{sprint._id}/", {"sprint": sprint}),
+            (f"/api/list/{list._id}/", {"list": list}),
+        ]:
+            ticket = Ticket.objects.create(
+                type="task", title="Ticket", description="", **fields
+            )
+            response = self.client.delete(path)
+            self.assertEqual(response.status_code, 200, path)
+            event = AuditEvent.objects.get(objectId=ticket._id, action="delete")
+            actors.append(event.actor)
+        return actors
+
+    def test_list_and_sprint_deletes_record_the_employee(self):
+        employee = Employee.objects.create(user=self.user)
+
+        self.assertEqual(self.deleted_ticket_actors(), [employee, employee])
+
+    def test_list_and_sprint_deletes_without_an_employee(self):
+        self.assertEqual(self.deleted_ticket_actors(), [None, None])
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
@@ -11,6 +12,9 @@ from .views import (
     RoleViewSet,
     EmployeeViewSet,
     TeamMemberView,
+    ProjectAsyncView,
+    ProjectIconsAsyncView,
+    TeamMemberAsyncView,
 )
 
 
@@ -21,10 +25,19 @@ router.register("folder", FoldersViewSet, basename="folder")
 router.register("role", RoleViewSet, basename="role")
 router.register("employee", EmployeeViewSet, basename="employee")
 
+if settings.ASYNC_VIEWS:
+    project_icons_view = ProjectIconsAsyncView.as_view()
+    project_view = ProjectAsyncView.as_view()
+    team_member_view = TeamMemberAsyncView.as_view()
+else:
+    project_icons_view = ProjectIconsView.as_view()
+    project_view = ProjectView.as_view()
+    team_member_view = TeamMemberView.as_view()
+
 urlpatterns = [
     path("jokes", JokesView.as_view(), name="jokes"),
-    path("projectIcons", ProjectIconsView.as_view(), name="projectIcons"),
-    path("project/list", ProjectView.as_view(), name="project"),
-    path("team-member", TeamMemberView.as_view(), name="team-member"),
+    path("projectIcons", project_icons_view, name="projectIcons"),
+    path("project/list", project_view, name="project"),
+    path("team-member", team_member_view, name="team-member"),
     path("", include(router.urls)),
 ]
@@ -1,4 +1,5 @@
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime
 
 from rest_framework.generics import ListAPIView, CreateAPIView
 from rest_framework.viewsets import ModelViewSet
@@ -6,10 +7,16 @@ from rest_framework.response import Response
 from rest_framework.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
+    HTTP_202_ACCEPTED,
     HTTP_400_BAD_REQUEST,
     HTTP_204_NO_CONTENT,
 )
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Prefetch, Count, Q
+
+from adrf.views import APIView as AsyncAPIView
 
 from drf_spectacular.utils import (
     extend_schema,
@@ -30,6 +37,7 @@ from .models import (
     TeamMember,
 )
 
+from .tasks import generate_sprints
 from .serializers import (
     ListsSerializer,
     ListsUpdateSerializer,
@@ -45,6 +53,44 @@ from .serializers import (
     EmployeeSerializer,
     TeamMemberSerializer,
 )
+from clickup_tasks.serializers import JobSerializer
+from clickup_tickets.models import Ticket
+from clickup_utils.serializers import sparse_includes
+from clickup_utils.utils import aevaluate, request_actor
+
+
+def annotated_sprints():
+    return Sprints.objects.annotate(
+        ticket_count=Count(
+            "ticket_sprint", filter=Q(ticket_sprint__deletedAt__isnull=True)
+        )
+    )
+
+
+def annotated_lists():
+    return Lists.objects.annotate(
+        ticket_count=Count("ticket_list", filter=Q(ticket_list__deletedAt__isnull=True))
+    )
+
+
+def folder_membership(folders, lists, lists_in_folders):
+    """
+    Groups the folders and the lists that are in no folder by project, for
+    the "folders" and "lists" context of ProjectSerializer. Membership is a
+    set lookup over the folder-list through rows instead of a join per
+    project.
+    """
+    lists_in_folders = set(lists_in_folders)
+    folders_by_project = {}
+    for folder in folders:
+        folders_by_project.setdefault(folder.project_id, []).append(folder)
+    lists_by_project = {}
+    for project_list in lists:
+        if project_list._id not in lists_in_folders:
+            lists_by_project.setdefault(project_list.project_id, []).append(
+                project_list
+            )
+    return folders_by_project, lists_by_project
 
 
 # Create your views here.
@@ -62,6 +108,13 @@ class ListsViewSet(ModelViewSet):
 
         return ListsUpdateSerializer
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Tickets are soft deleted and detached, the purge removes them later
+        instance.ticket_list.soft_delete(request_actor(self.request))
+        Ticket.all_objects.filter(list=instance).update(list=None)
+        instance.delete()
+
     def destroy(self, request, *args, **kwargs):
         response = super().destroy(request, *args, **kwargs)
         if response.status_code == HTTP_204_NO_CONTENT:
@@ -107,40 +160,26 @@ class SprintsViewSet(ModelViewSet):
         sprint_duration = validated_data.get("sprintDuration")
         start_date_data = validated_data.get("startDate")
 
-        try:
-            project = Project.objects.get(_id=project_id)
-        except Project.DoesNotExist:
-            raise Response("Project doesn't Exist.", HTTP_400_BAD_REQUEST)
+        if not Project.objects.filter(_id=project_id).exists():
+            return Response("Project doesn't Exist.", HTTP_400_BAD_REQUEST)
 
-        sprint_list = []
-        start_date = start_date_data.date()
-        last_sprint = project.sprint.order_by("created_at").last()
-        if last_sprint:
-            last_sprint_no = int(last_sprint.name.split(" ")[1])
-        else:
-            last_sprint_no = 0
-        for i in range(number_of_sprint):
-            end_date = self.skip_weekend(start_date, sprint_duration)
-            last_sprint_no += 1
-            sprint = Sprints.objects.create(
-                name=f"Sprint {last_sprint_no} ({start_date.strftime('%d-%m-%Y')}/{end_date.strftime('%d-%m-%Y')})",
-                project=project,
-            )
-            sprint_list.append(sprint)
-            start_date = end_date + timedelta(days=1)
-
-        response = SprintsSerializer(data=sprint_list, many=True)
-        response.is_valid()
-        return Response(response.data, status=HTTP_201_CREATED)
-
-    def skip_weekend(self, start_date, sprint_duration):
-        end_date = start_date
-        for i in range(sprint_duration - 1):
-            date = end_date + timedelta(days=1)
-            while date.weekday() in [5, 6]:
-                date += timedelta(days=1)
-            end_date = date
-        return end_date
+        job = generate_sprints.delay(
+            project_id=project_id,
+            number_of_sprints=number_of_sprint,
+            sprint_duration=sprint_duration,
+            start_date=start_date_data.date(),
+        )
+        return Response(
+            {"data": JobSerializer(job).data, "message": "Sprint generation queued"},
+            status=HTTP_202_ACCEPTED,
+        )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Tickets are soft deleted and detached, the purge removes them later
+        instance.ticket_sprint.soft_delete(request_actor(self.request))
+        Ticket.all_objects.filter(sprint=instance).update(sprint=None)
+        instance.delete()
 
     def destroy(self, request, *args, **kwargs):
         response = super().destroy(request, *args, **kwargs)
@@ -161,6 +200,23 @@ class FoldersViewSet(ModelViewSet):
 
         return FoldersBulkUpdateSerializer
 
+    def create(self, request, *args, **kwargs):
+        # A list creates several folders, a single folder goes the same bulk way
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(
+            data=request.data if many else [request.data], many=True
+        )
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if not many and isinstance(errors, list):
+                errors = errors[0]
+            raise ValidationError(errors)
+
+        self.perform_create(serializer)
+        return Response(
+            serializer.data if many else serializer.data[0], status=HTTP_201_CREATED
+        )
+
     def destroy(self, request, *args, **kwargs):
         response = super().destroy(request, *args, **kwargs)
         if response.status_code == HTTP_204_NO_CONTENT:
@@ -174,6 +230,37 @@ class ProjectView(ListAPIView):
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        queryset = self.queryset.all()
+        if sparse_includes(self.request, "sprint"):
+            queryset = queryset.prefetch_related(
+                Prefetch("sprint", queryset=annotated_sprints())
+            )
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if getattr(self, "swagger_fake_view", False):
+            return context
+
+        lists = annotated_lists()
+        with_folders = sparse_includes(self.request, "folders")
+        with_lists = sparse_includes(self.request, "lists")
+        context["folders"], context["lists"] = folder_membership(
+            (
+                Folders.objects.prefetch_related(Prefetch("list", queryset=lists))
+                if with_folders
+                else []
+            ),
+            lists if with_lists else [],
+            (
+                Folders.list.through.objects.values_list("lists_id", flat=True)
+                if with_lists
+                else []
+            ),
+        )
+        return context
+
 
 @extend_schema_view()
 class ProjectIconsView(ListAPIView):
@@ -233,3 +320,92 @@ class TeamMemberView(CreateAPIView):
             },
             HTTP_200_OK,
         )
+
+
+# Async implementations of the read-heavy endpoints, routed in place of the
+# views above when ASYNC_VIEWS is enabled and served under ASGI.
+@extend_schema_view()
+class ProjectAsyncView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, *args, **kwargs):
+        async def nothing():
+            return []
+
+        projects = Project.objects.all()
+        if sparse_includes(request, "sprint"):
+            projects = projects.prefetch_related(
+                Prefetch("sprint", queryset=annotated_sprints())
+            )
+        lists = annotated_lists()
+        with_folders = sparse_includes(request, "folders")
+        with_lists = sparse_includes(request, "lists")
+
+        projects, folders, all_lists, lists_in_folders = await asyncio.gather(
+            aevaluate(projects),
+            (
+                aevaluate(
+                    Folders.objects.prefetch_related(Prefetch("list", queryset=lists))
+                )
+                if with_folders
+                else nothing()
+            ),
+            aevaluate(lists) if with_lists else nothing(),
+            (
+                aevaluate(Folders.list.through.objects.values_list("lists_id", flat=True))
+                if with_lists
+                else nothing()
+            ),
+        )
+
+        folders_by_project, lists_by_project = folder_membership(
+            folders, all_lists, lists_in_folders
+        )
+        serializer = ProjectSerializer(
+            projects,
+            many=True,
+            context={
+                "request": request,
+                "folders": folders_by_project,
+                "lists": lists_by_project,
+            },
+        )
+        return Response(serializer.data)
+
+
+@extend_schema_view()
+class ProjectIconsAsyncView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, *args, **kwargs):
+        icons = await aevaluate(ProjectIcons.objects.all())
+        serializer = ProjectIconsSerializer(icons, many=True)
+        return Response({"colors": serializer.data, "icons": []})
+
+
+@extend_schema_view()
+class TeamMemberAsyncView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def post(self, request, *args, **kwargs):
+        params = request.data.get("params", {})
+        project_id = params.get("projectId")
+        queryset = TeamMember.objects.select_related(
+            "user__user", "user__role__department"
+        )
+        if project_id:
+            queryset = queryset.filter(project___id=project_id)
+
+        team_members = await aevaluate(queryset)
+        serializer = TeamMemberSerializer(
+            team_members, many=True, context={"request": request}
+        )
+        return Response(
+            {
+                "allocatedUsers": {
+                    "projectAggregation": serializer.data,
+                    "totalAllocatedUsers": len(serializer.data),
+                }
+            },
+            HTTP_200_OK,
+        )
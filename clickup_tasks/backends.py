@@ -0,0 +1,130 @@
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+from django.utils.timezone import now, timedelta
+
+from .models import Job
+
+
+@lru_cache
+def get_backend():
+    return import_string(settings.TASK_BACKEND)()
+
+
+def run_job(job):
+    """
+    Runs a claimed job and stores the outcome, a failed run goes back to the
+    queue with an exponential delay until it has used up its attempts.
+    """
+    from .registry import tasks
+
+    registered = tasks.get(job.name)
+    try:
+        if registered is None:
+            raise LookupError(f"Task {job.name} is not registered")
+        job.result = registered(**job.kwargs)
+        job.status = Job.SUCCEEDED
+    except Exception:
+        job.lastError = traceback.format_exc()
+        if registered is not None and job.attempts < job.maxAttempts:
+            job.status = Job.QUEUED
+            job.runAt = now() + timedelta(
+                seconds=registered.retry_delay * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = Job.FAILED
+
+    job.lockedUntil = None
+    job.save(
+        update_fields=["status", "result", "lastError", "runAt", "lockedUntil", "updatedAt"]
+    )
+    return job
+
+
+class DatabaseBackend:
+    """
+    Keeps the queue in the Job table, `manage.py run_worker` processes it.
+    """
+
+    def enqueue(self, task, kwargs):
+        return Job.objects.create(
+            name=task.name, kwargs=kwargs, maxAttempts=task.max_attempts
+        )
+
+    def claim(self, visibility_timeout):
+        """
+        Locks the next due job for visibility_timeout seconds. SKIP LOCKED
+        lets concurrent workers claim different rows without waiting.
+
+        A running job whose lock expired lost its worker (killed, out of
+        memory) before run_job recorded anything. It is run again until it
+        has used up its attempts, then marked failed.
+        """
+        while True:
+            with transaction.atomic():
+                time_now = now()
+                job = (
+                    Job.objects.select_for_update(skip_locked=True)
+                    .filter(
+                        Q(status=Job.QUEUED, runAt__lte=time_now)
+                        | Q(status=Job.RUNNING, lockedUntil__lt=time_now)
+                    )
+                    .order_by("runAt")
+                    .first()
+                )
+                if job is None:
+                    return None
+
+                if job.status == Job.RUNNING and job.attempts >= job.maxAttempts:
+                    job.status = Job.FAILED
+                    job.lockedUntil = None
+                    job.lastError += (
+                        f"Attempt {job.attempts} stopped without a result, "
+                        "its lock expired\n"
+                    )
+                    job.save(
+                        update_fields=["status", "lockedUntil", "lastError", "updatedAt"]
+                    )
+                    continue
+
+                job.status = Job.RUNNING
+                job.attempts += 1
+                job.lockedUntil = time_now + timedelta(seconds=visibility_timeout)
+                job.save(
+                    update_fields=["status", "attempts", "lockedUntil", "updatedAt"]
+                )
+            return job
+
+
+class ThreadPoolBackend(DatabaseBackend):
+    """
+    Runs the jobs in a pool of this process once the enqueuing transaction
+    commits, retrying straight away. Meant for tests and local development.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.TASK_THREAD_POOL_SIZE,
+            thread_name_prefix="clickup-task",
+        )
+
+    def enqueue(self, task, kwargs):
+        job = super().enqueue(task, kwargs)
+        transaction.on_commit(lambda: self.executor.submit(self.run, job._id))
+        return job
+
+    def run(self, job_id):
+        try:
+            job = Job.objects.get(_id=job_id)
+            while job.status != Job.SUCCEEDED and job.status != Job.FAILED:
+                job.status = Job.RUNNING
+                job.attempts += 1
+                job.save(update_fields=["status", "attempts", "updatedAt"])
+                run_job(job)
+        finally:
+            connection.close()
@@ -0,0 +1,65 @@
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from clickup_tasks.backends import DatabaseBackend, run_job
+
+
+class Command(BaseCommand):
+    help = "Processes the queued background jobs of the database backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--visibility-timeout",
+            type=int,
+            default=300,
+            help="Seconds a claimed job stays locked before it is run again.",
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        self.backend = DatabaseBackend()
+        self.stopped = threading.Event()
+
+        threads = [
+            threading.Thread(
+                target=self.work, args=(options,), name=f"clickup-worker-{index}"
+            )
+            for index in range(options["concurrency"])
+        ]
+        for thread in threads:
+            thread.start()
+
+        self.stdout.write(f"Worker started with {len(threads)} threads")
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping after the running jobs")
+            self.stopped.set()
+            for thread in threads:
+                thread.join()
+
+    def work(self, options):
+        try:
+            while not self.stopped.is_set():
+                close_old_connections()
+                job = self.backend.claim(options["visibility_timeout"])
+                if job is None:
+                    if options["burst"]:
+                        return
+                    self.stopped.wait(options["poll_interval"])
+                    continue
+
+                run_job(job)
+                self.stdout.write(f"{job.name} {job._id}: {job.status}")
+        finally:
+            connection.close()
@@ -0,0 +1,46 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model
+from django.db.models import (
+    CharField,
+    DateTimeField,
+    IntegerField,
+    JSONField,
+    TextField,
+    Index,
+)
+from django.utils.timezone import now
+
+from clickup_utils.fields import primary_key_field
+
+
+# Create your models here.
+class Job(Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    JOB_STATUS = {
+        QUEUED: "Queued",
+        RUNNING: "Running",
+        SUCCEEDED: "Succeeded",
+        FAILED: "Failed",
+    }
+    _id = primary_key_field()
+    name = CharField()
+    kwargs = JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = CharField(choices=JOB_STATUS, default=QUEUED)
+    attempts = IntegerField(default=0)
+    maxAttempts = IntegerField(default=3)
+    runAt = DateTimeField(default=now)
+    # A running job whose lock has expired is claimed again by the next worker
+    lockedUntil = DateTimeField(null=True, blank=True)
+    result = JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    lastError = TextField(blank=True, default="")
+    createdAt = DateTimeField(auto_now_add=True)
+    updatedAt = DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [Index(fields=["status", "runAt"])]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,39 @@
+from .backends import get_backend
+
+
+tasks = {}
+
+
+class Task:
+
+    def __init__(self, func, max_attempts, retry_delay):
+        self.func = func
+        self.name = f"{func.__module__}.{func.__name__}"
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def delay(self, **kwargs):
+        """
+        Queues a run with JSON serializable keyword arguments and returns the
+        Job. Jobs queued inside a transaction only run once it commits.
+        """
+        return get_backend().enqueue(self, kwargs)
+
+
+def task(func=None, *, max_attempts=3, retry_delay=30):
+    """
+    Registers a function as a background task, failed runs are retried after
+    retry_delay seconds, doubling each attempt, up to max_attempts runs.
+    """
+
+    def register(func):
+        registered = Task(func, max_attempts, retry_delay)
+        tasks[registered.name] = registered
+        return registered
+
+    if func is not None:
+        return register(func)
+    return register
@@ -0,0 +1,9 @@
+from rest_framework.serializers import ModelSerializer
+
+from .models import Job
+
+
+class JobSerializer(ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ("_id", "name", "status", "attempts", "result", "createdAt", "updatedAt")
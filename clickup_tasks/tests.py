@@ -0,0 +1,169 @@
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils.timezone import now, timedelta
+from rest_framework.test import APIClient
+
+from clickup_auth.models import ClickUpUser
+from clickup_projects.models import Project, Sprints
+
+from .backends import DatabaseBackend, get_backend, run_job
+from .models import Job
+from .registry import task
+
+
+# Runs of flaky() per key, it fails until a key has been run `failures` times
+runs = {}
+
+
+@task(max_attempts=3, retry_delay=10)
+def flaky(key, failures):
+    runs[key] = runs.get(key, 0) + 1
+    if runs[key] <= failures:
+        raise RuntimeError(f"Run {runs[key]} failed")
+    return runs[key]
+
+
+class ClaimTests(TestCase):
+    def setUp(self):
+        self.backend = DatabaseBackend()
+
+    def job(self, **fields):
+        return Job.objects.create(name=flaky.name, maxAttempts=3, **fields)
+
+    def test_claims_due_jobs_in_order_and_locks_them(self):
+        second = self.job(runAt=now() - timedelta(seconds=1))
+        first = self.job(runAt=now() - timedelta(seconds=2))
+        self.job(runAt=now() + timedelta(minutes=1))
+
+        claimed = [self.backend.claim(60), self.backend.claim(60)]
+
+        self.assertEqual([job._id for job in claimed], [first._id, second._id])
+        for job in claimed:
+            self.assertEqual(job.status, Job.RUNNING)
+            self.assertEqual(job.attempts, 1)
+            self.assertGreater(job.lockedUntil, now() + timedelta(seconds=50))
+        # The locked jobs stay hidden until their visibility timeout expires
+        self.assertIsNone(self.backend.claim(60))
+
+    def test_jobs_whose_lock_expired_are_claimed_again(self):
+        job = self.job(
+            status=Job.RUNNING, attempts=1, lockedUntil=now() - timedelta(seconds=1)
+        )
+
+        claimed = self.backend.claim(60)
+
+        self.assertEqual(claimed._id, job._id)
+        self.assertEqual(claimed.attempts, 2)
+
+    def test_jobs_that_lost_their_worker_on_every_attempt_fail(self):
+        lost = self.job(
+            status=Job.RUNNING, attempts=3, lockedUntil=now() - timedelta(seconds=1)
+        )
+        queued = self.job()
+
+        claimed = self.backend.claim(60)
+
+        self.assertEqual(claimed._id, queued._id)
+        lost.refresh_from_db()
+        self.assertEqual(lost.status, Job.FAILED)
+        self.assertIsNone(lost.lockedUntil)
+        self.assertIn("Attempt 3 stopped without a result", lost.lastError)
+
+
+class RunJobTests(TestCase):
+    def claimed(self, failures, attempts):
+        return Job.objects.create(
+            name=flaky.name,
+            kwargs={"key": self.id(), "failures": failures},
+            status=Job.RUNNING,
+            attempts=attempts,
+            maxAttempts=3,
+        )
+
+    def test_failed_runs_are_retried_with_an_exponential_delay(self):
+        runs.pop(self.id(), None)
+        for attempts, delay in [(1, 10), (2, 20)]:
+            with self.subTest(attempts=attempts):
+                started = now()
+                job = run_job(self.claimed(failures=3, attempts=attempts))
+
+                self.assertEqual(job.status, Job.QUEUED)
+                self.assertIn("RuntimeError", job.lastError)
+                self.assertGreaterEqual(job.runAt, started + timedelta(seconds=delay))
+                self.assertLess(job.runAt, now() + timedelta(seconds=delay))
+
+    def test_the_last_failed_attempt_fails_the_job(self):
+        runs.pop(self.id(), None)
+        job = run_job(self.claimed(failures=3, attempts=3))
+
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNone(job.lockedUntil)
+
+    def test_successful_runs_store_the_result(self):
+        runs.pop(self.id(), None)
+        job = run_job(self.claimed(failures=0, attempts=1))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, 1)
+
+    def test_unregistered_tasks_fail_without_retrying(self):
+        job = Job.objects.create(name="missing.task", status=Job.RUNNING, attempts=1)
+
+        self.assertEqual(run_job(job).status, Job.FAILED)
+
+
+@override_settings(TASK_BACKEND="clickup_tasks.backends.ThreadPoolBackend")
+class ThreadPoolBackendTests(TransactionTestCase):
+    def setUp(self):
+        get_backend.cache_clear()
+        self.addCleanup(get_backend.cache_clear)
+
+    def test_jobs_run_after_commit_and_retry_until_they_succeed(self):
+        runs.pop(self.id(), None)
+        job = flaky.delay(key=self.id(), failures=2)
+        get_backend().executor.shutdown(wait=True)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.attempts, 3)
+        self.assertEqual(job.result, 3)
+
+
+class SprintGenerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+        cls.project = Project.objects.create(name="Project", erpId=1, shortCode="PRJ")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_sprint_generation_is_queued_and_reported_through_the_job(self):
+        response = self.client.post(
+            "/api/sprint/",
+            {
+                "project": self.project._id,
+                "numberOfSprints": 2,
+                "sprintDuration": 5,
+                "startDate": (now() + timedelta(days=1)).isoformat(),
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 202)
+        queued = response.data["data"]
+        self.assertEqual(queued["status"], Job.QUEUED)
+        self.assertFalse(Sprints.objects.exists())
+
+        run_job(DatabaseBackend().claim(60))
+
+        job = self.client.get(f"/api/job/{queued['_id']}").data
+        self.assertEqual(job["status"], Job.SUCCEEDED)
+        self.assertEqual(
+            sorted(job["result"]),
+            sorted(self.project.sprint.values_list("_id", flat=True)),
+        )
+        self.assertEqual(len(job["result"]), 2)
@@ -0,0 +1,8 @@
+from django.urls import re_path
+
+from .views import JobView
+
+
+urlpatterns = [
+    re_path(r"job/(?P<pk>[0-9a-f-]+)", JobView.as_view(), name="job"),
+]
@@ -0,0 +1,15 @@
+from rest_framework.generics import RetrieveAPIView
+from rest_framework.permissions import IsAuthenticated
+
+from drf_spectacular.utils import extend_schema_view
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+# Create your views here.
+@extend_schema_view()
+class JobView(RetrieveAPIView):
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
@@ -0,0 +1,231 @@
+from collections import Counter, defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import CharField, Q, Value
+from django.db.models.functions import Cast, Replace
+from django.utils.dateparse import parse_duration
+from django.utils.timezone import get_current_timezone, localdate, timedelta
+
+from clickup_activity.models import AuditEvent
+
+from .models import Ticket, TicketAllocation, TicketStatus
+
+
+SCOPES = {
+    "sprint": "ticket__sprint",
+    "list": "ticket__list",
+    "project": None,
+}
+
+
+def cache_key(scope, object_id):
+    return f"analytics:{scope}:{object_id}"
+
+
+def scope_allocations(scope, object_id):
+    # Deleted allocations too, they count until their deletion
+    allocations = TicketAllocation.all_objects.all()
+    if scope == "project":
+        return allocations.filter(
+            Q(ticket__list__project=object_id) | Q(ticket__sprint__project=object_id)
+        )
+    return allocations.filter(**{SCOPES[scope]: object_id})
+
+
+def transitions(allocations):
+    """
+    ``{allocation_id: [(time, changes), ...]}`` of the status and estimation
+    changes the audit trail recorded for the allocations, oldest first.
+    """
+    # objectId is the hex string whether or not _id is stored as a uuid
+    hex_ids = allocations.annotate(
+        hex_id=Replace(Cast("_id", CharField()), Value("-"), Value(""))
+    ).values("hex_id")
+
+    events = defaultdict(list)
+    for allocation_id, created_at, changes in (
+        AuditEvent.objects.filter(
+            Q(changes__has_key="ticketStatus") | Q(changes__has_key="estimationHours"),
+            model=TicketAllocation._meta.label_lower,
+            action="update",
+            objectId__in=hex_ids,
+        )
+        .order_by("createdAt")
+        .values_list("objectId", "createdAt", "changes")
+    ):
+        events[allocation_id].append((created_at, changes))
+    return events
+
+
+def seconds(duration):
+    if isinstance(duration, str):
+        duration = parse_duration(duration)
+    return duration.total_seconds() if duration else 0
+
+
+def allocation_states(allocation, events):
+    """
+    ``[(time, status, estimation seconds), ...]`` of an allocation from its
+    creation, ending with ``(deletion time, None, None)`` once deleted.
+    """
+    _, _, status, estimation, created_at, deleted_at, ticket_deleted_at = allocation
+
+    # The values before the first recorded change of each field
+    for _, changes in events:
+        if "ticketStatus" in changes:
+            status = changes["ticketStatus"][0]
+            break
+    for _, changes in events:
+        if "estimationHours" in changes:
+            estimation = changes["estimationHours"][0]
+            break
+
+    estimation = seconds(estimation)
+    states = [(created_at, status, estimation)]
+    for time, changes in events:
+        if "ticketStatus" in changes:
+            status = changes["ticketStatus"][1]
+        if "estimationHours" in changes:
+            estimation = seconds(changes["estimationHours"][1])
+        states.append((max(time, created_at), status, estimation))
+
+    deleted_at = min(filter(None, (deleted_at, ticket_deleted_at)), default=None)
+    if deleted_at:
+        states = [state for state in states if state[0] < deleted_at]
+        states.append((deleted_at, None, None))
+    return states
+
+
+def compute(scope, object_id):
+    """
+    Per day distinct tickets and estimation hours by allocation status,
+    completed allocations, remaining estimation hours and completion of
+    the allocations in scope.
+
+    The days are replayed from the audit trail: an allocation counts from
+    its creation ("updatedAt", the auto_now_add field) to its or its
+    ticket's deletion, with the status and estimation its recorded
+    changes gave it on each day, so past days don't move when an
+    allocation is edited. Tickets are counted under every status one of
+    their allocations has.
+    """
+    completed_statuses = set(settings.ANALYTICS_COMPLETED_STATUSES)
+    titles = dict(TicketStatus.objects.values_list("_id", "title"))
+    allocations = scope_allocations(scope, object_id)
+    history = transitions(allocations)
+
+    # (time, ticket, status, estimation, +1 or -1) as an allocation enters
+    # or leaves a state
+    moves = []
+    for allocation in allocations.values_list(
+        "_id",
+        "ticket",
+        "ticketStatus",
+        "estimationHours",
+        "updatedAt",
+        "deletedAt",
+        "ticket__deletedAt",
+    ):
+        previous = None
+        for time, status, estimation in allocation_states(
+            allocation, history.get(allocation[0], [])
+        ):
+            if previous:
+                moves.append((time, allocation[1], *previous, -1))
+            previous = (status, estimation) if estimation is not None else None
+            if previous:
+                moves.append((time, allocation[1], *previous, 1))
+    moves.sort(key=itemgetter(0))
+
+    ticket_statuses = Counter()
+    tickets = Counter()
+    estimations = Counter()
+    allocation_count = completed = 0
+    remaining = 0.0
+
+    def snapshot(date):
+        return {
+            "date": date,
+            "statuses": sorted(
+                (
+                    {
+                        "_id": status,
+                        "title": titles.get(status),
+                        "count": count,
+                        "estimationHours": round(estimations[status] / 3600, 2),
+                    }
+                    for status, count in tickets.items()
+                    if count
+                ),
+                key=lambda status: status["title"] or "",
+            ),
+            "completed": completed,
+            "remainingHours": round(remaining / 3600, 2),
+            "completion": round(completed / allocation_count, 4)
+            if allocation_count
+            else 0,
+        }
+
+    timezone = get_current_timezone()
+    days = []
+    for date, day_moves in groupby(
+        moves, key=lambda move: move[0].astimezone(timezone).date()
+    ):
+        while days and days[-1]["date"] + timedelta(days=1) < date:
+            days.append({**days[-1], "date": days[-1]["date"] + timedelta(days=1)})
+
+        for _, ticket, status, estimation, sign in day_moves:
+            ticket_statuses[ticket, status] += sign
+            if ticket_statuses[ticket, status] == (1 if sign > 0 else 0):
+                tickets[status] += sign
+            estimations[status] += sign * estimation
+            allocation_count += sign
+            if titles.get(status) in completed_statuses:
+                completed += sign
+            else:
+                remaining += sign * estimation
+        days.append(snapshot(date))
+
+    today = localdate()
+    while days and days[-1]["date"] < today:
+        days.append({**days[-1], "date": days[-1]["date"] + timedelta(days=1)})
+
+    return {
+        "scope": scope,
+        "_id": object_id,
+        "totalAllocations": allocation_count,
+        "totalEstimationHours": round(sum(estimations.values()) / 3600, 2),
+        "days": days,
+    }
+
+
+def get_analytics(scope, object_id):
+    key = cache_key(scope, object_id)
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = compute(scope, object_id)
+        cache.set(key, analytics, settings.ANALYTICS_CACHE_SECONDS)
+    return analytics
+
+
+def invalidate(ticket_ids):
+    """
+    Drops the cached analytics of the sprints, lists and projects the
+    tickets currently belong to once the transaction commits.
+    """
+    keys = set()
+    for list_id, sprint_id, list_project, sprint_project in Ticket.all_objects.filter(
+        _id__in=ticket_ids
+    ).values_list("list", "sprint", "list__project", "sprint__project"):
+        if list_id:
+            keys.add(cache_key("list", list_id))
+        if sprint_id:
+            keys.add(cache_key("sprint", sprint_id))
+        if list_project or sprint_project:
+            keys.add(cache_key("project", list_project or sprint_project))
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
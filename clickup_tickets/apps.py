@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TicketsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clickup_tickets'
+
+    def ready(self):
+        from . import signals  # noqa: F401
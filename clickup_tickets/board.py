@@ -0,0 +1,179 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, Count
+from django.http import QueryDict
+from rest_framework.renderers import JSONRenderer
+
+from clickup_projects.models import TeamMember
+
+from .models import BoardCard, TicketAllocation
+from .serializers import TicketSerializer, TicketAllocationSerializer
+
+
+class BoardTicketSerializer(TicketSerializer):
+    class Meta(TicketSerializer.Meta):
+        fields = tuple(
+            field for field in TicketSerializer.Meta.fields if field != "allocations"
+        )
+
+
+# Stands for the scheme and host in the media URLs of the card fragments,
+# column_body swaps in the ones of the request reading them
+ORIGIN = "\ue000origin\ue000"
+
+
+class CardRequest:
+    """
+    Request the cards are serialized with: media URLs come out as ORIGIN
+    followed by the path, where a request would make them absolute.
+    """
+
+    query_params = QueryDict()
+
+    def build_absolute_uri(self, location):
+        if "://" in location:
+            return location
+        return f"{ORIGIN}{location}"
+
+
+def render(data):
+    return JSONRenderer().render(data).decode()
+
+
+def card_allocations():
+    return TicketAllocation.objects.filter(
+        ticket__deletedAt__isnull=True
+    ).profile("board").defer("ticket__description").select_related(
+        "ticket", "ticketStatus"
+    ).prefetch_related(
+        Prefetch(
+            "assignedUsers",
+            queryset=TeamMember.objects.select_related(
+                "user__user", "user__role__department"
+            ),
+        )
+    )
+
+
+def build_card(allocation):
+    ticket = allocation.ticket
+    context = {"request": CardRequest()}
+    return BoardCard(
+        allocationId=allocation._id,
+        ticketId=ticket._id,
+        listId=ticket.list_id,
+        sprintId=ticket.sprint_id,
+        statusId=allocation.ticketStatus_id,
+        statusTitle=allocation.ticketStatus and allocation.ticketStatus.title,
+        ticketOrder=ticket.customId,
+        allocationOrder=allocation.customId,
+        ticketJson=render(BoardTicketSerializer(ticket, context=context).data),
+        allocationJson=render(
+            TicketAllocationSerializer(allocation, context=context).data
+        ),
+    )
+
+
+def refresh_cards(allocation_ids):
+    """
+    Re-renders the cards of the given allocations, dropping the ones that
+    are deleted or whose ticket is.
+    """
+    allocation_ids = list(allocation_ids)
+    with transaction.atomic():
+        BoardCard.objects.filter(allocationId__in=allocation_ids).delete()
+        BoardCard.objects.bulk_create(
+            [
+                build_card(allocation)
+                for allocation in card_allocations().filter(_id__in=allocation_ids)
+            ]
+        )
+
+
+def schedule_refresh(**lookup):
+    """
+    Refreshes the cards of the allocations matching the lookup, including
+    deleted ones, once the current transaction commits.
+    """
+    if not settings.BOARD_READ_MODEL:
+        return
+
+    def refresh():
+        refresh_cards(
+            TicketAllocation.all_objects.filter(**lookup).values_list("_id", flat=True)
+        )
+
+    transaction.on_commit(refresh)
+
+
+def schedule_removal(**lookup):
+    """
+    Deletes the cards matching the lookup once the current transaction
+    commits. For hard deleted rows, which a refresh no longer finds.
+    """
+    if not settings.BOARD_READ_MODEL:
+        return
+
+    transaction.on_commit(lambda: BoardCard.objects.filter(**lookup).delete())
+
+
+def rebuild(batch_size=500):
+    BoardCard.objects.all().delete()
+    allocations = card_allocations().order_by("_id")
+    built = 0
+    last_id = None
+    while True:
+        batch = allocations.filter(_id__gt=last_id) if last_id else allocations
+        batch = list(batch[:batch_size])
+        if not batch:
+            return built
+
+        BoardCard.objects.bulk_create([build_card(allocation) for allocation in batch])
+        built += len(batch)
+        last_id = batch[-1]._id
+
+
+def column_body(request, list_id, sprint_id, data_count, pagination):
+    """
+    Renders a board column response from the card fragments, identical to
+    the serialized board but without hydrating any model.
+    """
+    cards = BoardCard.objects.filter(listId=list_id, sprintId=sprint_id)
+    ticket_group_by = list(
+        cards.values("statusId", "statusTitle")
+        .annotate(ticket_count=Count("statusId"))
+        .order_by()
+    )
+
+    if ticket_group_by:
+        status_id = ticket_group_by[data_count]["statusId"]
+        status_name = ticket_group_by[data_count]["statusTitle"]
+
+        tickets = []
+        ticket_id = None
+        for card_ticket_id, ticket_json, allocation_json in (
+            cards.filter(statusId=status_id)
+            .order_by("ticketOrder", "allocationOrder")
+            .values_list("ticketId", "ticketJson", "allocationJson")
+        ):
+            if card_ticket_id != ticket_id:
+                ticket_id = card_ticket_id
+                tickets.append([ticket_json, []])
+            tickets[-1][1].append(allocation_json)
+
+        data = ",".join(
+            f'{ticket_json[:-1]},"allocations":[{",".join(allocations)}]}}'
+            for ticket_json, allocations in tickets
+        )
+        ticket_data = f'[{{"_id":{render(status_id)},"groupById":{render(status_id)},"data":[{data}]}}]'
+        total_count = render([{"count": group["ticket_count"]} for group in ticket_group_by])
+        table_heading = render({"_id": status_id, "name": status_name})
+    else:
+        ticket_data, total_count, table_heading = "[]", "[]", "{}"
+
+    body = (
+        '{"statusCode":200,"success":true,'
+        f'"ticketData":{ticket_data},"totalCount":{total_count},'
+        f'"TableHeading":{table_heading},"pagination":{render(pagination)}}}'
+    )
+    return body.replace(ORIGIN, request.build_absolute_uri("/")[:-1])
@@ -0,0 +1,155 @@
+from collections import defaultdict
+
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.utils.timezone import localtime, timedelta
+
+from clickup_projects.models import TeamMember
+
+from .models import TicketAllocation
+
+
+def business_day_index(start, date):
+    """
+    Number of business days from start (a Monday to Friday) up to date,
+    excluding date itself.
+    """
+    days = (date - start).days
+    weeks, rest = divmod(days, 7)
+    index = weeks * 5
+    weekday = start.weekday()
+    for offset in range(rest):
+        if (weekday + offset) % 7 < 5:
+            index += 1
+    return index
+
+
+def next_business_day(date):
+    while date.weekday() >= 5:
+        date += timedelta(days=1)
+    return date
+
+
+def previous_business_day(date):
+    while date.weekday() >= 5:
+        date -= timedelta(days=1)
+    return date
+
+
+def hours(duration):
+    return duration.total_seconds() / 3600
+
+
+def allocation_span(start, due):
+    start = localtime(start).date() if start else None
+    due = localtime(due).date() if due else None
+    start, due = start or due, due or start
+    first, last = next_business_day(start), previous_business_day(due)
+    if last < first:
+        # A span within a weekend is booked on the following Monday
+        last = first
+    return first, last
+
+
+def compute(project_id, start, end, member_ids=None):
+    """
+    Assigned estimation hours against allocationHours per team member and
+    business day between start and end.
+
+    Each allocation's estimation is split evenly between its assignees and
+    over the business days from its startDate to its dueDate. Every
+    allocation adds its per-day hours to a difference array of its
+    assignee in O(1); one prefix sum per member then gives the daily load.
+    """
+    start, end = next_business_day(start), previous_business_day(end)
+    day_count = business_day_index(start, end) + 1 if end >= start else 0
+    days = []
+    date = start
+    while len(days) < day_count:
+        if date.weekday() < 5:
+            days.append(date)
+        date += timedelta(days=1)
+
+    members = TeamMember.objects.filter(project=project_id)
+    if member_ids:
+        members = members.filter(_id__in=member_ids)
+    members = list(
+        members.values(
+            "_id", "allocationHours", "user__user__first_name", "user__user__last_name"
+        )
+    )
+
+    # Counted apart from the join so a member filter doesn't change the split
+    assignee_count = (
+        TicketAllocation.assignedUsers.through.objects.filter(
+            ticketallocation=OuterRef("pk")
+        )
+        .values("ticketallocation")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    allocations = defaultdict(list)
+    for allocation_id, estimation, start_date, due_date, assignees, member_id in (
+        TicketAllocation.objects.annotate(assignees=Subquery(assignee_count))
+        .filter(
+            Q(ticket__list__project=project_id) | Q(ticket__sprint__project=project_id),
+            ticket__deletedAt__isnull=True,
+            assignedUsers__in=[member["_id"] for member in members],
+        )
+        .exclude(startDate__isnull=True, dueDate__isnull=True)
+        .values_list(
+            "_id",
+            "estimationHours",
+            "startDate",
+            "dueDate",
+            "assignees",
+            "assignedUsers",
+        )
+    ):
+        allocations[allocation_id].append(
+            (estimation, start_date, due_date, assignees, member_id)
+        )
+
+    differences = defaultdict(lambda: [0.0] * (day_count + 1))
+    for assignees in allocations.values():
+        estimation, start_date, due_date, assignee_count, _ = assignees[0]
+        first, last = allocation_span(start_date, due_date)
+        if last < start or first > end:
+            continue
+
+        span_days = business_day_index(first, last) + 1
+        daily = hours(estimation) / span_days / assignee_count
+        first_index = business_day_index(start, first) if first > start else 0
+        last_index = min(business_day_index(start, last), day_count - 1)
+        for *_, member_id in assignees:
+            difference = differences[member_id]
+            difference[first_index] += daily
+            difference[last_index + 1] -= daily
+
+    results = []
+    for member in members:
+        capacity = hours(member["allocationHours"])
+        difference = differences.get(member["_id"], [0.0] * (day_count + 1))
+        load = 0.0
+        member_days = []
+        for index, date in enumerate(days):
+            load += difference[index]
+            member_days.append(
+                {
+                    "date": date,
+                    "assignedHours": round(load, 2),
+                    "capacityHours": capacity,
+                    "overAllocated": round(load, 2) > capacity,
+                }
+            )
+
+        results.append(
+            {
+                "_id": member["_id"],
+                "employeeName": f'{member["user__user__first_name"]} {member["user__user__last_name"]}'.strip(),
+                "assignedHours": round(sum(day["assignedHours"] for day in member_days), 2),
+                "capacityHours": capacity * day_count,
+                "overAllocatedDays": sum(day["overAllocated"] for day in member_days),
+                "days": member_days,
+            }
+        )
+    return results
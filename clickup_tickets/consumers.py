@@ -0,0 +1,84 @@
+import re
+
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .models import Ticket
+
+
+BOARD_TOPICS = ("list", "sprint", "project")
+
+
+def board_group(topic, object_id):
+    return f"board.{topic}.{object_id}"
+
+
+def tickets_groups(ticket_ids):
+    """
+    ``{ticket_id: [group, ...]}`` of the boards showing the tickets, in one
+    query.
+    """
+    tickets_groups = {}
+    for ticket in Ticket.all_objects.filter(_id__in=ticket_ids).values(
+        "_id", "list_id", "sprint_id", "list__project_id", "sprint__project_id"
+    ):
+        groups = tickets_groups[ticket["_id"]] = []
+        if ticket["list_id"]:
+            groups.append(board_group("list", ticket["list_id"]))
+        if ticket["sprint_id"]:
+            groups.append(board_group("sprint", ticket["sprint_id"]))
+        project_id = ticket["list__project_id"] or ticket["sprint__project_id"]
+        if project_id:
+            groups.append(board_group("project", project_id))
+    return tickets_groups
+
+
+def ticket_groups(ticket_id):
+    return tickets_groups([ticket_id]).get(ticket_id, [])
+
+
+class BoardConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Pushes ticket and allocation deltas to subscribed boards.
+
+    Clients send ``{"action": "subscribe", "topic": "list", "id": "<listId>"}``
+    (or ``unsubscribe``) for any list, sprint or project they have open.
+    """
+
+    async def connect(self):
+        if not self.scope["user"].is_authenticated:
+            await self.close()
+            return
+
+        self.groups_joined = set()
+        await self.accept()
+
+    async def disconnect(self, code):
+        for group in getattr(self, "groups_joined", ()):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        action = content.get("action")
+        topic = content.get("topic")
+        object_id = str(content.get("id", ""))
+
+        if topic not in BOARD_TOPICS or not re.match(r"^[0-9a-f-]{1,36}$", object_id):
+            await self.send_json({"success": False, "errors": "Invalid topic"})
+            return
+
+        group = board_group(topic, object_id)
+        if action == "subscribe":
+            await self.channel_layer.group_add(group, self.channel_name)
+            self.groups_joined.add(group)
+        elif action == "unsubscribe":
+            await self.channel_layer.group_discard(group, self.channel_name)
+            self.groups_joined.discard(group)
+        else:
+            await self.send_json({"success": False, "errors": "Invalid action"})
+            return
+
+        await self.send_json(
+            {"success": True, "action": action, "topic": topic, "id": object_id}
+        )
+
+    async def board_delta(self, event):
+        await self.send_json(event["delta"])
@@ -0,0 +1,177 @@
+from django.conf import settings
+from django.db.models import Count, Prefetch, Q, Sum
+
+from clickup_projects.models import TeamMember
+
+from .models import Ticket, TicketAllocation
+
+
+def iso(value):
+    return value.isoformat() if value else ""
+
+
+def hours(duration):
+    return round(duration.total_seconds() / 3600, 2) if duration else 0
+
+
+def board_filter(params, prefix=""):
+    lookups = {}
+    if params.get("listId"):
+        lookups[f"{prefix}list"] = params["listId"]
+    if params.get("sprintId"):
+        lookups[f"{prefix}sprint"] = params["sprintId"]
+    query = Q(**lookups)
+    if params.get("projectId"):
+        query &= Q(**{f"{prefix}list__project": params["projectId"]}) | Q(
+            **{f"{prefix}sprint__project": params["projectId"]}
+        )
+    return query
+
+
+def ticket_rows(params):
+    # values_list rows, no model is hydrated
+    for row in (
+        Ticket.objects.filter(board_filter(params))
+        .order_by("customId")
+        .values_list(
+            "_id",
+            "customId",
+            "type",
+            "title",
+            "priority__title",
+            "list__name",
+            "sprint__name",
+            "startDate",
+            "dueDate",
+            # updatedAt is the auto_now_add field, i.e. the creation time
+            "updatedAt",
+        )
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    ):
+        yield [*row[:7], iso(row[7]), iso(row[8]), iso(row[9])]
+
+
+def allocation_rows(params):
+    allocations = (
+        TicketAllocation.objects.filter(
+            board_filter(params, "ticket__"), ticket__deletedAt__isnull=True
+        )
+        .select_related("ticket", "ticketStatus", "priority")
+        .prefetch_related(
+            Prefetch(
+                "assignedUsers",
+                queryset=TeamMember.objects.select_related("user__user"),
+            )
+        )
+        .order_by("customId")
+    )
+    # The prefetch runs once per chunk of the iterator
+    for allocation in allocations.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        yield [
+            allocation._id,
+            allocation.customId,
+            allocation.ticket.customId,
+            allocation.title,
+            allocation.ticketStatus.title if allocation.ticketStatus else "",
+            allocation.priority.title if allocation.priority else "",
+            hours(allocation.estimationHours),
+            iso(allocation.startDate),
+            iso(allocation.dueDate),
+            "; ".join(
+                member.user.user.get_full_name()
+                for member in allocation.assignedUsers.all()
+            ),
+        ]
+
+
+def team_member_rows(params):
+    members = TeamMember.objects.all()
+    if params.get("projectId"):
+        members = members.filter(project=params["projectId"])
+
+    live = Q(
+        ticketallocation__deletedAt__isnull=True,
+        ticketallocation__ticket__deletedAt__isnull=True,
+    )
+    for row in (
+        members.annotate(
+            allocations=Count("ticketallocation", filter=live),
+            estimation=Sum("ticketallocation__estimationHours", filter=live),
+        )
+        .order_by("_id")
+        .values_list(
+            "_id",
+            "user__user__first_name",
+            "user__user__last_name",
+            "user__role__name",
+            "user__role__department__name",
+            "allocationHours",
+            "lastWorked",
+            "performanceIndex",
+            "qualityIndex",
+            "allocations",
+            "estimation",
+        )
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    ):
+        yield [
+            row[0],
+            f"{row[1]} {row[2]}".strip(),
+            row[3] or "",
+            row[4] or "",
+            hours(row[5]),
+            iso(row[6]),
+            row[7],
+            row[8],
+            row[9],
+            hours(row[10]),
+        ]
+
+
+DATASETS = {
+    "tickets": (
+        [
+            "_id",
+            "customId",
+            "type",
+            "title",
+            "priority",
+            "list",
+            "sprint",
+            "startDate",
+            "dueDate",
+            "createdAt",
+        ],
+        ticket_rows,
+    ),
+    "allocations": (
+        [
+            "_id",
+            "customId",
+            "ticket",
+            "title",
+            "status",
+            "priority",
+            "estimationHours",
+            "startDate",
+            "dueDate",
+            "assignedUsers",
+        ],
+        allocation_rows,
+    ),
+    "team-members": (
+        [
+            "_id",
+            "employeeName",
+            "role",
+            "department",
+            "allocationHours",
+            "lastWorked",
+            "performanceIndex",
+            "qualityIndex",
+            "allocations",
+            "estimationHours",
+        ],
+        team_member_rows,
+    ),
+}
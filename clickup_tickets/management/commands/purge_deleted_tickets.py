@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now, timedelta
+
+from clickup_tickets.models import Ticket, TicketAllocation
+
+
+class Command(BaseCommand):
+    help = (
+        "Hard deletes tickets and allocations that were soft deleted more "
+        "than --older-than-days ago, one batch per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=30)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = now() - timedelta(days=options["older_than_days"])
+        batch_size = options["batch_size"]
+
+        # Allocations first so the ticket batches don't cascade into them
+        for model in (TicketAllocation, Ticket):
+            purged = self.purge(model, cutoff, batch_size)
+            self.stdout.write(f"{model._meta.label}: {purged} rows purged")
+
+    def purge(self, model, cutoff, batch_size):
+        purged = 0
+        while True:
+            with transaction.atomic():
+                object_ids = list(
+                    model.all_objects.filter(deletedAt__lt=cutoff)
+                    .order_by("deletedAt")
+                    .values_list("pk", flat=True)[:batch_size]
+                )
+                if not object_ids:
+                    return purged
+
+                model.all_objects.filter(pk__in=object_ids).delete()
+                purged += len(object_ids)
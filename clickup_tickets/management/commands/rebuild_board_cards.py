@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from clickup_tickets.board import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the BoardCard read model from the tickets and allocations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            built = rebuild(options["batch_size"])
+        self.stdout.write(f"{built} board cards built")
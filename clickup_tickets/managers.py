@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.db.models import Manager, QuerySet
+from django.utils.timezone import now
+
+from clickup_activity.models import AuditEvent
+from clickup_activity.signals import objects_changed
+
+
+class LoadProfileQuerySet(QuerySet):
+
+    def profile(self, name, keep=()):
+        """
+        Defers the columns of the model's ``load_profiles[name]``, the heavy
+        ones a list or board endpoint doesn't render, except those in keep.
+        """
+        deferred = [
+            field for field in self.model.load_profiles[name] if field not in keep
+        ]
+        return self.defer(*deferred) if deferred else self
+
+
+class SoftDeleteQuerySet(LoadProfileQuerySet):
+
+    def soft_delete(self, actor=None):
+        """
+        Marks the live rows as deleted with a single UPDATE instead of
+        cascading; purge_deleted_tickets removes them later in batches.
+        """
+        with transaction.atomic():
+            object_ids = list(
+                self.filter(deletedAt__isnull=True).values_list("pk", flat=True)
+            )
+            if object_ids:
+                self.model.all_objects.filter(pk__in=object_ids).update(
+                    deletedAt=now()
+                )
+                AuditEvent.objects.log_many(self.model, object_ids, actor, "delete")
+                objects_changed.send(
+                    sender=self.model, object_ids=object_ids, action="delete"
+                )
+                self.soft_delete_related(object_ids, actor)
+        return object_ids
+
+    def soft_delete_related(self, object_ids, actor):
+        pass
+
+
+class TicketQuerySet(SoftDeleteQuerySet):
+
+    def soft_delete_related(self, object_ids, actor):
+        allocation_model = self.model._meta.get_field("allocations").related_model
+        allocation_model.objects.filter(ticket__in=object_ids).soft_delete(actor)
+
+
+class LiveManager(Manager):
+    """
+    Default manager of soft deletable models, hides the deleted rows.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deletedAt__isnull=True)
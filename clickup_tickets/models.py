@@ -6,25 +6,29 @@ from django.db.models import (
     DateTimeField,
     DurationField,
     IntegerField,
+    JSONField,
+    PositiveBigIntegerField,
     FileField,
 )
 from django.db.models import ForeignKey, CASCADE, SET_NULL, ManyToManyField
+from django.db.models import Manager, Index, Q
 from django.core.validators import RegexValidator
 from django.utils.timezone import timedelta
 
+from clickup_utils.fields import primary_key_field
 from clickup_utils.utils import (
-    generate_uuid,
     ticket_attachment_path,
     ticket_allocation_attachment_path,
 )
 from clickup_projects.models import Employee, TeamMember, Lists, Sprints
+from clickup_activity.models import ChangeTrackedModel
+
+from .managers import LiveManager, SoftDeleteQuerySet, TicketQuerySet
 
 
 # Create your models here.
 class Priority(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     title = CharField()
 
     def __str__(self) -> str:
@@ -32,9 +36,7 @@ class Priority(Model):
 
 
 class TicketStatus(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
     title = CharField()
     icon = CharField()
     colorInfo = CharField(
@@ -52,10 +54,8 @@ class TicketStatus(Model):
         return self.title
 
 
-class Ticket(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+class Ticket(ChangeTrackedModel):
+    _id = primary_key_field()
     type = CharField()
     title = CharField()
     customId = CharField(unique=True, editable=False)
@@ -71,6 +71,7 @@ class Ticket(Model):
     )
     createdAt = DateTimeField(auto_now=True)
     updatedAt = DateTimeField(auto_now_add=True)
+    # Superseded by clickup_activity.AuditEvent, kept until fold_audit_m2m has run
     createdBy = ManyToManyField(Employee, related_name="created_ticket")
     updatedBy = ManyToManyField(
         Employee,
@@ -82,6 +83,27 @@ class Ticket(Model):
         related_name="deleted_ticket",
         blank=True,
     )
+    deletedAt = DateTimeField(null=True, blank=True)
+
+    objects = LiveManager.from_queryset(TicketQuerySet)()
+    all_objects = Manager.from_queryset(TicketQuerySet)()
+
+    # Columns deferred per endpoint, see LoadProfileQuerySet.profile
+    load_profiles = {"board": ("description",)}
+
+    class Meta:
+        indexes = [
+            Index(
+                fields=["list", "sprint"],
+                condition=Q(deletedAt__isnull=True),
+                name="ticket_live_list_sprint_idx",
+            ),
+            Index(
+                fields=["deletedAt"],
+                condition=Q(deletedAt__isnull=False),
+                name="ticket_deleted_idx",
+            ),
+        ]
 
     def generate_custom_id(self):
         if self.list:
@@ -89,7 +111,7 @@ class Ticket(Model):
         else:
             short_code = self.sprint.project.shortCode
 
-        last_instance = Ticket.objects.order_by("customId").last()
+        last_instance = Ticket.all_objects.order_by("customId").last()
 
         if last_instance:
             last_id = int(last_instance.customId[3:])
@@ -107,10 +129,8 @@ class Ticket(Model):
         return self.title
 
 
-class TicketAllocation(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+class TicketAllocation(ChangeTrackedModel):
+    _id = primary_key_field()
     title = CharField()
     priority = ForeignKey(Priority, on_delete=SET_NULL, null=True)
     ticketStatus = ForeignKey(TicketStatus, on_delete=SET_NULL, null=True)
@@ -123,6 +143,7 @@ class TicketAllocation(Model):
     ticket = ForeignKey(Ticket, on_delete=CASCADE, related_name="allocations")
     createdAt = DateTimeField(auto_now=True)
     updatedAt = DateTimeField(auto_now_add=True)
+    # Superseded by clickup_activity.AuditEvent, kept until fold_audit_m2m has run
     createdBy = ManyToManyField(
         Employee,
         related_name="created_allocations",
@@ -138,10 +159,34 @@ class TicketAllocation(Model):
         blank=True,
     )
     _v = IntegerField(default=0)
+    deletedAt = DateTimeField(null=True, blank=True)
+
+    objects = LiveManager.from_queryset(SoftDeleteQuerySet)()
+    all_objects = Manager.from_queryset(SoftDeleteQuerySet)()
+
+    # Columns deferred per endpoint, see LoadProfileQuerySet.profile
+    load_profiles = {
+        "board": ("description",),
+        "list": ("description",),
+    }
+
+    class Meta:
+        indexes = [
+            Index(
+                fields=["ticket", "ticketStatus"],
+                condition=Q(deletedAt__isnull=True),
+                name="allocation_live_status_idx",
+            ),
+            Index(
+                fields=["deletedAt"],
+                condition=Q(deletedAt__isnull=False),
+                name="allocation_deleted_idx",
+            ),
+        ]
 
     def generate_custom_id(self):
         custom_id = self.ticket.customId
-        last_instance = self.ticket.allocations.last()
+        last_instance = TicketAllocation.all_objects.filter(ticket=self.ticket).last()
         if last_instance:
             last_id = int(last_instance.customId.split("#")[1])
             new_id = last_id + 1
@@ -159,28 +204,68 @@ class TicketAllocation(Model):
 
 
 class TicketAttachment(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
 
     type = CharField()
     ticket = ForeignKey(Ticket, on_delete=CASCADE, related_name="attachment")
     files = FileField(upload_to=ticket_attachment_path)
+    # Filled in by the process_attachment task
+    size = PositiveBigIntegerField(null=True, blank=True)
+    contentType = CharField(null=True, blank=True)
+    filesDerivatives = JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self) -> str:
         return self.file.path
 
 
 class TicketAllocationAttachment(Model):
-    _id = CharField(
-        primary_key=True, default=generate_uuid, max_length=32, editable=False
-    )
+    _id = primary_key_field()
 
     type = CharField()
     ticket_allocation = ForeignKey(
         TicketAllocation, on_delete=CASCADE, related_name="attachment"
     )
     files = FileField(upload_to=ticket_allocation_attachment_path)
+    # Filled in by the process_attachment task
+    size = PositiveBigIntegerField(null=True, blank=True)
+    contentType = CharField(null=True, blank=True)
+    filesDerivatives = JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self) -> str:
         return self.file.path
+
+
+class BoardCard(Model):
+    """
+    Denormalized board row of a live allocation with its ticket rendered as
+    JSON, maintained by clickup_tickets.board.
+    """
+
+    allocationId = CharField(primary_key=True)
+    ticketId = CharField()
+    listId = CharField(null=True)
+    sprintId = CharField(null=True)
+    statusId = CharField(null=True)
+    statusTitle = CharField(null=True)
+    ticketOrder = CharField()
+    allocationOrder = CharField()
+    ticketJson = TextField()
+    allocationJson = TextField()
+
+    class Meta:
+        indexes = [
+            Index(
+                fields=[
+                    "listId",
+                    "sprintId",
+                    "statusId",
+                    "ticketOrder",
+                    "allocationOrder",
+                ],
+                name="boardcard_column_idx",
+            ),
+            Index(fields=["ticketId"], name="boardcard_ticket_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return self.allocationId
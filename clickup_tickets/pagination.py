@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
@@ -5,6 +6,7 @@ from rest_framework.response import Response
 class ClickUpTicketPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "limit"
+    max_page_size = settings.MAX_PAGE_SIZE
 
     def get_paginated_response(self, data):
         data[0].update(
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .consumers import BoardConsumer
+
+
+websocket_urlpatterns = [
+    path("ws/board", BoardConsumer.as_asgi(), name="board"),
+]
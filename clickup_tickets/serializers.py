@@ -1,5 +1,10 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils.timezone import now
 from rest_framework.serializers import ModelSerializer, Serializer
 from rest_framework.serializers import CharField, DateField, DateTimeField, IntegerField
+from rest_framework.serializers import ListField, PrimaryKeyRelatedField
 from rest_framework.serializers import ValidationError
 
 from .models import (
@@ -10,9 +15,17 @@ from .models import (
     TicketAllocationAttachment,
     TicketAttachment,
 )
+from .tasks import process_attachment
+from . import analytics
+from .consumers import tickets_groups
 
-from clickup_projects.models import TeamMember, Employee
+from clickup_projects.models import TeamMember, Employee, Lists, Sprints
+from clickup_activity.models import AuditEvent
+from clickup_activity.signals import objects_changed
 from clickup_projects.serializers import TeamMemberSerializer
+from clickup_utils.budget import BudgetedListSerializer
+from clickup_utils.serializers import SparseFieldsetMixin, ThumbnailsField
+from clickup_utils.utils import request_actor
 from clickup_utils.validators import check_name, check_date_below
 
 
@@ -30,21 +43,28 @@ class TicketStatusSerializer(ModelSerializer):
 
 class TicketEmployeeSerializer(ModelSerializer):
     employeeName = CharField(source="user.get_full_name")
+    photoThumbnails = ThumbnailsField(source="photo")
 
     class Meta:
         model = Employee
-        fields = ("_id", "employeeName", "photo")
+        fields = ("_id", "employeeName", "photo", "photoThumbnails")
 
 
-class TicketAllocationSerializer(ModelSerializer):
+class TicketAllocationSerializer(SparseFieldsetMixin, ModelSerializer):
     assignedUsers = TeamMemberSerializer(many=True)
-    createdBy = TicketEmployeeSerializer(many=True)
-    updatedBy = TicketEmployeeSerializer(many=True)
-    deletedBy = TicketEmployeeSerializer(many=True)
 
     class Meta:
         model = TicketAllocation
-        fields = "__all__"
+        exclude = ("createdBy", "updatedBy", "deletedBy")
+        expandable = ("assignedUsers",)
+        list_serializer_class = BudgetedListSerializer
+        # Served by the detail endpoint, or with ?expand=description
+        deferred = ("description",)
+
+
+class TicketAllocationDetailSerializer(TicketAllocationSerializer):
+    class Meta(TicketAllocationSerializer.Meta):
+        deferred = ()
 
 
 class AllocationTeamMemberSerializer(ModelSerializer):
@@ -82,10 +102,21 @@ class TicketAllocationUpdateSerializer(ModelSerializer):
             team_member = TeamMember.objects.get(**user)
             allocation.assignedUsers.add(team_member)
 
-        allocation.createdBy.add(self.context.get("request").user.employee)
+        AuditEvent.objects.log(
+            allocation, request_actor(self.context.get("request")), "create"
+        )
         return allocation
 
     def update(self, instance: TicketAllocation, validated_data):
+        audited_data = dict(validated_data)
+        if validated_data.get("assignedUsers"):
+            audited_data["assignedUsers"] = [
+                user["_id"] for user in validated_data["assignedUsers"]
+            ]
+        else:
+            audited_data.pop("assignedUsers", None)
+        changes = AuditEvent.objects.field_changes(instance, audited_data)
+
         instance.title = validated_data.get("title", instance.title)
         instance.priority = validated_data.get("priority", instance.priority)
         instance.ticketStatus = validated_data.get(
@@ -98,8 +129,6 @@ class TicketAllocationUpdateSerializer(ModelSerializer):
         instance.startDate = validated_data.get("startDate", instance.startDate)
         instance.dueDate = validated_data.get("dueDate", instance.dueDate)
 
-        instance.updatedBy.add(self.context.get("request").user.employee)
-
         if validated_data.get("assignedUsers"):
             assigned_users_data = validated_data.get("assignedUsers")
             instance.assignedUsers.clear()
@@ -108,7 +137,10 @@ class TicketAllocationUpdateSerializer(ModelSerializer):
                 instance.assignedUsers.add(team_member)
 
         instance.save()
-        
+
+        AuditEvent.objects.log(
+            instance, request_actor(self.context.get("request")), "update", changes
+        )
         return instance
 
     def validate_assignedUsers(self, value):
@@ -129,11 +161,8 @@ class TicketAllocationUpdateSerializer(ModelSerializer):
         return super().validate(data)
 
 
-class TicketSerializer(ModelSerializer):
+class TicketSerializer(SparseFieldsetMixin, ModelSerializer):
     allocations = TicketAllocationSerializer(many=True)
-    createdBy = TicketEmployeeSerializer(many=True)
-    updatedBy = TicketEmployeeSerializer(many=True)
-    deletedBy = TicketEmployeeSerializer(many=True)
 
     class Meta:
         model = Ticket
@@ -151,10 +180,11 @@ class TicketSerializer(ModelSerializer):
             "createdAt",
             "updatedAt",
             "allocations",
-            "createdBy",
-            "updatedBy",
-            "deletedBy",
         )
+        expandable = ("allocations",)
+        list_serializer_class = BudgetedListSerializer
+        # Served by GET ticket/<id>, or with ?expand=description
+        deferred = ("description",)
 
 
 class TicketTotalCount(Serializer):
@@ -194,8 +224,12 @@ class TicketUpdateSerializer(ModelSerializer):
         )
 
     def update(self, instance, validated_data):
-        instance.updatedBy.add(self.context.get("request").user.employee)
-        return super().update(instance, validated_data)
+        changes = AuditEvent.objects.field_changes(instance, validated_data)
+        instance = super().update(instance, validated_data)
+        AuditEvent.objects.log(
+            instance, request_actor(self.context.get("request")), "update", changes
+        )
+        return instance
 
     def validate(self, data):
         start_date = data.get("startDate", self.instance.startDate)
@@ -207,14 +241,263 @@ class TicketUpdateSerializer(ModelSerializer):
         return super().validate(data)
 
 
+class BulkUpdateSerializer(Serializer):
+    """
+    Applies one ``patch`` to every object of ``ids`` with set based writes in
+    a single transaction. The patch is validated once, the objects are read
+    in one query and the result is reported per id: ``updated``,
+    ``unchanged``, ``notFound`` or ``invalid`` with the reason.
+    """
+
+    ids = ListField(child=CharField(), allow_empty=False)
+
+    # Extra arguments of the objects_changed signal, set by apply()
+    changed_kwargs = {}
+
+    def validate_ids(self, value):
+        if len(value) > settings.BULK_UPDATE_MAX_IDS:
+            raise ValidationError(
+                f"At most {settings.BULK_UPDATE_MAX_IDS} ids can be updated at once."
+            )
+        return list(dict.fromkeys(value))
+
+    def validate_patch(self, value):
+        if not value:
+            raise ValidationError("Patch should change at least one field.")
+        # Related objects are reduced to their primary keys
+        return {
+            field: (
+                [getattr(item, "pk", item) for item in new]
+                if isinstance(new, list)
+                else getattr(new, "pk", new)
+            )
+            for field, new in value.items()
+        }
+
+    def current_values(self, object_ids, patch):
+        """
+        ``{pk: {field: value}}`` of the patched fields (and ``check_fields``)
+        of the live objects, locked until the transaction ends.
+        """
+        model = self.Meta.model
+        # Ids the primary key can't hold (not a uuid in uuid storage) match
+        # no object, and would fail the whole query
+        valid_ids = []
+        for object_id in object_ids:
+            try:
+                model._meta.pk.to_python(object_id)
+            except DjangoValidationError:
+                continue
+            valid_ids.append(object_id)
+
+        # Only the objects' own rows, PostgreSQL can't lock the nullable side
+        # of the outer joins check_fields may add
+        return {
+            row.pop("pk"): row
+            for row in model.objects.select_for_update(of=("self",))
+            .filter(pk__in=valid_ids)
+            .values("pk", *patch, *self.Meta.check_fields)
+        }
+
+    def check(self, values, patch):
+        """
+        Reason the patch can't be applied to an object, None when it can.
+        """
+        return None
+
+    def apply(self, object_ids, patch):
+        # createdAt is the auto_now (last modified) field of these models and
+        # update() skips auto_now, so it is set explicitly
+        self.Meta.model.objects.filter(pk__in=object_ids).update(
+            **patch, createdAt=now()
+        )
+
+    def create(self, validated_data):
+        model = self.Meta.model
+        object_ids, patch = validated_data["ids"], validated_data["patch"]
+        results = {}
+        changes = {}
+
+        with transaction.atomic():
+            current = self.current_values(object_ids, patch)
+            for object_id in object_ids:
+                values = current.get(object_id)
+                if values is None:
+                    results[object_id] = {"status": "notFound"}
+                    continue
+
+                error = self.check(values, patch)
+                if error:
+                    results[object_id] = {"status": "invalid", "error": error}
+                    continue
+
+                object_changes = {
+                    field: [values[field], value]
+                    for field, value in patch.items()
+                    if values[field] != value
+                }
+                if object_changes:
+                    changes[object_id] = object_changes
+                    results[object_id] = {"status": "updated"}
+                else:
+                    results[object_id] = {"status": "unchanged"}
+
+            if changes:
+                self.apply(list(changes), patch)
+                AuditEvent.objects.log_changes(
+                    model, changes, request_actor(self.context["request"]), "update"
+                )
+                objects_changed.send(
+                    sender=model,
+                    object_ids=list(changes),
+                    action="update",
+                    **self.changed_kwargs,
+                )
+
+        return {
+            "updated": len(changes),
+            "results": [
+                {"_id": object_id, **result} for object_id, result in results.items()
+            ],
+        }
+
+
+class TicketBulkPatchSerializer(Serializer):
+    list = PrimaryKeyRelatedField(
+        queryset=Lists.objects.all(), allow_null=True, required=False
+    )
+    sprint = PrimaryKeyRelatedField(
+        queryset=Sprints.objects.all(), allow_null=True, required=False
+    )
+    priority = PrimaryKeyRelatedField(
+        queryset=Priority.objects.all(), allow_null=True, required=False
+    )
+
+    def validate(self, data):
+        if "list" in data or "sprint" in data:
+            # A ticket sits on either a list or a sprint board
+            data.setdefault("list", None)
+            data.setdefault("sprint", None)
+            if (data["list"] is None) == (data["sprint"] is None):
+                raise ValidationError("Move to either a list or a sprint.")
+        return super().validate(data)
+
+
+class TicketBulkUpdateSerializer(BulkUpdateSerializer):
+    """
+    Moves (``list`` or ``sprint``) and reprioritizes tickets.
+    """
+
+    patch = TicketBulkPatchSerializer()
+
+    class Meta:
+        model = Ticket
+        check_fields = ("list__project", "sprint__project")
+
+    def validate_patch(self, value):
+        patch = super().validate_patch(value)
+        self.target_project = None
+        if patch.get("list"):
+            self.target_project = value["list"].project_id
+        elif patch.get("sprint"):
+            self.target_project = value["sprint"].project_id
+        return patch
+
+    def check(self, values, patch):
+        project = values["list__project"] or values["sprint__project"]
+        if self.target_project and project != self.target_project:
+            return "Tickets can't be moved to another project."
+        return None
+
+    def apply(self, object_ids, patch):
+        # Expires the analytics of the boards the tickets are moved out of
+        analytics.invalidate(object_ids)
+        if "list" in patch or "sprint" in patch:
+            # So the boards they leave are told, see signals.tickets_changed
+            self.changed_kwargs = {"previous_groups": tickets_groups(object_ids)}
+        super().apply(object_ids, patch)
+
+
+class TicketAllocationBulkPatchSerializer(Serializer):
+    ticketStatus = PrimaryKeyRelatedField(
+        queryset=TicketStatus.objects.all(), required=False
+    )
+    priority = PrimaryKeyRelatedField(
+        queryset=Priority.objects.all(), allow_null=True, required=False
+    )
+    assignedUsers = ListField(child=CharField(), required=False)
+
+    def validate_assignedUsers(self, value):
+        value = list(dict.fromkeys(value))
+        existing = set(
+            TeamMember.objects.filter(_id__in=value).values_list("_id", flat=True)
+        )
+        for user in value:
+            if user not in existing:
+                raise ValidationError("TeamMember Doesn't Exist " + user)
+        return sorted(value)
+
+
+class TicketAllocationBulkUpdateSerializer(BulkUpdateSerializer):
+    """
+    Changes the status or priority of allocations and replaces their
+    assignees.
+    """
+
+    patch = TicketAllocationBulkPatchSerializer()
+
+    class Meta:
+        model = TicketAllocation
+        check_fields = ()
+
+    def current_values(self, object_ids, patch):
+        fields = [field for field in patch if field != "assignedUsers"]
+        current = super().current_values(object_ids, fields)
+        if "assignedUsers" in patch:
+            for values in current.values():
+                values["assignedUsers"] = []
+            for allocation_id, team_member_id in (
+                TicketAllocation.assignedUsers.through.objects.filter(
+                    ticketallocation__in=list(current)
+                )
+                .order_by("teammember")
+                .values_list("ticketallocation", "teammember")
+            ):
+                current[allocation_id]["assignedUsers"].append(team_member_id)
+        return current
+
+    def apply(self, object_ids, patch):
+        patch = dict(patch)
+        assigned_users = patch.pop("assignedUsers", None)
+        super().apply(object_ids, patch)
+
+        if assigned_users is not None:
+            through = TicketAllocation.assignedUsers.through
+            through.objects.filter(ticketallocation__in=object_ids).delete()
+            through.objects.bulk_create(
+                [
+                    through(ticketallocation_id=allocation_id, teammember_id=user)
+                    for allocation_id in object_ids
+                    for user in assigned_users
+                ]
+            )
+
+
 class TicketAllocationAttachmentUpdateSerializer(ModelSerializer):
+    previews = ThumbnailsField(source="files")
+
     class Meta:
         model = TicketAllocationAttachment
-        fields = ("files",)
+        fields = ("files", "size", "contentType", "previews")
+        read_only_fields = ("size", "contentType")
 
     def create(self, validated_data):
         validated_data["ticket_allocation_id"] = self.context["allocation_id"]
-        return super().create(validated_data)
+        attachment = super().create(validated_data)
+        process_attachment.delay(
+            model=TicketAllocationAttachment._meta.label, attachment_id=attachment._id
+        )
+        return attachment
 
     def validate(self, data):
         allocation_id = self.context["allocation_id"]
@@ -226,13 +509,20 @@ class TicketAllocationAttachmentUpdateSerializer(ModelSerializer):
 
 
 class TicketAttachmentUpdateSerializer(ModelSerializer):
+    previews = ThumbnailsField(source="files")
+
     class Meta:
         model = TicketAttachment
-        fields = fields = ("files",)
+        fields = fields = ("files", "size", "contentType", "previews")
+        read_only_fields = ("size", "contentType")
 
     def create(self, validated_data):
         validated_data["ticket_id"] = self.context["ticket_id"]
-        return super().create(validated_data)
+        attachment = super().create(validated_data)
+        process_attachment.delay(
+            model=TicketAttachment._meta.label, attachment_id=attachment._id
+        )
+        return attachment
 
     def validate(self, data):
         ticket_id = self.context["ticket_id"]
@@ -0,0 +1,337 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models.signals import (
+    pre_save,
+    post_save,
+    pre_delete,
+    post_delete,
+    m2m_changed,
+)
+from django.dispatch import receiver
+
+from clickup_activity.signals import objects_changed
+from clickup_auth.models import ClickUpUser
+from clickup_projects.models import Department, Employee, Role, TeamMember
+
+from . import analytics
+from .board import schedule_refresh, schedule_removal
+from .consumers import ticket_groups, tickets_groups
+from .models import (
+    Ticket,
+    TicketAllocation,
+    TicketStatus,
+    TicketAttachment,
+    TicketAllocationAttachment,
+)
+
+
+def broadcast(groups, delta):
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not groups:
+        return
+
+    def send():
+        for group in groups:
+            async_to_sync(channel_layer.group_send)(
+                group, {"type": "board.delta", "delta": delta}
+            )
+
+    transaction.on_commit(send)
+
+
+def broadcast_ticket(ticket, action, groups, previous_groups=()):
+    """
+    Sends the ticket delta to its boards, and a "removed" one to the boards
+    it was moved off.
+    """
+    broadcast(groups, ticket_delta(ticket, action))
+    broadcast(
+        [group for group in previous_groups if group not in groups],
+        ticket_delta(ticket, "removed"),
+    )
+
+
+def ticket_delta(ticket, action):
+    return {
+        "type": "ticket",
+        "action": action,
+        "_id": ticket._id,
+        "customId": ticket.customId,
+        "title": ticket.title,
+        "list": ticket.list_id,
+        "sprint": ticket.sprint_id,
+        "priority": ticket.priority_id,
+    }
+
+
+def allocation_delta(allocation, action):
+    return {
+        "type": "allocation",
+        "action": action,
+        "_id": allocation._id,
+        "ticket": allocation.ticket_id,
+        "customId": allocation.customId,
+        "title": allocation.title,
+        "priority": allocation.priority_id,
+        "ticketStatus": allocation.ticketStatus_id,
+    }
+
+
+def attachment_delta(attachment, action):
+    delta = {
+        "type": "attachment",
+        "action": action,
+        "_id": attachment._id,
+        "files": attachment.files.name,
+    }
+    if isinstance(attachment, TicketAttachment):
+        delta["ticket"] = attachment.ticket_id
+    else:
+        delta["allocation"] = attachment.ticket_allocation_id
+    return delta
+
+
+@receiver(pre_save, sender=Ticket)
+def ticket_saving(sender, instance, **kwargs):
+    # The boards showing the ticket before a move, see ticket_saved
+    if not instance._state.adding:
+        instance._previous_groups = ticket_groups(instance._id)
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(sender, instance, created, **kwargs):
+    action = "created" if created else "updated"
+    broadcast_ticket(
+        instance,
+        action,
+        ticket_groups(instance._id),
+        instance.__dict__.pop("_previous_groups", ()),
+    )
+
+
+@receiver(pre_delete, sender=Ticket)
+def ticket_deleted(sender, instance, **kwargs):
+    if instance.deletedAt:
+        return
+    broadcast(ticket_groups(instance._id), ticket_delta(instance, "deleted"))
+
+
+@receiver(post_save, sender=TicketAllocation)
+def allocation_saved(sender, instance, created, **kwargs):
+    action = "created" if created else "updated"
+    broadcast(ticket_groups(instance.ticket_id), allocation_delta(instance, action))
+
+
+@receiver(pre_delete, sender=TicketAllocation)
+def allocation_deleted(sender, instance, **kwargs):
+    if instance.deletedAt:
+        return
+    broadcast(ticket_groups(instance.ticket_id), allocation_delta(instance, "deleted"))
+
+
+DELTA_ACTIONS = {"create": "created", "update": "updated", "delete": "deleted"}
+
+
+@receiver(objects_changed, sender=Ticket)
+def tickets_changed(sender, object_ids, action, previous_groups=None, **kwargs):
+    """
+    ``previous_groups`` is the tickets_groups() of a bulk move before it.
+    """
+    groups = tickets_groups(object_ids)
+    for ticket in Ticket.all_objects.filter(_id__in=object_ids):
+        broadcast_ticket(
+            ticket,
+            DELTA_ACTIONS[action],
+            groups.get(ticket._id, []),
+            (previous_groups or {}).get(ticket._id, ()),
+        )
+
+
+@receiver(objects_changed, sender=TicketAllocation)
+def allocations_changed(sender, object_ids, action, **kwargs):
+    allocations = list(TicketAllocation.all_objects.filter(_id__in=object_ids))
+    groups = tickets_groups({allocation.ticket_id for allocation in allocations})
+    for allocation in allocations:
+        broadcast(
+            groups.get(allocation.ticket_id),
+            allocation_delta(allocation, DELTA_ACTIONS[action]),
+        )
+
+
+@receiver(m2m_changed, sender=TicketAllocation.assignedUsers.through)
+def allocation_assigned_users_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        allocations = [instance]
+    elif pk_set:
+        # Changed from the TeamMember side, pk_set holds the allocations
+        allocations = list(TicketAllocation.all_objects.filter(_id__in=pk_set))
+    else:
+        return
+
+    assigned_users = {allocation._id: [] for allocation in allocations}
+    for allocation_id, team_member_id in sender.objects.filter(
+        ticketallocation__in=list(assigned_users)
+    ).values_list("ticketallocation", "teammember"):
+        assigned_users[allocation_id].append(team_member_id)
+
+    groups = tickets_groups({allocation.ticket_id for allocation in allocations})
+    for allocation in allocations:
+        delta = allocation_delta(allocation, "updated")
+        delta["assignedUsers"] = assigned_users[allocation._id]
+        broadcast(groups.get(allocation.ticket_id), delta)
+
+
+@receiver(post_save, sender=TicketAttachment)
+def ticket_attachment_saved(sender, instance, created, **kwargs):
+    action = "created" if created else "updated"
+    broadcast(ticket_groups(instance.ticket_id), attachment_delta(instance, action))
+
+
+@receiver(pre_delete, sender=TicketAttachment)
+def ticket_attachment_deleted(sender, instance, **kwargs):
+    broadcast(ticket_groups(instance.ticket_id), attachment_delta(instance, "deleted"))
+
+
+@receiver(post_save, sender=TicketAllocationAttachment)
+def allocation_attachment_saved(sender, instance, created, **kwargs):
+    action = "created" if created else "updated"
+    ticket_id = (
+        TicketAllocation.all_objects.filter(_id=instance.ticket_allocation_id)
+        .values_list("ticket_id", flat=True)
+        .first()
+    )
+    broadcast(ticket_groups(ticket_id), attachment_delta(instance, action))
+
+
+@receiver(pre_delete, sender=TicketAllocationAttachment)
+def allocation_attachment_deleted(sender, instance, **kwargs):
+    ticket_id = (
+        TicketAllocation.all_objects.filter(_id=instance.ticket_allocation_id)
+        .values_list("ticket_id", flat=True)
+        .first()
+    )
+    broadcast(ticket_groups(ticket_id), attachment_delta(instance, "deleted"))
+
+
+# BoardCard maintenance, see clickup_tickets.board
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_board_cards(sender, instance, **kwargs):
+    schedule_refresh(ticket=instance._id)
+
+
+@receiver(post_save, sender=TicketAllocation)
+def allocation_board_cards(sender, instance, **kwargs):
+    schedule_refresh(_id=instance._id)
+
+
+# Hard deletes (admin, cascades, purge_deleted_tickets) leave nothing for a
+# refresh to find, the cards are removed by id
+
+
+@receiver(post_delete, sender=Ticket)
+def deleted_ticket_board_cards(sender, instance, **kwargs):
+    schedule_removal(ticketId=instance._id)
+
+
+@receiver(post_delete, sender=TicketAllocation)
+def deleted_allocation_board_cards(sender, instance, **kwargs):
+    schedule_removal(allocationId=instance._id)
+
+
+@receiver(m2m_changed, sender=TicketAllocation.assignedUsers.through)
+def assigned_users_board_cards(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        schedule_refresh(_id=instance._id)
+    elif pk_set:
+        schedule_refresh(_id__in=pk_set)
+
+
+@receiver(objects_changed, sender=Ticket)
+def tickets_board_cards(sender, object_ids, **kwargs):
+    schedule_refresh(ticket__in=object_ids)
+
+
+@receiver(objects_changed, sender=TicketAllocation)
+def allocations_board_cards(sender, object_ids, **kwargs):
+    schedule_refresh(_id__in=object_ids)
+
+
+@receiver(post_save, sender=TicketStatus)
+def ticket_status_board_cards(sender, instance, **kwargs):
+    schedule_refresh(ticketStatus=instance._id)
+
+
+# The assignees are rendered into the cards with their user, role and department
+
+
+@receiver(post_save, sender=TeamMember)
+def team_member_board_cards(sender, instance, **kwargs):
+    schedule_refresh(assignedUsers=instance._id)
+
+
+@receiver(post_save, sender=Employee)
+def employee_board_cards(sender, instance, **kwargs):
+    schedule_refresh(assignedUsers__user=instance._id)
+
+
+@receiver(objects_changed, sender=Employee)
+def employees_board_cards(sender, object_ids, **kwargs):
+    schedule_refresh(assignedUsers__user__in=object_ids)
+
+
+@receiver(post_save, sender=ClickUpUser)
+def user_board_cards(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {"last_login", "password"}:
+        return
+    schedule_refresh(assignedUsers__user__user=instance.pk)
+
+
+@receiver(post_save, sender=Role)
+def role_board_cards(sender, instance, **kwargs):
+    schedule_refresh(assignedUsers__user__role=instance._id)
+
+
+@receiver(post_save, sender=Department)
+def department_board_cards(sender, instance, **kwargs):
+    schedule_refresh(assignedUsers__user__role__department=instance._id)
+
+
+# Cached analytics, see clickup_tickets.analytics
+
+
+@receiver(pre_save, sender=Ticket)
+@receiver(post_save, sender=Ticket)
+def ticket_analytics(sender, instance, **kwargs):
+    # Before and after the save so moving a ticket expires both sprints
+    analytics.invalidate([instance._id])
+
+
+@receiver(post_save, sender=TicketAllocation)
+@receiver(post_delete, sender=TicketAllocation)
+def allocation_analytics(sender, instance, **kwargs):
+    analytics.invalidate([instance.ticket_id])
+
+
+@receiver(objects_changed, sender=Ticket)
+def tickets_analytics(sender, object_ids, **kwargs):
+    analytics.invalidate(object_ids)
+
+
+@receiver(objects_changed, sender=TicketAllocation)
+def allocations_analytics(sender, object_ids, **kwargs):
+    analytics.invalidate(
+        TicketAllocation.all_objects.filter(_id__in=object_ids).values_list(
+            "ticket", flat=True
+        )
+    )
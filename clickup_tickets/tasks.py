@@ -0,0 +1,27 @@
+import mimetypes
+
+from django.apps import apps
+
+from clickup_tasks.registry import task
+from clickup_utils.images import decodable, generate_derivatives
+
+
+@task
+def process_attachment(model, attachment_id):
+    attachment = apps.get_model(model).objects.get(_id=attachment_id)
+    attachment.size = attachment.files.size
+    attachment.contentType = (
+        mimetypes.guess_type(attachment.files.name)[0] or "application/octet-stream"
+    )
+    attachment.save(update_fields=["size", "contentType"])
+
+    if decodable(attachment.contentType):
+        try:
+            attachment.filesDerivatives = generate_derivatives(attachment.files)
+        except OSError:
+            # Corrupt or truncated (UnidentifiedImageError is an OSError), the
+            # attachment stays downloadable without thumbnails
+            pass
+        else:
+            attachment.save(update_fields=["filesDerivatives"])
+    return {"size": attachment.size, "contentType": attachment.contentType}
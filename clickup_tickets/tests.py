@@ -1,3 +1,568 @@
-from django.test import TestCase
+import json
+from asyncio import TimeoutError, wait_for
+from io import BytesIO
+from uuid import UUID
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils.timezone import localdate, now, timedelta
+from PIL import Image
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from clickup_activity.models import AuditEvent
+from clickup_auth.models import ClickUpUser
+from clickup_projects.models import (
+    Department,
+    Employee,
+    Lists,
+    Project,
+    Role,
+    Sprints,
+    TeamMember,
+)
+from clickup_utils.fields import HexUUIDField
+
+from . import analytics
+from .board import rebuild
+from .consumers import board_group
+from .models import (
+    BoardCard,
+    Priority,
+    Ticket,
+    TicketAllocation,
+    TicketAttachment,
+    TicketStatus,
+)
+from .tasks import process_attachment
+from .views import TicketAsyncView
+
+
+class TicketBulkUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+        cls.employee = Employee.objects.create(user=cls.user)
+        cls.project = Project.objects.create(name="Project", erpId=1, shortCode="PRJ")
+        cls.list = Lists.objects.create(name="List", project=cls.project)
+        cls.sprint = Sprints.objects.create(name="Sprint", project=cls.project)
+        cls.priority = Priority.objects.create(title="High")
+        cls.tickets = [
+            Ticket.objects.create(
+                type="task", title=f"Ticket {index}", description="", list=cls.list
+            )
+            for index in range(3)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bulk_update(self, ids, patch):
+        return self.client.patch(
+            "/api/ticket/bulk/", {"ids": ids, "patch": patch}, format="json"
+        )
+
+    def test_moves_tickets_to_a_sprint(self):
+        ids = [ticket._id for ticket in self.tickets]
+        response = self.bulk_update(ids + ["missing"], {"sprint": self.sprint._id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["updated"], 3)
+        self.assertEqual(
+            [result["status"] for result in response.data["data"]["results"]],
+            ["updated", "updated", "updated", "notFound"],
+        )
+        self.assertEqual(
+            set(Ticket.objects.filter(_id__in=ids).values_list("list", "sprint")),
+            {(None, self.sprint._id)},
+        )
+
+    def test_unchanged_tickets_are_not_written(self):
+        ticket = self.tickets[0]
+        response = self.bulk_update([ticket._id], {"priority": self.priority._id})
+        self.assertEqual(response.data["data"]["results"][0]["status"], "updated")
+
+        response = self.bulk_update([ticket._id], {"priority": self.priority._id})
+        self.assertEqual(response.data["data"]["updated"], 0)
+        self.assertEqual(response.data["data"]["results"][0]["status"], "unchanged")
+
+    def test_rejects_moves_to_another_project(self):
+        other_list = Lists.objects.create(
+            name="Other",
+            project=Project.objects.create(name="Other", erpId=2, shortCode="OTH"),
+        )
+        response = self.bulk_update([self.tickets[0]._id], {"list": other_list._id})
+
+        self.assertEqual(response.data["data"]["updated"], 0)
+        self.assertEqual(response.data["data"]["results"][0]["status"], "invalid")
+        self.tickets[0].refresh_from_db()
+        self.assertEqual(self.tickets[0].list_id, self.list._id)
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+)
+class BoardDeltaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+        cls.employee = Employee.objects.create(user=cls.user)
+        cls.project = Project.objects.create(name="Project", erpId=1, shortCode="PRJ")
+        cls.list = Lists.objects.create(name="List", project=cls.project)
+        cls.other_list = Lists.objects.create(name="Other", project=cls.project)
+        cls.ticket = Ticket.objects.create(
+            type="task", title="Ticket", description="", list=cls.list
+        )
+
+    def setUp(self):
+        self.channel_layer = get_channel_layer()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def subscribe(self, topic, object_id):
+        channel = async_to_sync(self.channel_layer.new_channel)()
+        async_to_sync(self.channel_layer.group_add)(
+            board_group(topic, object_id), channel
+        )
+        return channel
+
+    def deltas(self, channel):
+        async def receive_all():
+            deltas = []
+            while True:
+                try:
+                    message = await wait_for(self.channel_layer.receive(channel), 0.1)
+                except TimeoutError:
+                    return deltas
+                deltas.append(message["delta"])
+
+        return async_to_sync(receive_all)()
+
+    def test_moved_ticket_is_removed_from_its_previous_board(self):
+        old_board = self.subscribe("list", self.list._id)
+        new_board = self.subscribe("list", self.other_list._id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ticket.list = self.other_list
+            self.ticket.save()
+
+        self.assertEqual(
+            [(delta["action"], delta["_id"]) for delta in self.deltas(old_board)],
+            [("removed", self.ticket._id)],
+        )
+        self.assertEqual(
+            [(delta["action"], delta["_id"]) for delta in self.deltas(new_board)],
+            [("updated", self.ticket._id)],
+        )
+
+    def test_bulk_moved_tickets_are_removed_from_their_previous_board(self):
+        old_board = self.subscribe("list", self.list._id)
+        project_board = self.subscribe("project", self.project._id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                "/api/ticket/bulk/",
+                {"ids": [self.ticket._id], "patch": {"list": self.other_list._id}},
+                format="json",
+            )
+
+        self.assertEqual(
+            [delta["action"] for delta in self.deltas(old_board)], ["removed"]
+        )
+        # Still on the project's board
+        self.assertEqual(
+            [delta["action"] for delta in self.deltas(project_board)], ["updated"]
+        )
+
+    def test_assignees_added_from_the_team_member_side(self):
+        allocation = TicketAllocation.objects.create(
+            title="Allocation", description="", ticket=self.ticket
+        )
+        team_member = TeamMember.objects.create(user=self.employee)
+        board = self.subscribe("list", self.list._id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            team_member.ticketallocation_set.add(allocation)
+
+        deltas = self.deltas(board)
+        self.assertEqual(len(deltas), 1)
+        self.assertEqual(deltas[0]["_id"], allocation._id)
+        self.assertEqual(deltas[0]["assignedUsers"], [team_member._id])
+
+
+class AnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = Project.objects.create(name="Project", erpId=1, shortCode="PRJ")
+        cls.sprint = Sprints.objects.create(name="Sprint", project=cls.project)
+        cls.todo = TicketStatus.objects.create(title="Todo", icon="i", colorInfo="#fff")
+        cls.done = TicketStatus.objects.create(
+            title="Completed", icon="i", colorInfo="#fff"
+        )
+        cls.first_ticket, cls.second_ticket = [
+            Ticket.objects.create(
+                type="task", title=title, description="", sprint=cls.sprint
+            )
+            for title in ("First", "Second")
+        ]
+
+    def days_ago(self, days):
+        return now() - timedelta(days=days)
+
+    def allocation(self, ticket, created, status, hours):
+        allocation = TicketAllocation.objects.create(
+            title="Allocation",
+            description="",
+            ticket=ticket,
+            ticketStatus=status,
+            estimationHours=timedelta(hours=hours),
+        )
+        # updatedAt is the creation time (auto_now_add)
+        TicketAllocation.objects.filter(_id=allocation._id).update(updatedAt=created)
+        return allocation
+
+    def move(self, allocation, status, time):
+        AuditEvent.objects.create(
+            model="clickup_tickets.ticketallocation",
+            objectId=allocation._id,
+            action="update",
+            changes={"ticketStatus": [allocation.ticketStatus_id, status._id]},
+            createdAt=time,
+        )
+        TicketAllocation.objects.filter(_id=allocation._id).update(ticketStatus=status)
+        allocation.ticketStatus = status
+
+    def day(self, result, days):
+        date = localdate() - timedelta(days=days)
+        (day,) = [day for day in result["days"] if day["date"] == date]
+        return {
+            "statuses": {status["title"]: status["count"] for status in day["statuses"]},
+            "remainingHours": day["remainingHours"],
+            "completion": day["completion"],
+        }
+
+    def test_days_are_replayed_from_the_status_transitions(self):
+        first = self.allocation(self.first_ticket, self.days_ago(3), self.todo, 2)
+        self.move(first, self.done, self.days_ago(2))
+        self.allocation(self.first_ticket, self.days_ago(2), self.todo, 1)
+        self.allocation(self.second_ticket, self.days_ago(1), self.todo, 4)
+
+        result = analytics.compute("sprint", self.sprint._id)
+
+        self.assertEqual(result["days"][0]["date"], localdate() - timedelta(days=3))
+        self.assertEqual(result["days"][-1]["date"], localdate())
+        self.assertEqual(
+            self.day(result, 3),
+            {"statuses": {"Todo": 1}, "remainingHours": 2, "completion": 0},
+        )
+        # The first ticket has an allocation in each status
+        self.assertEqual(
+            self.day(result, 2),
+            {
+                "statuses": {"Completed": 1, "Todo": 1},
+                "remainingHours": 1,
+                "completion": 0.5,
+            },
+        )
+        self.assertEqual(
+            self.day(result, 1),
+            {
+                "statuses": {"Completed": 1, "Todo": 2},
+                "remainingHours": 5,
+                "completion": 0.3333,
+            },
+        )
+        self.assertEqual(result["totalAllocations"], 3)
+        self.assertEqual(result["totalEstimationHours"], 7)
+
+    def test_editing_an_allocation_does_not_change_past_days(self):
+        allocation = self.allocation(self.first_ticket, self.days_ago(2), self.todo, 2)
+        before = analytics.compute("sprint", self.sprint._id)
+
+        self.move(allocation, self.done, now())
+        after = analytics.compute("sprint", self.sprint._id)
+
+        self.assertEqual(self.day(after, 2), self.day(before, 2))
+        self.assertEqual(self.day(after, 1), self.day(before, 1))
+        self.assertEqual(
+            self.day(after, 0),
+            {"statuses": {"Completed": 1}, "remainingHours": 0, "completion": 1},
+        )
+
+    def test_deleted_allocations_count_until_their_deletion(self):
+        allocation = self.allocation(self.first_ticket, self.days_ago(2), self.todo, 2)
+        TicketAllocation.objects.filter(_id=allocation._id).update(
+            deletedAt=self.days_ago(1)
+        )
+
+        result = analytics.compute("sprint", self.sprint._id)
+
+        self.assertEqual(self.day(result, 2)["statuses"], {"Todo": 1})
+        self.assertEqual(self.day(result, 1)["statuses"], {})
+        self.assertEqual(result["totalAllocations"], 0)
+
+
+class BoardQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+        role = Role.objects.create(
+            name="Developer", department=Department.objects.create(name="Engineering")
+        )
+        Employee.objects.create(user=cls.user, role=role)
+        project = Project.objects.create(name="Project", erpId=1, shortCode="PRJ")
+        cls.list = Lists.objects.create(name="List", project=project)
+        status = TicketStatus.objects.create(title="Todo", icon="i", colorInfo="#fff")
+        members = [
+            TeamMember.objects.create(
+                user=Employee.objects.create(
+                    user=ClickUpUser.objects.create_user(
+                        f"member{index}", "password", f"member{index}@example.com"
+                    ),
+                    role=role,
+                )
+            )
+            for index in range(2)
+        ]
+        # Several tickets, allocations and assignees, so a query per row
+        # would show in the counts
+        for ticket_index in range(3):
+            ticket = Ticket.objects.create(
+                type="task", title=f"Ticket {ticket_index}", description="", list=cls.list
+            )
+            for index in range(2):
+                allocation = TicketAllocation.objects.create(
+                    title=f"Allocation {index}",
+                    customId=f"{ticket.customId}#{index + 1}",
+                    description="",
+                    ticket=ticket,
+                    ticketStatus=status,
+                )
+                allocation.assignedUsers.set(members)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_board_queries_follow_the_selection(self):
+        # Sets the budget's statement_timeout on PostgreSQL, the connection
+        # keeps it for the following requests
+        self.client.get("/api/ticket/", {"listId": self.list._id})
+
+        # The status groups and the tickets, then one query per prefetched
+        # relation
+        for params, queries in [
+            ({}, 4),
+            ({"expand": ""}, 2),
+            ({"expand": "description"}, 2),
+            ({"expand": "allocations"}, 3),
+            ({"expand": "allocations.assignedUsers"}, 4),
+            ({"fields": "_id,title"}, 2),
+            ({"fields": "_id,allocations._id"}, 3),
+            ({"fields": "_id,allocations.assignedUsers._id"}, 4),
+        ]:
+            with self.subTest(**params):
+                with self.assertNumQueries(queries):
+                    response = self.client.get(
+                        "/api/ticket/", {"listId": self.list._id, **params}
+                    )
+                self.assertEqual(response.status_code, 200)
+
+
+@override_settings(BOARD_READ_MODEL=True)
+class BoardReadModelTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+        role = Role.objects.create(
+            name="Developer", department=Department.objects.create(name="Engineering")
+        )
+        employee = Employee.objects.create(user=cls.user, role=role)
+        # Set without save() so no thumbnail job runs
+        Employee.objects.filter(pk=employee.pk).update(
+            photo="photos/a.png",
+            photoDerivatives={
+                "source": "photos/a.png",
+                "version": "1",
+                "sizes": {"64": "photos/a.64.webp"},
+            },
+        )
+        project = Project.objects.create(name="Project", erpId=1, shortCode="PRJ")
+        cls.list = Lists.objects.create(name="List", project=project)
+        status = TicketStatus.objects.create(title="Todo", icon="i", colorInfo="#fff")
+        cls.ticket = Ticket.objects.create(
+            type="task", title="Ticket", description="", list=cls.list
+        )
+        cls.allocation = TicketAllocation.objects.create(
+            title="Allocation", description="", ticket=cls.ticket, ticketStatus=status
+        )
+        cls.allocation.assignedUsers.add(TeamMember.objects.create(user=employee))
+
+    def setUp(self):
+        rebuild()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def board(self):
+        response = self.client.get("/api/ticket/", {"listId": self.list._id})
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_cards_render_the_serialized_board(self):
+        with override_settings(BOARD_READ_MODEL=False):
+            serialized = self.board()
+
+        self.assertEqual(self.board(), serialized)
+        allocation = serialized["ticketData"][0]["data"][0]["allocations"][0]
+        assignee = allocation["assignedUsers"][0]
+        self.assertEqual(assignee["photo"], "http://testserver/media/photos/a.png")
+        self.assertEqual(
+            assignee["photoThumbnails"],
+            {"64": "http://testserver/media/photos/a.64.webp?v=1"},
+        )
+
+    def test_hard_deleted_allocations_and_tickets_lose_their_cards(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.allocation.delete()
+        self.assertFalse(BoardCard.objects.exists())
+
+        rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ticket.delete()
+
+        self.assertFalse(BoardCard.objects.exists())
+        self.assertEqual(self.board()["ticketData"], [])
+
+
+class IdQueryParamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = ClickUpUser.objects.create_user(
+            "user", "password", "user@example.com", is_active=True
+        )
+        cls.project = Project.objects.create(name="Project", erpId=1, shortCode="PRJ")
+        cls.list = Lists.objects.create(name="List", project=cls.project)
+        status = TicketStatus.objects.create(title="Todo", icon="i", colorInfo="#fff")
+        cls.ticket = Ticket.objects.create(
+            type="task", title="Ticket", description="", list=cls.list
+        )
+        TicketAllocation.objects.create(
+            title="Allocation", description="", ticket=cls.ticket, ticketStatus=status
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def async_board(self, params):
+        request = APIRequestFactory().get("/api/ticket/", params)
+        force_authenticate(request, self.user)
+        return async_to_sync(TicketAsyncView.as_view())(request)
+
+    def test_ids_read_back_as_the_hex_they_were_created_with(self):
+        ticket = Ticket.objects.get(_id=self.ticket._id)
+
+        self.assertEqual(ticket._id, self.ticket._id)
+        self.assertRegex(ticket._id, "^[0-9a-f]{32}$")
+        self.assertEqual(ticket.list_id, self.list._id)
+        field = HexUUIDField()
+        value = field.get_db_prep_value(ticket._id, connection)
+        self.assertEqual(field.from_db_value(value, None, connection), ticket._id)
+
+    def test_malformed_ids_are_rejected(self):
+        for params in [{"listId": "garbage"}, {"sprintId": "nope"}]:
+            for board_read_model in (False, True):
+                with self.subTest(**params, boardReadModel=board_read_model):
+                    with self.settings(BOARD_READ_MODEL=board_read_model):
+                        response = self.client.get("/api/ticket/", params)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn(next(iter(params)), response.data)
+            with self.subTest(**params, view="async"):
+                self.assertEqual(self.async_board(params).status_code, 400)
+
+        for path, params in [
+            ("/api/export/tickets", {"projectId": "garbage"}),
+            (f"/api/capacity/{self.project._id}", {"member": "nope"}),
+        ]:
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path, params).status_code, 400)
+
+    def test_ids_in_uuid_form_select_the_same_board(self):
+        hex_board = self.client.get("/api/ticket/", {"listId": self.list._id})
+        uuid_board = self.client.get(
+            "/api/ticket/", {"listId": str(UUID(self.list._id))}
+        )
+
+        self.assertEqual(uuid_board.status_code, 200)
+        self.assertEqual(uuid_board.data, hex_board.data)
+        self.assertEqual(
+            uuid_board.data["ticketData"][0]["data"][0]["_id"], self.ticket._id
+        )
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+)
+class ProcessAttachmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        project = Project.objects.create(name="Project", erpId=1, shortCode="PRJ")
+        cls.ticket = Ticket.objects.create(
+            type="task",
+            title="Ticket",
+            description="",
+            list=Lists.objects.create(name="List", project=project),
+        )
+
+    def process(self, name, content):
+        attachment = TicketAttachment.objects.create(
+            type="file", ticket=self.ticket, files=ContentFile(content, name=name)
+        )
+        process_attachment(
+            model="clickup_tickets.TicketAttachment", attachment_id=attachment._id
+        )
+        attachment.refresh_from_db()
+        return attachment
+
+    def test_images_get_thumbnails(self):
+        buffer = BytesIO()
+        Image.new("RGB", (300, 200)).save(buffer, "PNG")
+        attachment = self.process("photo.png", buffer.getvalue())
+
+        self.assertEqual(attachment.contentType, "image/png")
+        self.assertEqual(attachment.size, len(buffer.getvalue()))
+        self.assertEqual(
+            sorted(attachment.filesDerivatives["sizes"]), ["256", "32", "64"]
+        )
+
+    def test_images_pil_cannot_decode_are_kept_without_thumbnails(self):
+        for name, content, content_type in [
+            (
+                "diagram.svg",
+                b'<svg xmlns="http://www.w3.org/2000/svg"/>',
+                "image/svg+xml",
+            ),
+            ("broken.png", b"\x89PNG\r\n\x1a\n truncated", "image/png"),
+        ]:
+            with self.subTest(name=name):
+                attachment = self.process(name, content)
+
+                self.assertEqual(attachment.contentType, content_type)
+                self.assertEqual(attachment.size, len(content))
+                self.assertEqual(attachment.filesDerivatives, {})
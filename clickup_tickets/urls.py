@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 
@@ -8,6 +9,12 @@ from .views import (
     TicketViewSet,
     TicketAllocationAttachmentView,
     TicketAttachmentView,
+    PriorityAsyncView,
+    TicketStatusAsyncView,
+    TicketAsyncView,
+    AnalyticsView,
+    CapacityView,
+    ExportView,
 )
 
 
@@ -17,9 +24,16 @@ router.register(
 )
 router.register("ticket", TicketViewSet, basename="ticket")
 
+if settings.ASYNC_VIEWS:
+    priority_view = PriorityAsyncView.as_view()
+    ticket_status_view = TicketStatusAsyncView.as_view()
+else:
+    priority_view = PriorityView.as_view()
+    ticket_status_view = TicketStatusView.as_view()
+
 urlpatterns = [
-    path("priority", PriorityView.as_view(), name="priority"),
-    path("ticketStatus", TicketStatusView.as_view(), name="ticketStatus"),
+    path("priority", priority_view, name="priority"),
+    path("ticketStatus", ticket_status_view, name="ticketStatus"),
     re_path(
         r"ticket-allocation/attachment/(?P<pk>[0-9a-f-]+)",
         TicketAllocationAttachmentView.as_view(),
@@ -30,5 +44,21 @@ urlpatterns = [
         TicketAttachmentView.as_view(),
         name="ticket_attachment",
     ),
+    re_path(
+        r"analytics/(?P<scope>sprint|list|project)/(?P<pk>[0-9a-f-]+)",
+        AnalyticsView.as_view(),
+        name="analytics",
+    ),
+    re_path(r"capacity/(?P<pk>[0-9a-f-]+)", CapacityView.as_view(), name="capacity"),
+    re_path(
+        r"export/(?P<dataset>tickets|allocations|team-members)$",
+        ExportView.as_view(),
+        name="export",
+    ),
     path("", include(router.urls)),
 ]
+
+if settings.ASYNC_VIEWS:
+    urlpatterns.insert(
+        0, path("ticket/", TicketAsyncView.as_view(), name="ticket-list-async")
+    )
@@ -1,12 +1,23 @@
+import asyncio
+
 from rest_framework.generics import (
     ListAPIView,
     UpdateAPIView,
 )
+from rest_framework.decorators import action
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
 from django.db.models import Prefetch, Count
+from django.http import HttpResponse
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate, timedelta
+from asgiref.sync import sync_to_async
+
+from adrf.views import APIView as AsyncAPIView
 
 from drf_spectacular.utils import (
     extend_schema,
@@ -15,7 +26,16 @@ from drf_spectacular.utils import (
     OpenApiExample,
 )
 
+from clickup_projects.models import TeamMember, Project, Lists, Sprints
+from clickup_activity.views import AuditTrailMixin
 from clickup_projects.pagination import ClickUpPagination
+from clickup_utils.export import export_response, xlsx_available
+from clickup_utils.serializers import sparse_includes, sparse_params, sparse_requests
+from clickup_utils.utils import aevaluate, id_params, parse_id, request_actor
+from .analytics import get_analytics
+from .capacity import compute as compute_capacity
+from .exports import DATASETS
+from .board import column_body
 from .pagination import ClickUpTicketPagination
 
 from .models import (
@@ -31,7 +51,10 @@ from .serializers import (
     PrioritySerializer,
     TicketStatusSerializer,
     TicketAllocationSerializer,
+    TicketAllocationDetailSerializer,
     TicketAllocationUpdateSerializer,
+    TicketAllocationBulkUpdateSerializer,
+    TicketBulkUpdateSerializer,
     TicketGroupSerializer,
     TicketUpdateSerializer,
     TicketAllocationAttachmentUpdateSerializer,
@@ -39,6 +62,70 @@ from .serializers import (
 )
 
 
+def board_prefetch(allocations, request=None):
+    """
+    Prefetches everything TicketSerializer touches so a board column
+    serializes without further queries, leaving out the relations pruned
+    by the request's ``fields``/``expand``.
+    """
+    if not sparse_includes(request, "allocations"):
+        return ()
+
+    allocations = allocations.profile(
+        "board", keep=requested_columns(request, "allocations.")
+    )
+    if sparse_includes(request, "allocations.assignedUsers"):
+        allocations = allocations.prefetch_related(
+            Prefetch(
+                "assignedUsers",
+                queryset=TeamMember.objects.select_related(
+                    "user__user", "user__role__department"
+                ),
+            ),
+        )
+    return (Prefetch("allocations", queryset=allocations),)
+
+
+def requested_columns(request, prefix=""):
+    """
+    The columns of the load profiles the request explicitly asks for.
+    """
+    return [
+        field
+        for field in ("description",)
+        if sparse_requests(request, f"{prefix}{field}")
+    ]
+
+
+def board_tickets(list_id, sprint_id, request=None):
+    return Ticket.objects.filter(list_id=list_id, sprint_id=sprint_id).profile(
+        "board", keep=requested_columns(request)
+    )
+
+
+def uses_board_cards(request):
+    # The cards hold the full tree, sparse requests go through the serializers
+    return settings.BOARD_READ_MODEL and sparse_params(request) == (None, None)
+
+
+class BulkUpdateMixin:
+    """
+    Adds ``PATCH <resource>/bulk`` taking ``{"ids": [...], "patch": {...}}``,
+    see clickup_tickets.serializers.BulkUpdateSerializer.
+    """
+
+    bulk_update_serializer_class = None
+    throttle_scope = None
+
+    @action(detail=False, methods=["patch"], url_path="bulk", throttle_scope="bulk")
+    def bulk_update(self, request):
+        serializer = self.bulk_update_serializer_class(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response({"data": serializer.save()}, HTTP_200_OK)
+
+
 # Create your views here.
 @extend_schema_view()
 class PriorityView(ListAPIView):
@@ -69,15 +156,16 @@ class TicketStatusView(ListAPIView):
 
 
 @extend_schema_view()
-class TicketViewSet(ModelViewSet):
+class TicketViewSet(AuditTrailMixin, BulkUpdateMixin, ModelViewSet):
     queryset = Ticket.objects.all()
     serializer_class = TicketUpdateSerializer
+    bulk_update_serializer_class = TicketBulkUpdateSerializer
     pagination_class = ClickUpTicketPagination
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        list_id = self.request.query_params.get("listId")
-        sprint_id = self.request.query_params.get("sprintId")
+        ids = id_params(self.request.query_params, "listId", "sprintId")
+        list_id, sprint_id = ids["listId"], ids["sprintId"]
         data_count = self.request.query_params.get("dataCount", 0)
 
         try:
@@ -86,24 +174,27 @@ class TicketViewSet(ModelViewSet):
             data_count = 0
 
         if list_id or sprint_id:
-            tickets = Ticket.objects.filter(list_id=list_id, sprint_id=sprint_id)
+            tickets = board_tickets(list_id, sprint_id, self.request)
             allocations = TicketAllocation.objects.filter(ticket__in=tickets)
-            ticket_group_by = (
+            # Evaluated once, the column and the counts both read it
+            ticket_group_by = list(
                 allocations.values("ticketStatus", "ticketStatus__title")
                 .annotate(
                     ticket_count=Count("ticketStatus"),
                 )
                 .order_by()
             )
-            if ticket_group_by.exists():
+            if ticket_group_by:
                 status_id = ticket_group_by[data_count]["ticketStatus"]
                 status_name = ticket_group_by[data_count]["ticketStatus__title"]
                 ticket = tickets.prefetch_related(
-                    Prefetch(
-                        "allocations",
-                        queryset=allocations.filter(ticketStatus=status_id),
+                    *board_prefetch(
+                        allocations.filter(ticketStatus=status_id), self.request
                     )
-                ).filter(allocations__ticketStatus=status_id)
+                ).filter(
+                    allocations__ticketStatus=status_id,
+                    allocations__deletedAt__isnull=True,
+                )
 
                 return [
                     {
@@ -147,6 +238,11 @@ class TicketViewSet(ModelViewSet):
         return serializer_class
 
     def list(self, request, *args, **kwargs):
+        if uses_board_cards(request) and (
+            request.query_params.get("listId") or request.query_params.get("sprintId")
+        ):
+            return self.list_board_cards(request)
+
         if request.query_params.get("listId") or request.query_params.get("sprintId"):
             queryset = self.filter_queryset(self.get_queryset())
             page = self.paginate_queryset(queryset)
@@ -156,6 +252,27 @@ class TicketViewSet(ModelViewSet):
         else:
             return Response(status=HTTP_400_BAD_REQUEST)
 
+    def list_board_cards(self, request):
+        try:
+            data_count = int(request.query_params.get("dataCount", 0))
+        except ValueError:
+            data_count = 0
+
+        ids = id_params(request.query_params, "listId", "sprintId")
+        self.paginate_queryset([None])
+        page = self.paginator.page
+        body = column_body(
+            request,
+            ids["listId"],
+            ids["sprintId"],
+            data_count,
+            {"page": page.number, "limit": page.paginator.per_page},
+        )
+        return HttpResponse(body, content_type="application/json")
+
+    def perform_destroy(self, instance):
+        Ticket.objects.filter(pk=instance.pk).soft_delete(request_actor(self.request))
+
     def destroy(self, request, *args, **kwargs):
         response = super().destroy(request, *args, **kwargs)
         if response.status_code == HTTP_204_NO_CONTENT:
@@ -164,16 +281,31 @@ class TicketViewSet(ModelViewSet):
 
 
 @extend_schema_view()
-class TicketAllocationViewSet(ModelViewSet):
+class TicketAllocationViewSet(AuditTrailMixin, BulkUpdateMixin, ModelViewSet):
     queryset = TicketAllocation.objects.all()
     serializer_class = TicketAllocationSerializer
+    bulk_update_serializer_class = TicketAllocationBulkUpdateSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        if self.action == "list":
+            return self.queryset.profile(
+                "list", keep=requested_columns(self.request)
+            )
+        return self.queryset.all()
+
     def get_serializer_class(self):
         if self.request.method != "GET":
             return TicketAllocationUpdateSerializer
+        if self.action == "retrieve":
+            return TicketAllocationDetailSerializer
         return self.serializer_class
 
+    def perform_destroy(self, instance):
+        TicketAllocation.objects.filter(pk=instance.pk).soft_delete(
+            request_actor(self.request)
+        )
+
     def destroy(self, request, *args, **kwargs):
         response = super().destroy(request, *args, **kwargs)
         if response.status_code == HTTP_204_NO_CONTENT:
@@ -219,3 +351,236 @@ class TicketAttachmentView(UpdateAPIView):
         self.perform_update(serializer)
 
         return Response(serializer.data)
+
+
+@extend_schema_view()
+class AnalyticsView(APIView):
+    """
+    Per day status distribution, remaining estimation hours and completion
+    of a sprint, list or project (``GET /api/analytics/<scope>/<id>``).
+    """
+
+    permission_classes = [IsAuthenticated]
+    # Aggregates over a whole project
+    request_budget = {"statement_timeout": 30000}
+    scope_models = {"sprint": Sprints, "list": Lists, "project": Project}
+
+    def get(self, request, scope, pk):
+        if not self.scope_models[scope].objects.filter(_id=pk).exists():
+            return Response(f"{scope.title()} doesn't Exist.", HTTP_400_BAD_REQUEST)
+
+        return Response({"data": get_analytics(scope, pk)}, status=HTTP_200_OK)
+
+
+@extend_schema_view()
+class CapacityView(APIView):
+    """
+    Assigned estimation hours against allocation hours per team member and
+    business day (``GET /api/capacity/<projectId>``). Filters: ``from`` and
+    ``to`` dates (two weeks from today by default), ``member`` ids and
+    ``overAllocated=true``.
+    """
+
+    permission_classes = [IsAuthenticated]
+    # Aggregates over a whole project
+    request_budget = {"statement_timeout": 30000}
+
+    def get(self, request, pk):
+        if not Project.objects.filter(_id=pk).exists():
+            return Response("Project doesn't Exist.", HTTP_400_BAD_REQUEST)
+
+        try:
+            start = parse_date(request.query_params.get("from", "")) or localdate()
+            end = parse_date(request.query_params.get("to", "")) or start + timedelta(
+                days=13
+            )
+        except ValueError:
+            return Response("Invalid date.", HTTP_400_BAD_REQUEST)
+        if end < start or (end - start).days >= settings.CAPACITY_MAX_DAYS:
+            return Response(
+                f"Date range should be within {settings.CAPACITY_MAX_DAYS} days.",
+                HTTP_400_BAD_REQUEST,
+            )
+
+        member_ids = [
+            parse_id(member_id, "member")
+            for member_id in request.query_params.get("member", "").split(",")
+            if member_id
+        ]
+        members = compute_capacity(pk, start, end, member_ids)
+        if request.query_params.get("overAllocated") == "true":
+            members = [member for member in members if member["overAllocatedDays"]]
+
+        return Response(
+            {"data": {"from": start, "to": end, "members": members}},
+            status=HTTP_200_OK,
+        )
+
+
+@extend_schema_view()
+class ExportView(APIView):
+    """
+    Streams tickets, allocations or team member stats as CSV or XLSX
+    (``GET /api/export/<dataset>?fileType=csv|xlsx``), filtered by
+    ``listId``, ``sprintId`` or ``projectId``.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = "export"
+
+    def get(self, request, dataset):
+        file_type = request.query_params.get("fileType", "csv")
+        if file_type not in ("csv", "xlsx"):
+            return Response("fileType should be csv or xlsx.", HTTP_400_BAD_REQUEST)
+        if file_type == "xlsx" and not xlsx_available():
+            return Response("XLSX export requires openpyxl.", HTTP_400_BAD_REQUEST)
+
+        header, rows = DATASETS[dataset]
+        params = id_params(request.query_params, "listId", "sprintId", "projectId")
+        return export_response(file_type, dataset, header, rows(params))
+
+
+# Async implementations of the read-heavy endpoints, routed in place of the
+# views above when ASYNC_VIEWS is enabled and served under ASGI.
+@extend_schema_view()
+class PriorityAsyncView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, *args, **kwargs):
+        priorities = await aevaluate(Priority.objects.all())
+        serializer = PrioritySerializer(priorities, many=True)
+        return Response({"priority": serializer.data})
+
+
+@extend_schema_view()
+class TicketStatusAsyncView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    pagination_class = ClickUpPagination
+
+    async def get(self, request, *args, **kwargs):
+        paginator = self.pagination_class()
+        queryset = TicketStatus.objects.order_by("title")
+        try:
+            limit = paginator.get_page_size(request) or 0
+            page_number = max(int(request.query_params.get("page", 1)), 1)
+        except ValueError:
+            return Response("Invalid page", HTTP_400_BAD_REQUEST)
+
+        if limit:
+            offset = (page_number - 1) * limit
+            total, statuses = await asyncio.gather(
+                queryset.acount(),
+                aevaluate(queryset[offset : offset + limit]),
+            )
+        else:
+            statuses = await aevaluate(queryset)
+            total = len(statuses)
+
+        serializer = TicketStatusSerializer(statuses, many=True)
+        return Response(
+            {
+                "status": serializer.data,
+                "pagination": {
+                    "currentPage": page_number,
+                    "limit": limit or total,
+                    "total": total,
+                },
+            }
+        )
+
+
+@extend_schema_view()
+class TicketAsyncView(AsyncAPIView):
+    """
+    Serves the ticket board (``GET /api/ticket``) natively async; creating a
+    ticket is delegated to TicketViewSet.
+    """
+
+    permission_classes = [IsAuthenticated]
+    pagination_class = ClickUpTicketPagination
+
+    async def get(self, request, *args, **kwargs):
+        ids = id_params(request.query_params, "listId", "sprintId")
+        list_id, sprint_id = ids["listId"], ids["sprintId"]
+        if not (list_id or sprint_id):
+            return Response(status=HTTP_400_BAD_REQUEST)
+
+        try:
+            data_count = int(request.query_params.get("dataCount", 0))
+        except ValueError:
+            data_count = 0
+
+        if uses_board_cards(request):
+            paginator = self.pagination_class()
+            paginator.paginate_queryset([None], request, view=self)
+            pagination = {
+                "page": paginator.page.number,
+                "limit": paginator.page.paginator.per_page,
+            }
+            body = await sync_to_async(column_body)(
+                request, list_id, sprint_id, data_count, pagination
+            )
+            return HttpResponse(body, content_type="application/json")
+
+        tickets = board_tickets(list_id, sprint_id, request)
+        allocations = TicketAllocation.objects.filter(ticket__in=tickets)
+        ticket_group_by = await aevaluate(
+            allocations.values("ticketStatus", "ticketStatus__title")
+            .annotate(
+                ticket_count=Count("ticketStatus"),
+            )
+            .order_by()
+        )
+
+        if ticket_group_by:
+            status_id = ticket_group_by[data_count]["ticketStatus"]
+            status_name = ticket_group_by[data_count]["ticketStatus__title"]
+            ticket = await aevaluate(
+                tickets.prefetch_related(
+                    *board_prefetch(
+                        allocations.filter(ticketStatus=status_id), request
+                    )
+                ).filter(
+                    allocations__ticketStatus=status_id,
+                    allocations__deletedAt__isnull=True,
+                )
+            )
+            groups = [
+                {
+                    "ticketData": [
+                        {
+                            "_id": status_id,
+                            "groupById": status_id,
+                            "data": ticket,
+                        }
+                    ],
+                    "TableHeading": {
+                        "_id": status_id,
+                        "name": status_name,
+                    },
+                    "totalCount": [
+                        {"count": group["ticket_count"]} for group in ticket_group_by
+                    ],
+                }
+            ]
+        else:
+            groups = [
+                {
+                    "ticketData": [],
+                    "pagination": {},
+                    "TableHeading": {},
+                    "totalCount": [],
+                }
+            ]
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(groups, request, view=self)
+        serializer = TicketGroupSerializer(
+            page, many=True, context={"request": request}
+        )
+        response = paginator.get_paginated_response(serializer.data)
+        return Response(response.data[0], status=HTTP_200_OK)
+
+    async def post(self, request, *args, **kwargs):
+        view = TicketViewSet.as_view({"post": "create"})
+        return await sync_to_async(view)(request._request, *args, **kwargs)
@@ -0,0 +1,213 @@
+from contextvars import ContextVar
+from time import monotonic
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.manager import BaseManager
+from django.db.utils import DatabaseError, OperationalError
+from django.dispatch import receiver
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
+from rest_framework.status import HTTP_422_UNPROCESSABLE_ENTITY
+from rest_framework.status import HTTP_503_SERVICE_UNAVAILABLE
+from rest_framework.views import exception_handler as drf_exception_handler
+from rest_framework.views import set_rollback
+
+# SQLSTATE of a statement cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+
+# Request whose budget applies to the queries of the current context, set by
+# RequestBudgetMiddleware; context variables follow the request into the
+# threads running its sync code
+budgeted_request = ContextVar("budgeted_request", default=None)
+
+# statement_timeout of a connection after a failed SET, or once the
+# transaction of the last SET ended without committing
+UNKNOWN = object()
+
+SAVEPOINT_STATEMENTS = ("SAVEPOINT", "ROLLBACK TO SAVEPOINT", "RELEASE SAVEPOINT")
+
+
+class BudgetExceeded(Exception):
+    """
+    The request used up one of its budgets: "rows" serialized,
+    "seconds" spent or the "statement_timeout" of a query.
+    """
+
+    messages = {
+        "rows": "Too many rows requested, narrow the filters, limit or fields.",
+        "seconds": "The request took too long to serialize.",
+        "statement_timeout": "A query of the request took too long.",
+    }
+
+    def __init__(self, budget, limit):
+        super().__init__(budget, limit)
+        self.budget = budget
+        self.limit = limit
+
+    @property
+    def status_code(self):
+        # Asking for too many rows fails every time, the others may not
+        if self.budget == "rows":
+            return HTTP_422_UNPROCESSABLE_ENTITY
+        return HTTP_503_SERVICE_UNAVAILABLE
+
+
+class RequestBudget:
+    """
+    Limits of a request: ``statement_timeout`` of its queries in
+    milliseconds (PostgreSQL, 0 disables it), ``max_rows`` serialized and
+    ``seconds`` from the start of the request until serialization stops.
+    """
+
+    def __init__(self, statement_timeout, max_rows, seconds, started_at=None):
+        self.statement_timeout = statement_timeout
+        self.max_rows = max_rows
+        self.seconds = seconds
+        self.started_at = monotonic() if started_at is None else started_at
+        self.rows = 0
+
+    @classmethod
+    def for_view(cls, view_class, started_at=None):
+        options = {
+            **settings.REQUEST_BUDGET,
+            **getattr(view_class, "request_budget", {}),
+        }
+        return cls(started_at=started_at, **options)
+
+    def charge(self, rows=1):
+        self.rows += rows
+        if self.max_rows and self.rows > self.max_rows:
+            raise BudgetExceeded("rows", self.max_rows)
+        if self.seconds and monotonic() - self.started_at > self.seconds:
+            raise BudgetExceeded("seconds", self.seconds)
+
+
+class StatementTimeout:
+    """
+    Execute wrapper of every PostgreSQL connection giving its queries the
+    statement_timeout of the budget of the request they run for
+    (``budgeted_request``), and the connection default outside of one.
+
+    The SET only runs when the value the connection holds changes, so a
+    persistent connection serving requests with the same budget runs no
+    extra query, and nothing has to be installed or reset per request in
+    the thread owning the connection.
+    """
+
+    def __call__(self, execute, sql, params, many, context):
+        connection = context["connection"]
+        budget = getattr(budgeted_request.get(), "budget", None)
+        timeout = None if budget is None else int(budget.statement_timeout)
+        # Savepoint statements need no timeout and run while the savepoints
+        # the SET is tracked against change
+        if timeout != self.current(connection) and not sql.startswith(
+            SAVEPOINT_STATEMENTS
+        ):
+            self.apply(connection, timeout)
+        return execute(sql, params, many, context)
+
+    def current(self, connection):
+        timeout, savepoints = getattr(connection, "budget_timeout", (None, None))
+        # A SET made in a transaction holds until the transaction, or the
+        # savepoint it was made in, ends; a rollback undoes it
+        if savepoints is not None and (
+            not connection.in_atomic_block
+            or tuple(connection.savepoint_ids[: len(savepoints)]) != savepoints
+        ):
+            return UNKNOWN
+        return timeout
+
+    def apply(self, connection, timeout):
+        savepoints = (
+            tuple(connection.savepoint_ids) if connection.in_atomic_block else None
+        )
+        # Recorded first, the SET itself goes through this wrapper
+        connection.budget_timeout = (timeout, savepoints)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SET statement_timeout TO DEFAULT"
+                    if timeout is None
+                    else f"SET statement_timeout = {timeout}"
+                )
+        except DatabaseError:
+            connection.budget_timeout = (UNKNOWN, None)
+            raise
+
+        if savepoints is not None:
+
+            def committed():
+                if connection.budget_timeout == (timeout, savepoints):
+                    connection.budget_timeout = (timeout, None)
+
+            connection.on_commit(committed)
+
+
+statement_timeout = StatementTimeout()
+
+
+def install_statement_timeout(connection):
+    if (
+        connection.vendor == "postgresql"
+        and statement_timeout not in connection.execute_wrappers
+    ):
+        # First, execute_wrapper() blocks pop the last wrapper when they end
+        connection.execute_wrappers.insert(0, statement_timeout)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    # A new connection starts from its default
+    connection.budget_timeout = (None, None)
+    install_statement_timeout(connection)
+
+
+class BudgetedListSerializer(ListSerializer):
+    """
+    ListSerializer charging every serialized row to the request budget, so
+    an oversized board or list fails fast instead of pinning the worker.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        budget = getattr(self.context.get("request"), "budget", None)
+
+        items = []
+        for item in iterable:
+            if budget is not None:
+                budget.charge()
+            items.append(self.child.to_representation(item))
+        return items
+
+
+def is_query_canceled(exc):
+    cause = exc.__cause__
+    return QUERY_CANCELED in (
+        getattr(cause, "sqlstate", None),
+        getattr(cause, "pgcode", None),
+    )
+
+
+def exception_handler(exc, context):
+    """
+    DRF exception handler answering exceeded budgets, including cancelled
+    queries, with ``{"message": ..., "budget": ..., "limit": ...}``.
+    """
+    if isinstance(exc, OperationalError) and is_query_canceled(exc):
+        budget = getattr(context["request"], "budget", None)
+        exc = BudgetExceeded(
+            "statement_timeout", budget and budget.statement_timeout
+        )
+
+    if isinstance(exc, BudgetExceeded):
+        set_rollback()
+        return Response(
+            {
+                "message": BudgetExceeded.messages[exc.budget],
+                "budget": exc.budget,
+                "limit": exc.limit,
+            },
+            status=exc.status_code,
+        )
+    return drf_exception_handler(exc, context)
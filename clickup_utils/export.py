@@ -0,0 +1,59 @@
+import csv
+import tempfile
+from importlib.util import find_spec
+
+from django.http import FileResponse, StreamingHttpResponse
+
+
+class Echo:
+    """
+    File-like object handing back what csv.writer writes, so each row can
+    be yielded to the response as soon as it is formatted.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_response(filename, header, rows):
+    writer = csv.writer(Echo())
+
+    def stream():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    return StreamingHttpResponse(
+        stream(),
+        content_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'},
+    )
+
+
+def xlsx_response(filename, header, rows):
+    """
+    Writes the rows with openpyxl's write-only workbook, which keeps them
+    in temporary files instead of memory, and streams the saved file.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(filename[:31])
+    worksheet.append(header)
+    for row in rows:
+        worksheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=f"{filename}.xlsx")
+
+
+def xlsx_available():
+    return find_spec("openpyxl") is not None
+
+
+def export_response(file_type, filename, header, rows):
+    if file_type == "xlsx":
+        return xlsx_response(filename, header, rows)
+    return csv_response(filename, header, rows)
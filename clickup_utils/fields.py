@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db.models import CharField, UUIDField
+
+from .utils import generate_uuid
+
+
+class HexUUIDField(UUIDField):
+    """
+    Stored as a native UUID (16 bytes on PostgreSQL) but read back as the
+    32-char hex string the API and the rest of the code use for ``_id``.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return self.to_python(value).hex
+
+
+def primary_key_field():
+    if settings.PRIMARY_KEY_STORAGE == "uuid":
+        return HexUUIDField(primary_key=True, default=generate_uuid, editable=False)
+
+    return CharField(
+        primary_key=True, default=generate_uuid, max_length=32, editable=False
+    )
@@ -0,0 +1,44 @@
+import secrets
+import threading
+import time
+from uuid import uuid4
+
+
+_lock = threading.Lock()
+_last_timestamp = 0
+_counter = 0
+
+
+def uuid4_hex():
+    return uuid4().hex
+
+
+def uuid7_hex():
+    """
+    Time-ordered UUIDv7 (RFC 9562) as 32-char hex: 48-bit unix milliseconds,
+    a 12-bit counter keeping ids monotonic within the process and 62 random
+    bits so ids generated by other processes in the same millisecond don't
+    collide. Sorting by the id sorts by creation time.
+    """
+    global _last_timestamp, _counter
+
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _last_timestamp:
+            _last_timestamp = timestamp
+            _counter = 0
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_timestamp += 1
+                _counter = 0
+        timestamp, counter = _last_timestamp, _counter
+
+    value = (
+        (timestamp & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    return f"{value:032x}"
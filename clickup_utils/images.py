@@ -0,0 +1,72 @@
+import hashlib
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+THUMBNAIL_SIZES = (32, 64, 256)
+
+
+def derivative_name(name, size):
+    return f"{os.path.splitext(name)[0]}_{size}.webp"
+
+
+def decodable(content_type):
+    """
+    Whether PIL has a plugin for an image content type, SVG and HEIC have none.
+    """
+    Image.init()
+    return content_type.startswith("image/") and content_type in Image.MIME.values()
+
+
+def generate_derivatives(field_file):
+    """
+    Writes WebP thumbnails of an image next to the original, fitted within
+    each of THUMBNAIL_SIZES, and returns the dict stored on the model. The
+    version is a hash of the original, appended to the URLs for cache busting.
+    """
+    storage = field_file.storage
+    with field_file.open("rb") as original:
+        content = original.read()
+
+    image = ImageOps.exif_transpose(Image.open(BytesIO(content)))
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+
+    sizes = {}
+    for size in THUMBNAIL_SIZES:
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size))
+        buffer = BytesIO()
+        thumbnail.save(buffer, "WEBP", quality=80)
+
+        name = derivative_name(field_file.name, size)
+        storage.delete(name)
+        sizes[str(size)] = storage.save(name, ContentFile(buffer.getvalue()))
+
+    return {
+        "source": field_file.name,
+        "version": hashlib.sha1(content).hexdigest()[:12],
+        "sizes": sizes,
+    }
+
+
+def derivative_urls(field_file, request=None):
+    """
+    URLs of the thumbnails stored in the "<field>Derivatives" attribute, None
+    until they have been generated for the current file.
+    """
+    if not field_file:
+        return None
+
+    derivatives = getattr(field_file.instance, f"{field_file.field.name}Derivatives")
+    if derivatives.get("source") != field_file.name:
+        return None
+
+    urls = {}
+    for size, name in derivatives["sizes"].items():
+        url = f"{field_file.storage.url(name)}?v={derivatives['version']}"
+        urls[size] = request.build_absolute_uri(url) if request else url
+    return urls
@@ -0,0 +1,255 @@
+import gzip
+import json
+import os
+from functools import cache
+from hashlib import sha256
+from importlib import import_module
+from pathlib import Path
+from threading import Lock
+
+import drf_spectacular
+import rest_framework
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+from rest_framework.exceptions import NotFound
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+MANIFEST = "manifest.json"
+RENDERERS = (OpenApiYamlRenderer, OpenApiJsonRenderer)
+# Suffix of the precompressed files per Content-Encoding, in preference order
+ENCODINGS = {"br": ".br", "gzip": ".gz", "": ""}
+
+
+def source_files():
+    """
+    Python files the schema is generated from: the project's apps, the
+    settings package and clickup_utils.
+    """
+    base_dir = Path(settings.BASE_DIR).resolve()
+    directories = {
+        Path(import_module(settings.ROOT_URLCONF).__file__).resolve().parent,
+        base_dir / "clickup_utils",
+    }
+    for app_config in apps.get_app_configs():
+        path = Path(app_config.path).resolve()
+        if path.is_relative_to(base_dir):
+            directories.add(path)
+    return sorted(
+        path for directory in directories for path in directory.rglob("*.py")
+    )
+
+
+@cache
+def fingerprint():
+    """
+    Hash of the code and settings the schema depends on, computed once per
+    process: a built schema is only reused while it matches.
+    """
+    digest = sha256()
+    digest.update(
+        repr(
+            (
+                drf_spectacular.__version__,
+                rest_framework.VERSION,
+                settings.SPECTACULAR_SETTINGS,
+                settings.REST_FRAMEWORK,
+            )
+        ).encode()
+    )
+    for path in source_files():
+        digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class SchemaArtifacts:
+    """
+    The rendered schema documents of one build, per format ("yaml",
+    "json") and Content-Encoding ("br", "gzip" or "" for none), named
+    after the digest of their content.
+    """
+
+    def __init__(self, fingerprint, digest, documents):
+        self.fingerprint = fingerprint
+        self.digest = digest
+        self.documents = documents
+
+    @classmethod
+    def generate(cls):
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+        schema = generator.get_schema(request=None, public=True)
+
+        rendered = {
+            renderer.format: renderer().render(schema, renderer_context={})
+            for renderer in RENDERERS
+        }
+        digest = sha256(rendered["json"]).hexdigest()[:16]
+
+        documents = {}
+        for format, document in rendered.items():
+            documents[format, ""] = document
+            documents[format, "gzip"] = gzip.compress(document, mtime=0)
+            if brotli is not None:
+                documents[format, "br"] = brotli.compress(document)
+        return cls(fingerprint(), digest, documents)
+
+    @classmethod
+    def load(cls, directory):
+        directory = Path(directory)
+        try:
+            manifest = json.loads((directory / MANIFEST).read_text())
+            documents = {
+                (format, encoding): (directory / filename).read_bytes()
+                for format, encoding, filename in manifest["files"]
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(manifest["fingerprint"], manifest["digest"], documents)
+
+    def filename(self, format, encoding):
+        return f"schema.{self.digest}.{format}{ENCODINGS[encoding]}"
+
+    def save(self, directory):
+        """
+        Writes the documents then the manifest pointing to them, each
+        through a rename so a reader never sees a partial file, and drops
+        the documents of previous builds.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for (format, encoding), document in self.documents.items():
+            filename = self.filename(format, encoding)
+            write_atomic(directory / filename, document)
+            files.append([format, encoding, filename])
+
+        manifest = {
+            "fingerprint": self.fingerprint,
+            "digest": self.digest,
+            "files": files,
+        }
+        write_atomic(directory / MANIFEST, json.dumps(manifest).encode())
+
+        current = {filename for *_, filename in files}
+        for path in directory.glob("schema.*"):
+            if path.name not in current:
+                path.unlink(missing_ok=True)
+
+
+def write_atomic(path, content):
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_bytes(content)
+    os.replace(temporary, path)
+
+
+artifacts = None
+artifacts_lock = Lock()
+
+
+def current_artifacts():
+    """
+    The schema built for the running code: loaded from SCHEMA_ROOT once
+    per process, or generated (and saved for the other processes) when
+    build_schema wasn't run since the code or settings changed.
+    """
+    global artifacts
+    if artifacts is not None and artifacts.fingerprint == fingerprint():
+        return artifacts
+
+    with artifacts_lock:
+        if artifacts is None or artifacts.fingerprint != fingerprint():
+            loaded = SchemaArtifacts.load(settings.SCHEMA_ROOT)
+            if loaded is None or loaded.fingerprint != fingerprint():
+                loaded = SchemaArtifacts.generate()
+                try:
+                    loaded.save(settings.SCHEMA_ROOT)
+                except OSError:
+                    # A read only deploy still serves it from memory
+                    pass
+            artifacts = loaded
+    return artifacts
+
+
+def accepted_encodings(request):
+    encodings = {""}
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        encoding, _, quality = part.partition(";q=")
+        try:
+            if quality and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        encodings.add(encoding.strip().lower())
+    return encodings
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    SpectacularAPIView serving the prebuilt schema documents (see the
+    build_schema command) instead of generating them on every request,
+    precompressed with brotli or gzip when the client accepts it.
+
+    ``/api/schema/`` is revalidated through its ETag; the content addressed
+    ``/api/schema/<digest>/`` it links to with Content-Location is cached
+    for a year. Requests for another ``lang`` or ``version`` are still
+    generated.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, digest=None, **kwargs):
+        if self.api_version or request.GET.get("lang") or request.GET.get("version"):
+            return super().get(request, *args, **kwargs)
+
+        schema = current_artifacts()
+        if digest is not None and digest != schema.digest:
+            raise NotFound()
+
+        format = request.accepted_renderer.format
+        headers = {
+            "ETag": f'"{schema.digest}-{format}"',
+            "Cache-Control": (
+                "public, max-age=31536000, immutable"
+                if digest
+                else "public, no-cache"
+            ),
+            "Content-Location": reverse(
+                "schema-digest", kwargs={"digest": schema.digest}
+            ),
+        }
+        if headers["ETag"] in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified(headers=headers)
+        else:
+            accepted = accepted_encodings(request)
+            encoding = next(
+                encoding
+                for encoding in ENCODINGS
+                if encoding in accepted and (format, encoding) in schema.documents
+            )
+            renderer = request.accepted_renderer
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f"{content_type}; charset={renderer.charset}"
+            response = HttpResponse(
+                schema.documents[format, encoding],
+                content_type=content_type,
+                headers={
+                    **headers,
+                    "Content-Disposition": f'inline; filename="{self._get_filename(request, None)}"',
+                },
+            )
+            if encoding:
+                response["Content-Encoding"] = encoding
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
@@ -0,0 +1,132 @@
+from rest_framework.fields import Field
+
+from .images import derivative_urls
+
+
+class ThumbnailsField(Field):
+    """
+    Read only field of an ImageField/FileField source, gives the URLs of its
+    WebP thumbnails keyed by size.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return derivative_urls(value, self.context.get("request"))
+
+
+def sparse_params(request):
+    """
+    Dotted paths of the ``fields`` and ``expand`` query parameters, None for
+    a parameter that is absent.
+    """
+    if request is None:
+        return None, None
+
+    def parse(name):
+        if name not in request.query_params:
+            return None
+        return {
+            path.strip()
+            for path in request.query_params[name].split(",")
+            if path.strip()
+        }
+
+    return parse("fields"), parse("expand")
+
+
+def is_referenced(path, paths):
+    return paths is not None and any(
+        other == path or other.startswith(f"{path}.") for other in paths
+    )
+
+
+def is_included(path, fields, expand, expandable):
+    def referenced(paths):
+        return is_referenced(path, paths)
+
+    if referenced(expand):
+        return True
+    if expandable and expand is not None and not referenced(fields):
+        return False
+    if fields is None:
+        return True
+
+    # Without a selection at this level of the tree every field is kept
+    parent = path.rpartition(".")[0]
+    level = [
+        other for other in fields if not parent or other.startswith(f"{parent}.")
+    ]
+    return referenced(fields) or not level
+
+
+def sparse_includes(request, path):
+    """
+    Whether the relation at path is serialized for the request, so views
+    only prefetch what SparseFieldsetMixin serializers will render.
+    """
+    fields, expand = sparse_params(request)
+    parts = path.split(".")
+    return all(
+        is_included(".".join(parts[: index + 1]), fields, expand, True)
+        for index in range(len(parts))
+    )
+
+
+def sparse_requests(request, path):
+    """
+    Whether the request names path in ``fields`` or ``expand``, which is
+    how the fields of ``Meta.deferred`` are asked for.
+    """
+    fields, expand = sparse_params(request)
+    return is_referenced(path, fields) or is_referenced(path, expand)
+
+
+class SparseFieldsetMixin:
+    """
+    Prunes the serialized tree with the request's ``fields`` and ``expand``
+    parameters, e.g. ``?fields=_id,title,allocations.title`` or
+    ``?expand=allocations``. Paths are relative to the outermost serializer
+    using the mixin and relations listed in ``Meta.expandable`` are only
+    rendered when expanded, once ``expand`` is given. Without either
+    parameter the full tree is rendered, except the heavy fields listed in
+    ``Meta.deferred`` which are only rendered when named in either one.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse_fields, expand = sparse_params(self.context.get("request"))
+        deferred = getattr(self.Meta, "deferred", ())
+        if sparse_fields is None and expand is None and not deferred:
+            return fields
+
+        prefix = self.sparse_prefix()
+        expandable = getattr(self.Meta, "expandable", ())
+        for name in list(fields):
+            path = f"{prefix}{name}"
+            if name in deferred:
+                included = is_referenced(path, sparse_fields) or is_referenced(
+                    path, expand
+                )
+            else:
+                included = is_included(path, sparse_fields, expand, name in expandable)
+            if not included:
+                del fields[name]
+        return fields
+
+    def sparse_prefix(self):
+        chain = []
+        node = self
+        while node is not None:
+            chain.append(node)
+            node = getattr(node, "parent", None)
+
+        outermost = max(
+            index
+            for index, node in enumerate(chain)
+            if isinstance(node, SparseFieldsetMixin)
+        )
+        names = [node.field_name for node in chain[:outermost] if node.field_name]
+        return "".join(f"{name}." for name in reversed(names))
@@ -0,0 +1,115 @@
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Sliding window counter over the THROTTLE_CACHE: two integer counters
+    per key, the current fixed window and the previous one weighted by how
+    much of it still overlaps the sliding window. Unlike SimpleRateThrottle
+    it keeps no request history, memory per key is O(1) and a check costs
+    one get_many and one incr.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE]
+        super().__init__()
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = time()
+        window, offset = divmod(self.now, self.duration)
+        current_key = f"{self.key}:{int(window)}"
+        previous_key = f"{self.key}:{int(window) - 1}"
+        counts = self.cache.get_many([previous_key, current_key])
+        self.previous = counts.get(previous_key, 0)
+        self.current = counts.get(current_key, 0)
+        self.elapsed = offset / self.duration
+
+        if self.previous * (1 - self.elapsed) + self.current >= self.num_requests:
+            return False
+
+        # The counter outlives its window so it can be the previous one
+        if not self.cache.add(current_key, 1, self.duration * 2):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                self.cache.set(current_key, 1, self.duration * 2)
+        return True
+
+    def wait(self):
+        if self.current >= self.num_requests or not self.previous:
+            return (1 - self.elapsed) * self.duration
+
+        # Until the previous window's weight has decayed below the limit
+        elapsed = 1 - (self.num_requests - self.current) / self.previous
+        return max(elapsed - self.elapsed, 0) * self.duration
+
+
+class UserRateThrottle(SlidingWindowThrottle):
+    """
+    Every request of a user, or of an IP address for anonymous requests.
+    """
+
+    scope = "user"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return f"throttle:{self.scope}:{ident}"
+
+
+class WriteRateThrottle(UserRateThrottle):
+    """
+    The writes (non-safe methods) of a user across all endpoints.
+    """
+
+    scope = "write"
+
+    def get_cache_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        return super().get_cache_key(request, view)
+
+
+class ScopedRateThrottle(UserRateThrottle):
+    """
+    Per user limit of the endpoints sharing the view's ``throttle_scope``.
+    """
+
+    def __init__(self):
+        # The scope is only known once the view is
+        self.cache = caches[settings.THROTTLE_CACHE]
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "throttle_scope", None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+
+class LoginRateThrottle(SlidingWindowThrottle):
+    """
+    Sign in attempts per IP address, checked before the identity provider
+    is called.
+    """
+
+    scope = "login"
+
+    def get_cache_key(self, request, view):
+        return f"throttle:{self.scope}:{self.get_ident(request)}"
@@ -1,10 +1,56 @@
-from uuid import uuid4
+from functools import lru_cache
+from uuid import UUID
 
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.module_loading import import_string
 from django.utils.timezone import now
+from rest_framework.exceptions import ValidationError
+
+
+@lru_cache
+def get_id_generator(path):
+    return import_string(path)
 
 
 def generate_uuid():
-    return uuid4().hex
+    return get_id_generator(settings.ID_GENERATOR)()
+
+
+def request_actor(request):
+    """
+    Employee recorded as the actor of the request's changes, None for
+    anonymous users and users without an Employee.
+    """
+    try:
+        return request.user.employee
+    except (AttributeError, ObjectDoesNotExist):
+        return None
+
+
+def parse_id(value, param):
+    """
+    The hex form of an id passed in the ``param`` query param. A malformed
+    id is a 400 rather than the 500 a native uuid column would raise.
+    """
+    try:
+        return UUID(value).hex
+    except (TypeError, ValueError):
+        raise ValidationError({param: f"{value} isn't a valid id."})
+
+
+def id_params(params, *names):
+    """
+    The named id query params parsed by parse_id, None when missing or empty.
+    """
+    return {
+        name: parse_id(params[name], name) if params.get(name) else None
+        for name in names
+    }
+
+
+async def aevaluate(queryset):
+    return [obj async for obj in queryset]
 
 
 def image_upload_path(instance, filename):